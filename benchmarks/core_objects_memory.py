@@ -0,0 +1,111 @@
+import os
+import tracemalloc
+
+import const
+from core_comp.sti import STI
+from core_comp.tiep import Tiep
+from core_comp.time_point import TimePoint
+from input import read_files
+from prediction.pred_at_time import PredAtTime
+
+
+class LegacyTiep:
+    """
+    The dict-backed layout of the tiep (with its type as str) that is used as the baseline of the benchmark
+    """
+
+    def __init__(self, time, tiep_type, sym_id, sym_inst_id, var_id, tiep_inst_id=-1, dummy=False):
+        self._time = time
+        self._tiep_type = tiep_type
+        self._sym_id = sym_id
+        self._var_id = var_id
+        self._sym_inst_id = sym_inst_id
+        self._tiep_inst_id = tiep_inst_id
+        self._pair_tiep = None
+        self._dummy = dummy
+
+
+class LegacySTI:
+    def __init__(self, start_tiep, end_tiep):
+        self._start_tiep = start_tiep
+        self._end_tiep = end_tiep
+
+
+class LegacyTimePoint:
+    def __init__(self, time, tieps=None):
+        self._time = time
+        self._tieps = tieps
+
+
+class LegacyPredAtTime:
+    def __init__(self, curr_time, pred_prob, est_tte, decision=None):
+        self._curr_time = curr_time
+        self._pred_prob = pred_prob
+        self._est_tte = est_tte
+        self._decision = decision
+
+
+def measure_memory(create_objects) -> int:
+    """
+    this function returns the memory that is allocated by the objects that are created by the given function
+    :param create_objects: a function that returns a list of the created objects
+    :return: the allocated memory in bytes (without the list that holds the objects)
+    """
+    tracemalloc.start()
+    objects = create_objects()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size - objects.__sizeof__()
+
+
+def run_benchmark(file_path):
+    """
+    this function creates the core objects of the STIs in the given file in both the legacy and the current layouts,
+    and prints the memory per object and the total savings of each class
+    :param file_path: path of the STIs data file
+    """
+    sti_arrays = read_files._parse_sti_file(file_path)
+    sti_values = list(zip(sti_arrays['start_times'].astype(int).tolist(), sti_arrays['end_times'].astype(int).tolist(),
+                          sti_arrays['sym_ids'].astype(int).tolist(), sti_arrays['sym_inst_ids'].astype(int).tolist(),
+                          sti_arrays['var_ids'].astype(int).tolist()))
+    time_point_values = sorted({(series_id, time) for series_id, (start_time, end_time, *_) in
+                                zip(sti_arrays['series_ids'].tolist(), sti_values)
+                                for time in (start_time, end_time)})
+
+    def create_tieps(tiep_class):
+        # creates the start and end tieps of each STI
+        return [tiep_class(time, tiep_type, sym_id, sym_inst_id, var_id)
+                for start_time, end_time, sym_id, sym_inst_id, var_id in sti_values
+                for time, tiep_type in ((start_time, const.START_TIEP), (end_time, const.END_TIEP))]
+
+    def create_stis(sti_class, tiep_class):
+        # creates the STIs, the tieps are created in advance thus only the STI objects are measured
+        tieps = create_tieps(tiep_class)
+        return lambda: [sti_class(tieps[i], tieps[i + 1]) for i in range(0, len(tieps), 2)]
+
+    shared_tieps = []  # the time points share the same list of tieps thus only the time point objects are measured
+    benchmarks = [
+        ('Tiep', lambda: create_tieps(LegacyTiep), lambda: create_tieps(Tiep)),
+        ('STI', create_stis(LegacySTI, LegacyTiep), create_stis(STI, Tiep)),
+        ('TimePoint', lambda: [LegacyTimePoint(time, shared_tieps) for _, time in time_point_values],
+         lambda: [TimePoint(time, shared_tieps) for _, time in time_point_values]),
+        # one prediction is made for each time point of the series
+        ('PredAtTime', lambda: [LegacyPredAtTime(time, 0.5, 1.0) for _, time in time_point_values],
+         lambda: [PredAtTime(time, 0.5, 1.0) for _, time in time_point_values]),
+    ]
+
+    print(f'Core objects memory of {file_path} ({len(sti_values)} STIs)')
+    print(f'{"Class":<12}{"Objects":>10}{"Legacy B/obj":>15}{"Slotted B/obj":>15}{"Saved MB":>12}')
+    total_saved = 0
+    for class_name, create_legacy_objects, create_objects in benchmarks:
+        legacy_size = measure_memory(create_legacy_objects)
+        size = measure_memory(create_objects)
+        num_of_objects = len(create_objects())
+        total_saved += legacy_size - size
+        print(f'{class_name:<12}{num_of_objects:>10}{legacy_size / num_of_objects:>15.1f}'
+              f'{size / num_of_objects:>15.1f}{(legacy_size - size) / 2 ** 20:>12.2f}')
+    print(f'Total saved: {total_saved / 2 ** 20:.2f} MB')
+
+
+if __name__ == '__main__':
+    run_benchmark(os.path.join(const.INPUT_FOLDER, const.STI_DATA_FOLDER, const.STI_TRAIN_FILE_NAME))
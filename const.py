@@ -15,6 +15,19 @@ RAW_Y_TRAIN_FILE_NAME = 'train_class.csv'
 RAW_TEST_FILE_NAME = 'raw_test.csv'
 RAW_Y_TEST_FILE_NAME = 'test_class.csv'
 
+# Input caches
+STI_USE_CACHE = True  # whether to keep a binary cache of the parsed STI files next to them
+STI_CACHE_FILE_SUFFIX = '.cache.npz'
+STI_CACHE_VERSION = 2  # should be increased when the cache format is changed
+TIRP_USE_CATALOG = True  # whether to keep a compiled catalog of the TIRPs next to the patterns file
+TIRP_CATALOG_DIR_SUFFIX = '.catalog'
+TIRP_CATALOG_VERSION = 1  # should be increased when the catalog format is changed
+FILE_HASH_BLOCK_SIZE = 1 << 20
+
+# Input streaming
+STI_STREAM_TEST_SET = False  # whether to stream the test set one entity at a time (rows of each SeriesID must be consecutive)
+STI_STREAM_CHUNK_SIZE = 10000  # number of rows to read in each chunk
+
 # Temporal relations
 TEMP_REL_BEFORE = 'b'
 TEMP_REL_MEETS = 'm'
@@ -28,6 +41,10 @@ TEMP_REL_STARTS = 's'
 START_TIEP = '+'
 END_TIEP = '-'
 REL_TIEP = '<'
+START_TIEP_CODE = 0  # the tiep types are kept in the tieps as integer codes
+END_TIEP_CODE = 1
+TIEP_TYPES = [START_TIEP, END_TIEP]  # the tiep type of each code
+TIEP_TYPE_CODES = {START_TIEP: START_TIEP_CODE, END_TIEP: END_TIEP_CODE}
 
 # STI data column names
 STI_DATA_SERIES_ID_COL_NAME = 'SeriesID'
@@ -42,11 +59,51 @@ PAT_TEMP_RELS_COL_NAME = 'TempRels'
 PAT_TEMP_VS_COL_NAME = 'VerSupp'
 PAT_TEMP_HS_COL_NAME = 'HorSupp'
 
+# TIRP prefixes detection engines
+TIRP_DETECTION_ENGINE_OBJECTS = 'objects'  # compares the tieps objects
+TIRP_DETECTION_ENGINE_ARRAYS = 'arrays'  # joins the arrays encoding of the series with NumPy
+# the arrays engine detects the same instances, but it is slower on short series (e.g., about twice as slow in training
+# on the sample data), as its NumPy calls have a fixed cost per prefix, thus it is not the default
+TIRP_DETECTION_ENGINE = TIRP_DETECTION_ENGINE_OBJECTS
+
+# TIRP prefixes instance semantics (see TIRPPrefixInstSemantics)
+TIRP_INST_SEMANTICS_ALL = 'all'
+TIRP_INST_SEMANTICS_EARLIEST = 'earliest'
+TIRP_INST_SEMANTICS_RECENT = 'recent'
+TIRP_INST_SEMANTICS_TOP_N = 'top_n'
+TIRP_INST_SEMANTICS = TIRP_INST_SEMANTICS_ALL
+TIRP_INST_TOP_N = 3  # the number of the most recent instances that are kept with the top_n semantics
+
+# TIRP prefixes detection constraints (None for no constraint)
+TIRP_MAX_GAP = None  # the maximal duration between consecutive time points of an instance
+TIRP_LOOKBACK_WINDOW = None  # the maximal duration from the first time point of an instance to the current time
+
+# Continuous prediction
+CONT_SIM_EVENT_DRIVEN = True  # whether to evaluate the models once per instance between the arrivals of time points
+
+# Training
+TRAIN_NUM_OF_JOBS = 1  # the number of processes that train the TIRP completion models, None for all the CPUs
+TRAIN_SHARD_SIZE = 50  # the number of consecutive TIRPs that are trained together by a process (sharing a prefix trie)
+TRAIN_ENTITY_MAJOR = False  # whether to detect the instances of all the TIRPs in a single pass over the train set
+
+# Feature matrices
+FEATURE_MATRIX_INDEX_NAMES = ['entityID', 'instanceID', 'Timestamp']  # the levels of the index of the rows
+FEATURE_MATRIX_ROW_BUDGET = None  # the maximal number of rows (ticks) in the matrix of a prefix, None for all the rows
+FEATURE_MATRIX_SAMPLING_STRIDE = 'stride'  # every k-th tick of each instance (anchored at its last tick)
+FEATURE_MATRIX_SAMPLING_RANDOM = 'random'  # uniformly sampled ticks (the last tick of each instance is always kept)
+FEATURE_MATRIX_SAMPLING = FEATURE_MATRIX_SAMPLING_STRIDE
+FEATURE_MATRIX_SAMPLING_SEED = 0
+
 # Models available
 MOD_CLS_SCPM_NAME = 'SCPM'
 MOD_CLS_XGB_NAME = 'XGB'
 MOD_CLS_FCPM_NAME = 'FCPM'
 MOD_REG_GAM_GLM_NAME = 'GammaRegressor'
+# the predictions of the models of a prefix without rows in the train set (e.g., a prefix that is not detected under the
+# max gap and lookback window constraints): the probability as the support of SCPM for such a prefix, and the time to
+# event as the aggregated time when there are no predictions (see MulTIRPs)
+MOD_EMPTY_TRAIN_PROB = 0.0
+MOD_EMPTY_TRAIN_TTE = 0.0
 
 # Aggregation function
 AGG_FUN_MEAN = 'mean'
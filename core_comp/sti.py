@@ -5,6 +5,7 @@ class STI:
     """
     This class represents the symbolic time intervals that comprised of start and end tieps
     """
+    __slots__ = ('_start_tiep', '_end_tiep')
 
     def __init__(self, start_tiep: Tiep, end_tiep: Tiep):
         self._start_tiep: Tiep = start_tiep
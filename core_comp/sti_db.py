@@ -1,10 +1,23 @@
+from typing import Optional
+
+import const
+
+
 class STIDB:
     """
-    This class represents STI data contain entities, that each entity is comprised of STI series
+    This class represents STI data contain entities, that each entity is comprised of STI series.
+    The partition of the series into series with and without the event of interest is computed once
+    (on the first request) and shared by all its users.
+    An inverted index maps each tiep key (type and symbol id) to the series that include it and the offsets of
+    the time points in these series, thus only the series that include all the tieps of a pattern are visited
     """
 
     def __init__(self, sti_series_list: list):
         self._sti_series_list: list = sti_series_list
+        self._sti_series_w_event: Optional[list] = None
+        self._sti_series_wo_event: Optional[list] = None
+        self._event_occur_time: Optional[dict] = None
+        self._tiep_postings: Optional[dict[tuple, dict[int, list[int]]]] = None
         self._check_input_validity()
 
     def get_sti_series(self):
@@ -13,6 +26,55 @@ class STIDB:
     def get_number_of_entities(self) -> int:
         return len(self._sti_series_list)
 
+    def get_sti_series_w_event(self) -> list:
+        # returns the series that include the event of interest (in their order in the DB)
+        self._partition_by_event()
+        return self._sti_series_w_event
+
+    def get_sti_series_wo_event(self) -> list:
+        # returns the series that do not include the event of interest (in their order in the DB)
+        self._partition_by_event()
+        return self._sti_series_wo_event
+
+    def get_event_occur_time(self) -> dict:
+        # returns the occurrence time of the event of interest per series id (only of the series with the event)
+        self._partition_by_event()
+        return self._event_occur_time
+
+    def get_tiep_postings(self) -> dict[tuple, dict[int, list[int]]]:
+        # returns the index of the series in the DB and the time points offsets in them per tiep key
+        if self._tiep_postings is None:
+            self._tiep_postings = {}
+            for series_index, sti_series in enumerate(self._sti_series_list):
+                for tiep_key, offsets in sti_series.get_time_points().get_tiep_postings().items():
+                    self._tiep_postings.setdefault(tiep_key, {})[series_index] = offsets
+        return self._tiep_postings
+
+    def get_sti_series_with_tieps(self, tiep_keys: set[tuple]) -> list:
+        # returns the series that include all the given tiep keys (in their order in the DB)
+        tiep_postings = self.get_tiep_postings()
+        series_indices = None
+        for tiep_key in sorted(tiep_keys, key=lambda key: len(tiep_postings.get(key, {}))):
+            key_series_indices = tiep_postings.get(tiep_key, {}).keys()
+            series_indices = set(key_series_indices) if series_indices is None else series_indices & key_series_indices
+            if not series_indices:
+                return []
+        if series_indices is None:
+            return list(self._sti_series_list)
+        return [self._sti_series_list[series_index] for series_index in sorted(series_indices)]
+
+    def _partition_by_event(self):
+        # this function partitions the series by whether they include the event of interest, if not done yet
+        if self._event_occur_time is not None:
+            return
+        self._sti_series_w_event, self._sti_series_wo_event, self._event_occur_time = [], [], {}
+        for sti_series in self._sti_series_list:
+            if sti_series.is_symbol_in_series(const.EVENT_INDEX):
+                self._sti_series_w_event.append(sti_series)
+                self._event_occur_time[sti_series.get_series_id()] = sti_series.get_last_sti_end_time()
+            else:
+                self._sti_series_wo_event.append(sti_series)
+
     def _check_input_validity(self):
         # This function check the validity of the input and assert in case of wrong input
         if not len(self._sti_series_list) >= 0:
@@ -0,0 +1,60 @@
+import unittest
+
+import const
+from core_comp.sti import STI
+from core_comp.sti_db import STIDB
+from core_comp.sti_series import STISeries
+from core_comp.tiep import Tiep
+
+
+class TestSTIDB(unittest.TestCase):
+
+    def test_partition_by_event(self):
+        """
+        This function tests that the series are partitioned by the event of interest in their order in the DB
+        :return:
+        """
+        sti_series_list = [
+            STISeries(series_id=1, stis_list=[self._create_sti_instance(start_time=1, end_time=3, sym_id=1),
+                                              self._create_sti_instance(start_time=5, end_time=6,
+                                                                        sym_id=const.EVENT_INDEX)]),
+            STISeries(series_id=2, stis_list=[self._create_sti_instance(start_time=2, end_time=4, sym_id=2)]),
+            STISeries(series_id=3, stis_list=[self._create_sti_instance(start_time=7, end_time=8,
+                                                                        sym_id=const.EVENT_INDEX)]),
+        ]
+        sti_db = STIDB(sti_series_list=sti_series_list)
+        self.assertEqual(sti_series_list[0].get_symbol_ids(), frozenset({1, const.EVENT_INDEX}))
+        self.assertEqual([s.get_series_id() for s in sti_db.get_sti_series_w_event()], [1, 3])
+        self.assertEqual([s.get_series_id() for s in sti_db.get_sti_series_wo_event()], [2])
+        self.assertEqual(sti_db.get_event_occur_time(), {1: 5, 3: 7})
+
+    def test_tiep_postings(self):
+        """
+        This function tests that the inverted index finds the series that include all the given tieps
+        :return:
+        """
+        sti_series_list = [
+            STISeries(series_id=1, stis_list=[self._create_sti_instance(start_time=1, end_time=3, sym_id=1),
+                                              self._create_sti_instance(start_time=2, end_time=6, sym_id=2)]),
+            STISeries(series_id=2, stis_list=[self._create_sti_instance(start_time=2, end_time=4, sym_id=2)]),
+            STISeries(series_id=3, stis_list=[self._create_sti_instance(start_time=7, end_time=8, sym_id=1)]),
+        ]
+        sti_db = STIDB(sti_series_list=sti_series_list)
+        start_1, end_2 = (const.START_TIEP_CODE, 1), (const.END_TIEP_CODE, 2)
+        self.assertEqual(sti_db.get_tiep_postings()[start_1], {0: [0], 2: [0]})
+        self.assertEqual(sti_db.get_tiep_postings()[end_2], {0: [3], 1: [1]})
+        self.assertEqual([s.get_series_id() for s in sti_db.get_sti_series_with_tieps({start_1})], [1, 3])
+        self.assertEqual([s.get_series_id() for s in sti_db.get_sti_series_with_tieps({start_1, end_2})], [1])
+        self.assertEqual(sti_db.get_sti_series_with_tieps({(const.START_TIEP_CODE, 5)}), [])
+
+    @staticmethod
+    def _create_sti_instance(start_time, end_time, sym_id) -> STI:
+        start_tiep = Tiep(time=start_time, tiep_type=const.START_TIEP, sym_id=sym_id, sym_inst_id=1, var_id=sym_id)
+        end_tiep = Tiep(time=end_time, tiep_type=const.END_TIEP, sym_id=sym_id, sym_inst_id=1, var_id=sym_id)
+        start_tiep.add_pair_tiep(end_tiep)
+        end_tiep.add_pair_tiep(start_tiep)
+        return STI(start_tiep, end_tiep)
+
+
+if __name__ == '__main__':
+    unittest.main()
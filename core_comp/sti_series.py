@@ -2,6 +2,7 @@ import const
 from core_comp.sti import STI
 from core_comp.tiep_series import TiepSeries
 from core_comp.time_point_series import TimePointSeries
+from core_comp.time_point_series_view import TimePointSeriesView
 
 
 class STISeries:
@@ -12,6 +13,7 @@ class STISeries:
     def __init__(self, series_id: int, stis_list: list[STI]):
         self._series_id: int = series_id
         self._stis: list = self._sort_sti_list(stis_list)
+        self._symbol_ids: frozenset[int] = frozenset(sti.get_symbol_id() for sti in self._stis)
         self._tieps: TiepSeries = TiepSeries(stis_list=stis_list)
         self._time_points: TimePointSeries = TimePointSeries(entity_id=series_id, tiep_series=self._tieps)
         self._check_input_validity()
@@ -59,14 +61,9 @@ class STISeries:
     def get_time_points(self):
         return self._time_points
 
-    def get_time_points_at(self, until_time):
-        # returns only time points that before the given time
-        tps = self._time_points.get_time_point_series()
-        time_point_series_at = TimePointSeries(entity_id=self._series_id)
-        for tp in tps:
-            if tp.get_time() < until_time:
-                time_point_series_at.add_time_point(time_point=tp)
-        return time_point_series_at
+    def get_time_points_at(self, until_time) -> TimePointSeriesView:
+        # returns a view of only time points that before the given time
+        return TimePointSeriesView(time_point_series=self._time_points, until_time=until_time)
 
     def _sort_sti_list(self, stis_list):
         return sorted(stis_list, key=self.sort_sti)
@@ -79,10 +76,10 @@ class STISeries:
 
     def is_symbol_in_series(self, symbol_id) -> bool:
         # return whether an symbol id is included in the series
-        for sti in self._stis:
-            if sti.get_symbol_id() == symbol_id:
-                return True
-        return False
+        return symbol_id in self._symbol_ids
+
+    def get_symbol_ids(self) -> frozenset[int]:
+        return self._symbol_ids
 
     def _check_input_validity(self):
         # this function check the validity of the input and assert in case of wrong input
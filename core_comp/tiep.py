@@ -3,8 +3,11 @@ import const
 
 class Tiep:
     """
-    This class represents the time interval endpoint that comprised of time, type, symbol id, and the symbol instance id
+    This class represents the time interval endpoint that comprised of time, type, symbol id, and the symbol instance id.
+    The tieps are created for every STI, thus the attributes are kept in slots and the type is kept as its integer code
     """
+    __slots__ = ('_time', '_tiep_type_code', '_sym_id', '_var_id', '_sym_inst_id', '_tiep_inst_id', '_pair_tiep',
+                 '_dummy')
 
     def __init__(self, time: int, tiep_type: str, sym_id: int, sym_inst_id: int, var_id: int,
                  tiep_inst_id: int = -1, dummy: bool = False):
@@ -17,7 +20,7 @@ class Tiep:
         :param dummy: whether this object represents a dummy tiep (True) or real instances (False).
         """
         self._time: int = time
-        self._tiep_type: str = tiep_type
+        self._tiep_type_code: int = const.TIEP_TYPE_CODES.get(tiep_type)
         self._sym_id: int = sym_id
         self._var_id: int = var_id
         self._sym_inst_id: int = sym_inst_id  # each instance of this tiep should get the STI id
@@ -36,7 +39,11 @@ class Tiep:
         return self._time
 
     def get_tiep_type(self) -> str:
-        return self._tiep_type
+        return const.TIEP_TYPES[self._tiep_type_code]
+
+    def get_tiep_type_code(self) -> int:
+        # returns the integer code of the tiep type (see const.TIEP_TYPE_CODES)
+        return self._tiep_type_code
 
     def get_symbol_id(self) -> int:
         return self._sym_id
@@ -52,23 +59,31 @@ class Tiep:
 
     def is_start_type(self) -> bool:
         # returns True if this is starting tiep
-        return self._tiep_type == const.START_TIEP
+        return self._tiep_type_code == const.START_TIEP_CODE
 
     def is_end_type(self) -> bool:
         # returns True if this is ending tiep
-        return self._tiep_type == const.END_TIEP
+        return self._tiep_type_code == const.END_TIEP_CODE
 
     def is_same_tiep(self, tp) -> bool:
         # this function gets another tiep and return True if they have the same type and symbol id
-        if self._tiep_type == tp.get_tiep_type() and self._sym_id == tp.get_symbol_id():
+        if self._tiep_type_code == tp.get_tiep_type_code() and self._sym_id == tp.get_symbol_id():
             return True
         else:
             return False
 
+    def get_tiep_key(self) -> tuple:
+        # returns the key of the tiep (type and symbol id), tieps with the same key are the same tiep (see is_same_tiep)
+        return self._tiep_type_code, self._sym_id
+
+    def get_instance_key(self) -> tuple:
+        # returns the key of the tiep instance, tieps with the same key are the same tiep instance
+        return self._tiep_type_code, self._sym_id, self._sym_inst_id, self._var_id
+
     def is_same_tiep_instance(self, tp) -> bool:
         # this function gets an instances of another tiep and return True
         # if they have the same type, symbol id, instance id and variable id
-        if self._tiep_type == tp.get_tiep_type() and self._sym_id == tp.get_symbol_id() \
+        if self._tiep_type_code == tp.get_tiep_type_code() and self._sym_id == tp.get_symbol_id() \
                 and self._sym_inst_id == tp.get_symbol_instance_id() and self._var_id == tp.get_var_id():
             return True
         else:
@@ -78,7 +93,7 @@ class Tiep:
         # this function check the validity of the input and assert in case of wrong input
         if not self._dummy and not self._time >= 0:
             assert "The provided time should be greater than zero!"
-        elif self._tiep_type not in {const.START_TIEP, const.END_TIEP}:
+        elif self._tiep_type_code not in {const.START_TIEP_CODE, const.END_TIEP_CODE}:
             assert "The provided type should be '+' or '-'!"
         elif not self._sym_id >= 0:
             assert "The symbol id should be greater than zero!"
@@ -5,6 +5,8 @@ class TimePoint:
     """
     represent a time point with at least tiep
     """
+    __slots__ = ('_time', '_tieps')
+
     def __init__(self, time: int, tieps: list[Tiep] = None):
         self._time: int = time
         if tieps is None:
@@ -34,7 +36,7 @@ class TimePoint:
         if len(self._tieps) > 1:
             tiep_str += '('
         for tp in self._tieps:
-            tiep_str += f'{tp._tiep_type}{tp._sym_id}'
+            tiep_str += f'{tp.get_tiep_type()}{tp.get_symbol_id()}'
         tiep_str += f'[{self._time}]'
         if len(self._tieps) > 1:
             tiep_str += ')'
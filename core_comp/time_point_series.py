@@ -1,12 +1,21 @@
+from typing import Iterator, Optional
+
 import const
 from core_comp.tiep import Tiep
 from core_comp.tiep_series import TiepSeries
 from core_comp.time_point import TimePoint
+from core_comp.time_point_series_arrays import TimePointSeriesArrays
 
 
 class TimePointSeries:
     """
-    Ordered time point series
+    Ordered time point series.
+    The tieps instances of the series are indexed by their keys, and the start tieps that their end tieps
+    are not in the series (open start tieps) are kept, thus the membership checks are not scanning the series.
+    The index is created on the first check and then updated when a time point is added.
+    The offsets of the time points that include each tiep (tiep postings) are also created on the first request,
+    thus the time points that could include given tieps are found without scanning the series.
+    The encoding of the series as arrays (for the array detection engine) is created on the first request as well.
     """
     def __init__(self, entity_id, tiep_series: TiepSeries = None):
         self._entity_id = entity_id
@@ -14,6 +23,10 @@ class TimePointSeries:
             self._time_point_series: list[TimePoint] = self._create_time_point_series(tiep_series)
         else:
             self._time_point_series: list[TimePoint] = []
+        self._tiep_inst_keys: Optional[set[tuple]] = None
+        self._open_start_tieps: Optional[dict[tuple, Tiep]] = None
+        self._tiep_postings: Optional[dict[tuple, list[int]]] = None
+        self._tiep_arrays: Optional[TimePointSeriesArrays] = None
 
     def get_entity_id(self):
         return self._entity_id
@@ -21,8 +34,49 @@ class TimePointSeries:
     def get_time_point_series(self) -> list[TimePoint]:
         return self._time_point_series
 
+    def iter_time_points(self) -> Iterator[TimePoint]:
+        return iter(self._time_point_series)
+
+    def get_num_of_time_points(self) -> int:
+        return len(self._time_point_series)
+
     def add_time_point(self, time_point: TimePoint):
         self._time_point_series.append(time_point)
+        if self._tiep_inst_keys is not None:
+            self._index_time_point(time_point)
+        if self._tiep_postings is not None:
+            self._add_tiep_postings(time_point_offset=len(self._time_point_series) - 1)
+        self._tiep_arrays = None  # the arrays are encoded again on the next request
+
+    def get_tiep_postings(self) -> dict[tuple, list[int]]:
+        # returns the sorted offsets of the time points that include each tiep key (type and symbol id)
+        if self._tiep_postings is None:
+            self._tiep_postings = {}
+            for time_point_offset in range(len(self._time_point_series)):
+                self._add_tiep_postings(time_point_offset=time_point_offset)
+        return self._tiep_postings
+
+    def get_tiep_arrays(self) -> TimePointSeriesArrays:
+        # returns the encoding of the series as arrays of its tieps
+        if self._tiep_arrays is None:
+            self._tiep_arrays = TimePointSeriesArrays(self._time_point_series)
+        return self._tiep_arrays
+
+    def iter_time_points_with_tieps(self, tieps: list[Tiep]) -> Iterator[TimePoint]:
+        # returns the time points that include a tiep with the key of the rarest given tiep (the candidates for
+        # including all the given tieps)
+        offsets = self.get_rarest_tiep_offsets(tieps)
+        return (self._time_point_series[offset] for offset in offsets)
+
+    def get_rarest_tiep_offsets(self, tieps: list[Tiep]) -> list[int]:
+        # returns the offsets of the time points that include the rarest given tiep
+        tiep_postings = self.get_tiep_postings()
+        return min((tiep_postings.get(tiep.get_tiep_key(), []) for tiep in tieps), key=len)
+
+    def _add_tiep_postings(self, time_point_offset: int):
+        # this function adds the offset of the time point to the postings of its tieps keys
+        for tiep_key in {tiep.get_tiep_key() for tiep in self._time_point_series[time_point_offset].get_tieps()}:
+            self._tiep_postings.setdefault(tiep_key, []).append(time_point_offset)
 
     def get_last_time_point_time(self) -> int:
         # returns the time of the last time point in the time point series
@@ -42,10 +96,8 @@ class TimePointSeries:
 
     def is_tiep_instance_exist(self, tiep: Tiep) -> bool:
         # returns true if the given tiep exists in the time point series
-        for tp in self._time_point_series:
-            if tp.is_tiep_instance_exist(tiep):
-                return True
-        return False
+        self._create_tiep_index()
+        return tiep.get_instance_key() in self._tiep_inst_keys
 
     def are_end_tieps_closed_their_start_tieps(self, time_point: TimePoint) -> bool:
         # this function checks if an end tiep ends the last start tiep with the same symbol of the prev instance
@@ -60,17 +112,36 @@ class TimePointSeries:
         # this function checks which STIs should be unfinished in the TIRP-prefix
         # and for each validate they will be unfinished in case of extension
         new_tp_time = time_point.get_time()
-        for tp in self._time_point_series:
-            for tiep in tp.get_tieps():
-                if tiep.is_start_type():
-                    # for each start tiep in the time point series, check if it should be unfinished:
-                    # if it's end time is before the new time point time, it should be included in the series
-                    paired_end_tiep = tiep.get_pair_tiep()
-                    paired_end_tiep_time = paired_end_tiep.get_time()
-                    if paired_end_tiep_time < new_tp_time and not self.is_tiep_instance_exist(paired_end_tiep):
-                        return False
+        self._create_tiep_index()
+        for start_tiep in self._open_start_tieps.values():
+            # for each open start tiep in the time point series, check if it should be unfinished:
+            # if it's end time is before the new time point time, it should be included in the series
+            if start_tiep.get_pair_tiep().get_time() < new_tp_time:
+                return False
         return True
 
+    def _create_tiep_index(self):
+        # this function creates the index of the tieps instances in the series if it was not created yet
+        if self._tiep_inst_keys is None:
+            self._tiep_inst_keys = set()
+            self._open_start_tieps = {}
+            for time_point in self._time_point_series:
+                self._index_time_point(time_point)
+
+    def _index_time_point(self, time_point: TimePoint):
+        # this function adds the tieps of the time point to the index and updates the open start tieps
+        for tiep in time_point.get_tieps():
+            tiep_inst_key = tiep.get_instance_key()
+            self._tiep_inst_keys.add(tiep_inst_key)
+            paired_tiep = tiep.get_pair_tiep()
+            if paired_tiep is None:
+                continue
+            if tiep.is_start_type():
+                if paired_tiep.get_instance_key() not in self._tiep_inst_keys:
+                    self._open_start_tieps[tiep_inst_key] = tiep
+            else:
+                self._open_start_tieps.pop(paired_tiep.get_instance_key(), None)
+
     def get_tiep_str(self) -> str:
         # returns a str representation of the tiep point series
         tiep_str = ''
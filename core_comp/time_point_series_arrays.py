@@ -0,0 +1,71 @@
+import numpy as np
+
+import const
+from core_comp.tiep import Tiep
+from core_comp.time_point import TimePoint
+
+
+class TimePointSeriesArrays:
+    """
+    An encoding of a time point series as NumPy arrays of its tieps (in the order of the time points),
+    which is used for detecting TIRP prefixes with array operations instead of comparing the tieps objects.
+    Each tiep instance key (type, symbol, symbol instance and variable) is encoded as an integer id,
+    and each tiep keeps the id and the time of its paired tiep (-1 if it has no paired tiep)
+    """
+    def __init__(self, time_points: list[TimePoint]):
+        self._tieps: list[Tiep] = [tiep for time_point in time_points for tiep in time_point.get_tieps()]
+        self._tp_times: np.ndarray = np.array([time_point.get_time() for time_point in time_points], dtype=np.int64)
+        self._tiep_tp_offsets: np.ndarray = np.repeat(np.arange(len(time_points), dtype=np.int64),
+                                                      [len(time_point.get_tieps()) for time_point in time_points])
+        self._tiep_types: np.ndarray = np.array([tiep.get_tiep_type_code() for tiep in self._tieps], dtype=np.int64)
+        self._tiep_sym_ids: np.ndarray = np.array([tiep.get_symbol_id() for tiep in self._tieps], dtype=np.int64)
+
+        inst_key_ids = {}
+        for tiep in self._tieps:
+            inst_key_ids.setdefault(tiep.get_instance_key(), len(inst_key_ids))
+        pair_tieps = [tiep.get_pair_tiep() for tiep in self._tieps]
+        self._tiep_key_ids: np.ndarray = np.array([inst_key_ids[tiep.get_instance_key()] for tiep in self._tieps],
+                                                  dtype=np.int64)
+        self._tiep_pair_key_ids: np.ndarray = np.array(
+            [-1 if pair is None else inst_key_ids.setdefault(pair.get_instance_key(), len(inst_key_ids))
+             for pair in pair_tieps], dtype=np.int64)
+        self._tiep_pair_times: np.ndarray = np.array([-1 if pair is None else pair.get_time() for pair in pair_tieps],
+                                                     dtype=np.int64)
+        self._first_tieps_with_key: dict[tuple, tuple[np.ndarray, np.ndarray]] = {}
+
+    def get_tieps(self) -> list[Tiep]:
+        return self._tieps
+
+    def get_time_point_times(self) -> np.ndarray:
+        return self._tp_times
+
+    def get_tiep_key_ids(self) -> np.ndarray:
+        return self._tiep_key_ids
+
+    def get_tiep_pair_key_ids(self) -> np.ndarray:
+        return self._tiep_pair_key_ids
+
+    def get_tiep_pair_times(self) -> np.ndarray:
+        return self._tiep_pair_times
+
+    def get_first_tieps_with_key(self, tiep_key: tuple) -> tuple[np.ndarray, np.ndarray]:
+        """
+        This function returns the time points that include a tiep with the given key (type and symbol id),
+        with the first tiep with the key in each of them (as the first tiep that is the same tiep in a time point)
+        :param tiep_key: the key of the tiep
+        :return: the sorted offsets of the time points, and the index of the first tiep with the key in each of them
+        """
+        if tiep_key not in self._first_tieps_with_key:
+            tiep_type, sym_id = tiep_key
+            tiep_indices = np.flatnonzero((self._tiep_types == tiep_type) & (self._tiep_sym_ids == sym_id))
+            tp_offsets, first_indices = np.unique(self._tiep_tp_offsets[tiep_indices], return_index=True)
+            self._first_tieps_with_key[tiep_key] = (tp_offsets, tiep_indices[first_indices])
+        return self._first_tieps_with_key[tiep_key]
+
+    def is_start_type(self, tiep_indices: np.ndarray) -> np.ndarray:
+        # returns True for the given tieps that are starting tieps
+        return self._tiep_types[tiep_indices] == const.START_TIEP_CODE
+
+    def is_end_type(self, tiep_indices: np.ndarray) -> np.ndarray:
+        # returns True for the given tieps that are ending tieps
+        return self._tiep_types[tiep_indices] == const.END_TIEP_CODE
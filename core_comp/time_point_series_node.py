@@ -0,0 +1,116 @@
+from typing import Iterator, Optional
+
+import const
+from core_comp.tiep import Tiep
+from core_comp.time_point import TimePoint
+
+
+class TimePointSeriesNode:
+    """
+    A persistent time point series that is represented by its last time point and a link to the series of the
+    previous time points (its parent), thus extending the series by a time point creates a single node
+    and shares the previous time points with the extended series.
+    Each node keeps the start tieps in the series that their end tieps are not in the series (open start tieps)
+    """
+    __slots__ = ('_entity_id', '_time_point', '_parent', '_length', '_first_time', '_open_start_tieps')
+
+    def __init__(self, entity_id, time_point: TimePoint, parent=None):
+        self._entity_id = entity_id
+        self._time_point: TimePoint = time_point
+        self._parent: Optional[TimePointSeriesNode] = parent
+        self._length: int = 1 if parent is None else parent._length + 1
+        self._first_time: int = time_point.get_time() if parent is None else parent._first_time
+        self._open_start_tieps: tuple[Tiep] = self._get_open_start_tieps()
+
+    def extend(self, time_point: TimePoint):
+        # returns a new series with the given time point as its last time point
+        return TimePointSeriesNode(entity_id=self._entity_id, time_point=time_point, parent=self)
+
+    def get_entity_id(self):
+        return self._entity_id
+
+    def get_parent(self):
+        return self._parent
+
+    def get_time_point_series(self) -> list[TimePoint]:
+        # returns the time points of the series from the first to the last
+        time_points = list(self._iter_time_points_reversed())
+        time_points.reverse()
+        return time_points
+
+    def iter_time_points(self) -> Iterator[TimePoint]:
+        return iter(self.get_time_point_series())
+
+    def get_num_of_time_points(self) -> int:
+        return self._length
+
+    def get_first_time_point_time(self) -> int:
+        # returns the time of the first time point in the time point series
+        return self._first_time
+
+    def get_last_time_point_time(self) -> int:
+        # returns the time of the last time point in the time point series
+        return self._time_point.get_time()
+
+    def get_open_start_tieps(self) -> tuple[Tiep]:
+        # returns the start tieps in the series that their end tieps are not in the series
+        return self._open_start_tieps
+
+    def get_durations_between_all_tieps(self) -> list[int]:
+        # returns list of duration between the tieps
+        times = [time_point.get_time() for time_point in self.get_time_point_series()]
+        return [times[i + 1] - times[i] for i in range(len(times) - 1)]
+
+    def get_duration_between_adj_tieps(self, first_tiep_index) -> int:
+        # returns the duration between the given tiep and its follows tiep
+        return self.get_durations_between_all_tieps()[first_tiep_index]
+
+    def is_tiep_instance_exist(self, tiep: Tiep) -> bool:
+        # returns true if the given tiep exists in the time point series
+        tiep_inst_key = tiep.get_instance_key()
+        for time_point in self._iter_time_points_reversed():
+            for tp_tiep in time_point.get_tieps():
+                if tp_tiep.get_instance_key() == tiep_inst_key:
+                    return True
+        return False
+
+    def are_end_tieps_closed_their_start_tieps(self, time_point: TimePoint) -> bool:
+        # this function checks if an end tiep ends the last start tiep with the same symbol of the prev instance
+        for tiep in time_point.get_tieps():
+            if tiep.is_end_type():
+                paired_start_tiep = tiep.get_pair_tiep()
+                if not self.is_tiep_instance_exist(paired_start_tiep):
+                    return False
+        return True
+
+    def are_kept_unfinished_stis(self, time_point: TimePoint) -> bool:
+        # this function checks which STIs should be unfinished in the TIRP-prefix
+        # and for each validate they will be unfinished in case of extension
+        new_tp_time = time_point.get_time()
+        for start_tiep in self._open_start_tieps:
+            # for each open start tiep in the time point series, check if it should be unfinished:
+            # if it's end time is before the new time point time, it should be included in the series
+            if start_tiep.get_pair_tiep().get_time() < new_tp_time:
+                return False
+        return True
+
+    def get_tiep_str(self) -> str:
+        # returns a str representation of the tiep point series
+        return const.REL_TIEP.join(time_point.get_tiep_str() for time_point in self.get_time_point_series())
+
+    def _iter_time_points_reversed(self) -> Iterator[TimePoint]:
+        # iterates over the time points of the series from the last to the first
+        node = self
+        while node is not None:
+            yield node._time_point
+            node = node._parent
+
+    def _get_open_start_tieps(self) -> tuple[Tiep]:
+        # this function returns the open start tieps of the parent that are not ended by the last time point,
+        # with the start tieps of the last time point (an end tiep is always after its start tiep)
+        closed_keys = {tiep.get_pair_tiep().get_instance_key() for tiep in self._time_point.get_tieps()
+                       if tiep.is_end_type() and tiep.get_pair_tiep() is not None}
+        parent_open_start_tieps = () if self._parent is None else self._parent._open_start_tieps
+        return tuple(tiep for tiep in parent_open_start_tieps if tiep.get_instance_key() not in closed_keys) + \
+            tuple(tiep for tiep in self._time_point.get_tieps()
+                  if tiep.is_start_type() and tiep.get_pair_tiep() is not None)
@@ -0,0 +1,64 @@
+import unittest
+
+import const
+from core_comp.sti import STI
+from core_comp.sti_series import STISeries
+from core_comp.tiep import Tiep
+from core_comp.time_point import TimePoint
+from core_comp.time_point_series_node import TimePointSeriesNode
+
+
+class TestTimePointSeriesNode(unittest.TestCase):
+
+    def test_extend(self):
+        """
+        STI Series:
+         --1---
+            ---2------
+                  -1-
+
+        Time Point Series:
+        +1[2]<+2[4]<-1[6]<+1[8]<-1[10]<-2[12]
+
+        This function tests that extending a series shares its time points and keeps the checks of the extension
+        """
+        stis_list: list[STI] = [
+            self._create_sti_instance(start_time=2, end_time=6, sym_id=1, sym_inst_id=1, var_id=1),
+            self._create_sti_instance(start_time=4, end_time=12, sym_id=2, sym_inst_id=1, var_id=2),
+            self._create_sti_instance(start_time=8, end_time=10, sym_id=1, sym_inst_id=2, var_id=1),
+        ]
+        time_points = STISeries(series_id=0, stis_list=stis_list).get_time_points().get_time_point_series()
+        tieps = [time_point.get_tieps()[0] for time_point in time_points]
+
+        first = TimePointSeriesNode(entity_id=0, time_point=time_points[0])  # +1[2]
+        self.assertTrue(first.is_tiep_instance_exist(tieps[0]))
+        self.assertFalse(first.is_tiep_instance_exist(tieps[1]))
+        self.assertTrue(first.are_kept_unfinished_stis(time_points[1]))
+        self.assertFalse(first.are_kept_unfinished_stis(time_points[3]))  # +1[2] should be finished at 6
+
+        inst = first.extend(time_points[1]).extend(time_points[2])  # +1[2]<+2[4]<-1[6]
+        self.assertEqual(inst.get_tiep_str(), '+1[2]<+2[4]<-1[6]')
+        self.assertEqual(first.get_tiep_str(), '+1[2]')
+        self.assertIs(inst.get_parent().get_parent(), first)
+        self.assertEqual(inst.get_entity_id(), 0)
+        self.assertEqual(inst.get_num_of_time_points(), 3)
+        self.assertEqual(inst.get_first_time_point_time(), 2)
+        self.assertEqual(inst.get_last_time_point_time(), 6)
+        self.assertEqual(inst.get_durations_between_all_tieps(), [2, 2])
+        self.assertTrue(inst.are_end_tieps_closed_their_start_tieps(time_points[5]))
+        self.assertFalse(inst.are_end_tieps_closed_their_start_tieps(time_points[4]))  # -1[10] ends +1[8]
+        self.assertTrue(inst.are_kept_unfinished_stis(time_points[3]))
+        self.assertFalse(inst.are_kept_unfinished_stis(TimePoint(time=14)))  # +2[4] should be finished at 12
+
+    def _create_sti_instance(self, start_time, end_time, sym_id, sym_inst_id, var_id) -> STI:
+        start_tiep = Tiep(time=start_time, tiep_type=const.START_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                          var_id=var_id)
+        end_tiep = Tiep(time=end_time, tiep_type=const.END_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id, var_id=var_id)
+        start_tiep.add_pair_tiep(end_tiep)
+        end_tiep.add_pair_tiep(start_tiep)
+
+        return STI(start_tiep, end_tiep)
+
+
+if __name__ == '__main__':
+    unittest.main()
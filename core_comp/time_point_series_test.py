@@ -0,0 +1,95 @@
+import unittest
+
+import const
+from core_comp.sti import STI
+from core_comp.sti_series import STISeries
+from core_comp.tiep import Tiep
+from core_comp.time_point import TimePoint
+from core_comp.time_point_series import TimePointSeries
+
+
+class TestTimePointSeries(unittest.TestCase):
+
+    def test_tiep_index(self):
+        """
+        STI Series:
+         --1---
+            ---2------
+                  -1-
+
+        Time Point Series:
+        +1[2]<+2[4]<-1[6]<+1[8]<-1[10]<-2[12]
+
+        This function tests that the index of the tieps instances is updated when the time points are added
+        """
+        stis_list: list[STI] = [
+            self._create_sti_instance(start_time=2, end_time=6, sym_id=1, sym_inst_id=1, var_id=1),
+            self._create_sti_instance(start_time=4, end_time=12, sym_id=2, sym_inst_id=1, var_id=2),
+            self._create_sti_instance(start_time=8, end_time=10, sym_id=1, sym_inst_id=2, var_id=1),
+        ]
+        time_points = STISeries(series_id=0, stis_list=stis_list).get_time_points().get_time_point_series()
+        tieps = [time_point.get_tieps()[0] for time_point in time_points]
+
+        tps = TimePointSeries(entity_id=0)
+        tps.add_time_point(time_points[0])  # +1[2]
+        self.assertTrue(tps.is_tiep_instance_exist(tieps[0]))
+        self.assertFalse(tps.is_tiep_instance_exist(tieps[1]))
+        self.assertTrue(tps.are_kept_unfinished_stis(time_points[1]))
+        self.assertFalse(tps.are_kept_unfinished_stis(time_points[3]))  # +1[2] should be finished at 6
+
+        tps.add_time_point(time_points[1])  # +2[4]
+        tps.add_time_point(time_points[2])  # -1[6]
+        self.assertTrue(tps.is_tiep_instance_exist(tieps[1]))
+        self.assertTrue(tps.is_tiep_instance_exist(tieps[2]))
+        self.assertTrue(tps.are_end_tieps_closed_their_start_tieps(time_points[5]))
+        self.assertFalse(tps.are_end_tieps_closed_their_start_tieps(time_points[4]))  # -1[10] ends +1[8]
+        self.assertTrue(tps.are_kept_unfinished_stis(time_points[3]))
+        self.assertFalse(tps.are_kept_unfinished_stis(TimePoint(time=14)))  # +2[4] should be finished at 12
+
+        # the index of a series that was created from its tieps is created on the first check
+        full_tps = STISeries(series_id=0, stis_list=stis_list).get_time_points()
+        for tiep in tieps:
+            self.assertTrue(full_tps.is_tiep_instance_exist(tiep))
+
+    def test_time_points_at_view(self):
+        """
+        This function tests that the view of the time points before a given time has the same time points
+        as filtering the time point series by the time
+        :return:
+        """
+        stis_list: list[STI] = [
+            self._create_sti_instance(start_time=2, end_time=6, sym_id=1, sym_inst_id=1, var_id=1),
+            self._create_sti_instance(start_time=4, end_time=12, sym_id=2, sym_inst_id=1, var_id=2),
+            self._create_sti_instance(start_time=8, end_time=10, sym_id=1, sym_inst_id=2, var_id=1),
+        ]
+        sti_series = STISeries(series_id=3, stis_list=stis_list)
+        time_points = sti_series.get_time_points().get_time_point_series()
+        for until_time in range(0, 15):
+            view = sti_series.get_time_points_at(until_time=until_time)
+            expected_time_points = [tp for tp in time_points if tp.get_time() < until_time]
+            self.assertEqual(view.get_entity_id(), 3)
+            self.assertEqual(view.get_time_point_series(), expected_time_points)
+            self.assertEqual(list(view.iter_time_points()), expected_time_points)
+            self.assertEqual(view.get_num_of_time_points(), len(expected_time_points))
+            if expected_time_points:
+                self.assertEqual(view.get_last_time_point_time(), expected_time_points[-1].get_time())
+        self.assertEqual(sti_series.get_time_points_at(until_time=9).get_tiep_str(), '+1[2]<+2[4]<-1[6]<+1[8]')
+
+        start_1 = Tiep(time=-1, tiep_type=const.START_TIEP, sym_id=1, sym_inst_id=1, var_id=1, dummy=True)
+        self.assertEqual([tp.get_time() for tp in sti_series.get_time_points().iter_time_points_with_tieps([start_1])],
+                         [2, 8])
+        self.assertEqual([tp.get_time() for tp in
+                          sti_series.get_time_points_at(until_time=8).iter_time_points_with_tieps([start_1])], [2])
+
+    def _create_sti_instance(self, start_time, end_time, sym_id, sym_inst_id, var_id) -> STI:
+        start_tiep = Tiep(time=start_time, tiep_type=const.START_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                          var_id=var_id)
+        end_tiep = Tiep(time=end_time, tiep_type=const.END_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id, var_id=var_id)
+        start_tiep.add_pair_tiep(end_tiep)
+        end_tiep.add_pair_tiep(start_tiep)
+
+        return STI(start_tiep, end_tiep)
+
+
+if __name__ == '__main__':
+    unittest.main()
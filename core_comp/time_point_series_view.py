@@ -0,0 +1,55 @@
+from bisect import bisect_left
+from itertools import islice
+from typing import Iterator
+
+import const
+from core_comp.tiep import Tiep
+from core_comp.time_point import TimePoint
+from core_comp.time_point_series import TimePointSeries
+from core_comp.time_point_series_arrays import TimePointSeriesArrays
+
+
+class TimePointSeriesView:
+    """
+    A view of the time points of a time point series that occurred before a given time.
+    The view wraps the existing time points list of the series with an end offset, thus nothing is copied
+    """
+    def __init__(self, time_point_series: TimePointSeries, until_time: int):
+        self._time_point_series: TimePointSeries = time_point_series
+        self._end_offset: int = self._get_end_offset(time_point_series.get_time_point_series(), until_time)
+
+    def get_entity_id(self):
+        return self._time_point_series.get_entity_id()
+
+    def get_time_point_series(self) -> list[TimePoint]:
+        # returns a copy of the time points in the view (iter_time_points should be used to avoid the copy)
+        return self._time_point_series.get_time_point_series()[:self._end_offset]
+
+    def iter_time_points(self) -> Iterator[TimePoint]:
+        return islice(self._time_point_series.get_time_point_series(), self._end_offset)
+
+    def get_tiep_arrays(self) -> TimePointSeriesArrays:
+        # returns the encoding of the whole series as arrays, only its first get_num_of_time_points() are in the view
+        return self._time_point_series.get_tiep_arrays()
+
+    def iter_time_points_with_tieps(self, tieps: list[Tiep]) -> Iterator[TimePoint]:
+        # returns the time points in the view that include a tiep with the key of the rarest given tiep
+        offsets = self._time_point_series.get_rarest_tiep_offsets(tieps)
+        time_points = self._time_point_series.get_time_point_series()
+        return (time_points[offset] for offset in islice(offsets, bisect_left(offsets, self._end_offset)))
+
+    def get_num_of_time_points(self) -> int:
+        return self._end_offset
+
+    def get_last_time_point_time(self) -> int:
+        # returns the time of the last time point in the view
+        return self._time_point_series.get_time_point_series()[self._end_offset - 1].get_time()
+
+    def get_tiep_str(self) -> str:
+        # returns a str representation of the tiep point series in the view
+        return const.REL_TIEP.join(time_point.get_tiep_str() for time_point in self.iter_time_points())
+
+    @staticmethod
+    def _get_end_offset(time_points: list[TimePoint], until_time: int) -> int:
+        # returns the number of the time points that before the given time using binary search on the sorted times
+        return bisect_left(time_points, until_time, key=TimePoint.get_time)
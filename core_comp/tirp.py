@@ -9,12 +9,15 @@ class TIRP:
     Time intervals-related pattern (TIRP).
     """
 
-    def __init__(self, stis: list[int], temp_rels: list[str], vs: float, hs: float):
+    def __init__(self, stis: list[int], temp_rels: list[str], vs: float, hs: float,
+                 sorted_tieps: list[list[Tiep]] = None):
         """
         :param stis: a list that represents all the STIs of the pattern in lexicography order
         :param temp_rels: a list that represents the temporal relations of the pattern
         :param vs: vertical support
         :param hs: horizontal support
+        :param sorted_tieps: the already sorted tieps of the pattern (e.g., from a compiled catalog),
+        if not provided they are sorted by the temporal relations
 
         A one dimensional array that represents a two-diminutions array of the half matrix presented in Robert's paper:
             B   C   D
@@ -39,7 +42,10 @@ class TIRP:
         self.hs: float = hs
 
         self.tiep_comparison: dict = {1: [], 0: [], -1: []}
-        self.sorted_tieps: list[list[Tiep]] = self._get_tiep_order()
+        if sorted_tieps is None:
+            self.sorted_tieps: list[list[Tiep]] = self._get_tiep_order()
+        else:
+            self.sorted_tieps: list[list[Tiep]] = sorted_tieps
 
         self._check_input_validity()
 
@@ -102,9 +108,7 @@ class TIRP:
         elif early_sti_id >= later_sti_id:
             raise Exception('The STI later index mush be greater than the STI earlier index')
         else:
-            column_starting_index = 0
-            for i in range(0, later_sti_id):
-                column_starting_index += i
+            column_starting_index = later_sti_id * (later_sti_id - 1) // 2  # equals to 0 + 1 + ... + (later_sti_id - 1)
             relation_index = column_starting_index + early_sti_id
             return self.temp_rels[relation_index]
 
@@ -114,7 +118,7 @@ class TIRP:
             if len(tps) > 1:
                 tiep_str += '('
             for tp in tps:
-                tiep_str += f'{tp._tiep_type}{tp._sym_id}'
+                tiep_str += f'{tp.get_tiep_type()}{tp.get_symbol_id()}'
             if len(tps) > 1:
                 tiep_str += ')'
             if i != len(self.sorted_tieps) - 1:
@@ -306,28 +310,15 @@ class TIRP:
         For example: [[1,2], [2,3], [1,3], [5,6]] --> [[1,2,3], [5,6]]
         :return: a list of co-occurred tieps
         """
-        co_occur_tieps = self.tiep_comparison[0].copy()
-        is_changed = True
-        while is_changed:
-            is_changed = self._merge_pair(co_occur_tieps=co_occur_tieps)
-        return co_occur_tieps
-
-    @staticmethod
-    def _merge_pair(co_occur_tieps):
-        """
-        This function takes all the co-occurrence tieps and merges only one pair, then remove one occurrence
-        :param co_occur_tieps:  co-occurrence endpoints
-        :return: True if the list changed
-        """
-        for i in range(len(co_occur_tieps) - 1):
-            for j in range(i + 1, len(co_occur_tieps)):
-                first_set = set(co_occur_tieps[i])
-                second_set = set(co_occur_tieps[j])
-                if first_set.intersection(second_set):
-                    co_occur_tieps[i] = co_occur_tieps[i] + list(second_set.difference(first_set))
-                    del co_occur_tieps[j]
-                    return True
-        return False
+        co_occur_tieps: list[set] = []
+        for tieps_pair in self.tiep_comparison[0]:
+            merged_tieps = set(tieps_pair)
+            # merges all the groups that overlap with the pair into a single group
+            for tieps_group in [group for group in co_occur_tieps if not group.isdisjoint(merged_tieps)]:
+                merged_tieps.update(tieps_group)
+                co_occur_tieps.remove(tieps_group)
+            co_occur_tieps.append(merged_tieps)
+        return [list(tieps_group) for tieps_group in co_occur_tieps]
 
     def _check_input_validity(self):
         # This function checks the validity of the input and assert in case of wrong input
@@ -3,82 +3,227 @@ from core_comp.sti import STI
 from core_comp.sti_db import STIDB
 from core_comp.sti_series import STISeries
 from core_comp.tiep import Tiep
+from input import sti_cache, tirp_catalog
+import numpy as np
 import pandas as pd
-import ast
+from typing import Iterator
 
 from core_comp.tirp import TIRP
 
 
-def read_patterns_file(file_path) -> list[TIRP]:
+def read_patterns_file(file_path, use_catalog: bool = const.TIRP_USE_CATALOG) -> list[TIRP]:
     """
-    this function read the patterns file and creates list of TIRP objects
+    this function read the patterns file and creates list of TIRP objects.
+    When the catalog is used, the TIRPs are compiled once into a catalog next to the patterns file,
+    and later reads of the same file content load the TIRPs with their sorted tieps from the catalog.
+    :param file_path: path of the file
+    :param use_catalog: whether to read and write the compiled catalog of the file
+    :return: list of TIRP objects
+    """
+    if not use_catalog:
+        return _parse_patterns_file(file_path)
+
+    source_hash = sti_cache.get_file_hash(file_path)
+    catalog_path = tirp_catalog.get_tirp_catalog_path(file_path)
+    tirp_list = tirp_catalog.read_tirp_catalog(catalog_path=catalog_path, source_hash=source_hash)
+    if tirp_list is None:
+        tirp_list = _parse_patterns_file(file_path)
+        try:
+            tirp_catalog.write_tirp_catalog(catalog_path=catalog_path, source_hash=source_hash, tirps=tirp_list)
+        except OSError as e:
+            print(f'Could not write the TIRP catalog {catalog_path}: {e}')
+    return tirp_list
+
+
+def _parse_patterns_file(file_path) -> list[TIRP]:
+    """
+    this function parses the patterns file into TIRP objects.
+    The patterns are filtered by their last STI with vectorized string operations,
+    thus only the relevant patterns are parsed and created.
     :param file_path: path of the file
     :return: list of TIRP objects
     """
     tirp_list = []
     pat_df = pd.read_csv(file_path)
-    for index, row in pat_df.iterrows():
-        sti_list = ast.literal_eval(row[const.PAT_STIS_COL_NAME])
-        rel_list = ast.literal_eval(row[const.PAT_TEMP_RELS_COL_NAME])
-        vs = row[const.PAT_TEMP_VS_COL_NAME]
-        hs = row[const.PAT_TEMP_HS_COL_NAME]
-        if len(sti_list) <= 1 or sti_list[-1] != const.EVENT_INDEX:
-            # relevant only if the pattern ends with the event of interest
-            continue
-        else:
-            tirp = TIRP(stis=sti_list, temp_rels=rel_list, vs=vs, hs=hs)
-            for i in range(len(sti_list)-1):
-                rel_with_event = tirp.get_temp_rel_by_sti_ids(i, len(sti_list) - 1)
-                if rel_with_event not in {const.TEMP_REL_BEFORE, const.TEMP_REL_MEETS}:
-                    print('Temporal relations with the event of interest must be before or meets')
-                    continue
-            tirp_list.append(tirp)
+    stis_str = pat_df[const.PAT_STIS_COL_NAME].str.strip()
+    last_sti = pd.to_numeric(stis_str.str.rsplit(',', n=1).str[-1].str.strip('[] '), errors='coerce')
+    # relevant only if the pattern ends with the event of interest
+    is_relevant = stis_str.str.contains(',', regex=False) & (last_sti == const.EVENT_INDEX)
+    pat_df = pat_df[is_relevant]
+
+    for sti_str, rel_str, vs, hs in zip(pat_df[const.PAT_STIS_COL_NAME].tolist(),
+                                        pat_df[const.PAT_TEMP_RELS_COL_NAME].tolist(),
+                                        pat_df[const.PAT_TEMP_VS_COL_NAME].tolist(),
+                                        pat_df[const.PAT_TEMP_HS_COL_NAME].tolist()):
+        sti_list = _parse_list_str(sti_str, item_type=int)
+        rel_list = _parse_list_str(rel_str, item_type=str)
+        tirp = TIRP(stis=sti_list, temp_rels=rel_list, vs=vs, hs=hs)
+        for i in range(len(sti_list) - 1):
+            rel_with_event = tirp.get_temp_rel_by_sti_ids(i, len(sti_list) - 1)
+            if rel_with_event not in {const.TEMP_REL_BEFORE, const.TEMP_REL_MEETS}:
+                print('Temporal relations with the event of interest must be before or meets')
+        tirp_list.append(tirp)
     return tirp_list
 
 
-def read_sti_file(file_path) -> STIDB:
+def _parse_list_str(list_str: str, item_type: type) -> list:
+    """
+    this function parses the str representation of a list in the patterns file
+    :param list_str: the str representation, for example: "[1, 4, 999]" or "['c', 'b', 'b']"
+    :param item_type: the type of the items in the list (int or str)
+    :return: the parsed list
+    """
+    items = [item.strip() for item in list_str.strip()[1:-1].split(',')]
+    if item_type is str:
+        return [item.strip('\'"') for item in items if item]
+    return [item_type(item) for item in items if item]
+
+
+def read_sti_file(file_path, use_cache: bool = const.STI_USE_CACHE) -> STIDB:
     """
     this function reads the STIs data and creates relevant objects.
+    When the cache is used, the parsed STIs are written to a binary cache file next to the STI file,
+    and later reads of the same file content load the cache instead of parsing the CSV again.
     :param file_path: path of the file
+    :param use_cache: whether to read and write the binary cache of the file
     :return: STIDB: list of STI series
     """
-    sti_df = pd.read_csv(file_path)
+    if not use_cache:
+        return _create_sti_db(**_parse_sti_file(file_path))
+
+    source_hash = sti_cache.get_file_hash(file_path)
+    cache_path = sti_cache.get_sti_cache_path(file_path)
+    sti_arrays = sti_cache.read_sti_cache(cache_path=cache_path, source_hash=source_hash)
+    if sti_arrays is None:
+        sti_arrays = _parse_sti_file(file_path)
+        try:
+            sti_cache.write_sti_cache(cache_path=cache_path, source_hash=source_hash, sti_arrays=sti_arrays)
+        except OSError as e:
+            print(f'Could not write the STI cache file {cache_path}: {e}')
+    return _create_sti_db(**sti_arrays)
+
+
+def iter_sti_file(file_path, chunk_size: int = const.STI_STREAM_CHUNK_SIZE) -> Iterator[STISeries]:
+    """
+    this function reads an STIs data file, in which the rows of each series are consecutive (e.g., sorted by the
+    series id), chunk by chunk and yields one STI series at a time.
+    Thus, the memory is bounded by the largest series rather than the file size.
+    :param file_path: path of the file
+    :param chunk_size: number of rows to read in each chunk
+    :return: iterator of STI series
+    """
+    read_series_ids = set()
+    pending_df = None  # the rows of the last series in the previous chunk, which may continue in the next chunk
+    for chunk_df in pd.read_csv(file_path, chunksize=chunk_size):
+        if chunk_df.empty:  # e.g., a file with only the header
+            continue
+        if pending_df is not None:
+            chunk_df = pd.concat([pending_df, chunk_df], ignore_index=True)
+
+        series_ids = chunk_df[const.STI_DATA_SERIES_ID_COL_NAME].to_numpy()
+        series_starts = _get_series_bounds(series_ids)[0]
+        chunk_series_ids = series_ids[series_starts].tolist()
+        if len(set(chunk_series_ids)) != len(chunk_series_ids) or not read_series_ids.isdisjoint(chunk_series_ids):
+            raise Exception('The rows of each series should be consecutive in the STIs data file')
+        read_series_ids.update(chunk_series_ids[:-1])
+
+        pending_df = chunk_df.iloc[series_starts[-1]:]
+        yield from _iter_sti_series(**_parse_sti_df(chunk_df.iloc[:series_starts[-1]]))
+
+    if pending_df is not None:
+        yield from _iter_sti_series(**_parse_sti_df(pending_df))
+
+
+def _parse_sti_file(file_path) -> dict:
+    # this function parses the STIs data into columnar arrays
+    return _parse_sti_df(pd.read_csv(file_path))
+
+
+def _parse_sti_df(sti_df: pd.DataFrame) -> dict:
+    """
+    this function parses the STIs data into columnar arrays.
+    The rows are sorted once and the symbol instance ids are computed with a vectorized cumulative count.
+    :param sti_df: the STIs data
+    :return: the columnar arrays of the STIs sorted by the series id
+    """
     sti_df = sti_df.sort_values(by=[const.STI_DATA_SERIES_ID_COL_NAME,
                                     const.STI_DATA_START_TIME_COL_NAME,
                                     const.STI_DATA_END_TIME_COL_NAME,
                                     const.STI_DATA_SYM_ID_COL_NAME])
 
-    series_list = []
-    for series_id in sti_df[const.STI_DATA_SERIES_ID_COL_NAME].unique():
-        # iterates over the series id in the dataframe
-        stis_list = []
-        symbol_inst_id = {}
-
-        series_df = sti_df[sti_df[const.STI_DATA_SERIES_ID_COL_NAME] == series_id]
-        for index, row in series_df.iterrows():
-            # iterates over the rows in the dataframe
-            symbol_id = int(row[const.STI_DATA_SYM_ID_COL_NAME])
-            var_id = int(row[const.STI_DATA_VAR_ID_COL_NAME])
-            start_time = int(row[const.STI_DATA_START_TIME_COL_NAME])
-            end_time = int(row[const.STI_DATA_END_TIME_COL_NAME])
-
-            if symbol_id not in symbol_inst_id:
-                symbol_inst_id[symbol_id] = 1
-            else:
-                symbol_inst_id[symbol_id] += 1
-
-            start_tiep = Tiep(time=start_time, tiep_type=const.START_TIEP,
-                              sym_id=symbol_id, sym_inst_id=symbol_inst_id[symbol_id], var_id=var_id)
-            end_tiep = Tiep(time=end_time, tiep_type=const.END_TIEP,
-                            sym_id=symbol_id, sym_inst_id=symbol_inst_id[symbol_id], var_id=var_id)
-            start_tiep.add_pair_tiep(tiep=end_tiep)
-            end_tiep.add_pair_tiep(tiep=start_tiep)
-
-            sti = STI(start_tiep=start_tiep, end_tiep=end_tiep)
-            stis_list.append(sti)
-
-        # create STI series and append to a list
-        sti_series = STISeries(series_id=series_id, stis_list=stis_list)
-        series_list.append(sti_series)
+    # each STI of a symbol gets the next instance id of that symbol in its series (starting from one)
+    sym_inst_ids = sti_df.groupby([const.STI_DATA_SERIES_ID_COL_NAME, const.STI_DATA_SYM_ID_COL_NAME],
+                                  sort=False).cumcount().to_numpy() + 1
+
+    return {'series_ids': sti_df[const.STI_DATA_SERIES_ID_COL_NAME].to_numpy(),
+            'var_ids': sti_df[const.STI_DATA_VAR_ID_COL_NAME].to_numpy(),
+            'sym_ids': sti_df[const.STI_DATA_SYM_ID_COL_NAME].to_numpy(),
+            'start_times': sti_df[const.STI_DATA_START_TIME_COL_NAME].to_numpy(),
+            'end_times': sti_df[const.STI_DATA_END_TIME_COL_NAME].to_numpy(),
+            'sym_inst_ids': sym_inst_ids}
+
+
+def _get_series_bounds(series_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # returns the first (inclusive) and last (exclusive) row of each series in rows sorted by the series id
+    if len(series_ids) == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    series_starts = np.flatnonzero(np.r_[True, series_ids[1:] != series_ids[:-1]])
+    series_ends = np.r_[series_starts[1:], len(series_ids)]
+    return series_starts, series_ends
 
+
+def _create_sti_db(series_ids: np.ndarray, var_ids: np.ndarray, sym_ids: np.ndarray, start_times: np.ndarray,
+                   end_times: np.ndarray, sym_inst_ids: np.ndarray) -> STIDB:
+    # this function creates the STIDB from columnar arrays of STIs sorted by the series id
+    series_list = list(_iter_sti_series(series_ids=series_ids, var_ids=var_ids, sym_ids=sym_ids,
+                                        start_times=start_times, end_times=end_times, sym_inst_ids=sym_inst_ids))
     return STIDB(sti_series_list=series_list)
+
+
+def _iter_sti_series(series_ids: np.ndarray, var_ids: np.ndarray, sym_ids: np.ndarray, start_times: np.ndarray,
+                     end_times: np.ndarray, sym_inst_ids: np.ndarray) -> Iterator[STISeries]:
+    """
+    this function creates the STI series from columnar arrays of STIs sorted by the series id,
+    the objects are created in a single linear pass over the STIs
+    :param series_ids: the series id of each STI
+    :param var_ids: the variable id of each STI
+    :param sym_ids: the symbol id of each STI
+    :param start_times: the start time of each STI
+    :param end_times: the end time of each STI
+    :param sym_inst_ids: the symbol instance id of each STI in its series
+    :return: iterator of STI series
+    """
+    var_ids = var_ids.astype(np.int64).tolist()
+    sym_ids = sym_ids.astype(np.int64).tolist()
+    start_times = start_times.astype(np.int64).tolist()
+    end_times = end_times.astype(np.int64).tolist()
+    sym_inst_ids = sym_inst_ids.astype(np.int64).tolist()
+
+    series_starts, series_ends = _get_series_bounds(series_ids)
+    for first, last in zip(series_starts.tolist(), series_ends.tolist()):
+        # iterates over the series in the sorted rows
+        yield _create_sti_series(series_id=series_ids[first],
+                                 var_ids=var_ids[first:last],
+                                 sym_ids=sym_ids[first:last],
+                                 start_times=start_times[first:last],
+                                 end_times=end_times[first:last],
+                                 sym_inst_ids=sym_inst_ids[first:last])
+
+
+def _create_sti_series(series_id, var_ids: list[int], sym_ids: list[int], start_times: list[int],
+                       end_times: list[int], sym_inst_ids: list[int]) -> STISeries:
+    # this function creates the STI series of a single entity from its STIs' values
+    stis_list = []
+    for var_id, symbol_id, start_time, end_time, sym_inst_id in zip(var_ids, sym_ids, start_times,
+                                                                    end_times, sym_inst_ids):
+        start_tiep = Tiep(time=start_time, tiep_type=const.START_TIEP,
+                          sym_id=symbol_id, sym_inst_id=sym_inst_id, var_id=var_id)
+        end_tiep = Tiep(time=end_time, tiep_type=const.END_TIEP,
+                        sym_id=symbol_id, sym_inst_id=sym_inst_id, var_id=var_id)
+        start_tiep.add_pair_tiep(tiep=end_tiep)
+        end_tiep.add_pair_tiep(tiep=start_tiep)
+
+        sti = STI(start_tiep=start_tiep, end_tiep=end_tiep)
+        stis_list.append(sti)
+
+    return STISeries(series_id=series_id, stis_list=stis_list)
@@ -0,0 +1,209 @@
+import os
+import tempfile
+import unittest
+
+import const
+from core_comp.sti_db import STIDB
+from core_comp.tirp import TIRP
+from input import read_files, sti_cache, tirp_catalog
+
+
+class TestReadFiles(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._sti_path = os.path.join(self._tmp_dir.name, 'sti.csv')
+        self._write_csv(self._sti_path, rows=[
+            # SeriesID,VarID,SymbolID,StartTime,EndTime
+            '2.0,1.0,3.0,10.0,12.0',
+            '1.0,1.0,3.0,20.0,25.0',
+            '1.0,2.0,4.0,5.0,9.0',
+            '1.0,1.0,3.0,2.0,8.0',
+            '2.0,1.0,3.0,1.0,4.0',
+            '1.0,999.0,999.0,30.0,31.0',
+        ])
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_read_sti_file(self):
+        """
+        This function tests that the STIs are split into series, sorted and get the symbol instance ids by their order
+        :return:
+        """
+        sti_db: STIDB = read_files.read_sti_file(self._sti_path, use_cache=False)
+        self.assertEqual(self._get_series_values(sti_db), {
+            1.0: [(2, 8, 3, 1, 1), (5, 9, 4, 1, 2), (20, 25, 3, 2, 1), (30, 31, 999, 1, 999)],
+            2.0: [(1, 4, 3, 1, 1), (10, 12, 3, 2, 1)],
+        })
+
+        sti_series = sti_db.get_sti_series()[0]
+        self.assertEqual(sti_series.get_time_points().get_tiep_str(),
+                         '+3[2]<+4[5]<-3[8]<-4[9]<+3[20]<-3[25]<+999[30]<-999[31]')
+        for tiep in sti_series.get_tieps().get_tiep_list():
+            self.assertEqual(tiep.get_pair_tiep().get_pair_tiep(), tiep)
+
+    def test_read_sti_file_cache(self):
+        """
+        This function tests that the STI cache is written, reused, and invalidated when the file content is changed
+        :return:
+        """
+        expected_values = self._get_series_values(read_files.read_sti_file(self._sti_path, use_cache=False))
+        cache_path = sti_cache.get_sti_cache_path(self._sti_path)
+        self.assertFalse(os.path.isfile(cache_path))
+
+        self.assertEqual(self._get_series_values(read_files.read_sti_file(self._sti_path)), expected_values)
+        self.assertTrue(os.path.isfile(cache_path))
+        self.assertEqual(self._get_series_values(read_files.read_sti_file(self._sti_path)), expected_values)
+
+        self._write_csv(self._sti_path, rows=['3.0,1.0,3.0,1.0,4.0'])
+        self.assertEqual(self._get_series_values(read_files.read_sti_file(self._sti_path)),
+                         {3.0: [(1, 4, 3, 1, 1)]})
+
+        # the series ids keep their dtype in the cache (e.g., integer ids are not read back as floats)
+        self._write_csv(self._sti_path, rows=['3,1,3,1,4', '5,1,3,2,6'])
+        fresh_series_ids = [s.get_series_id() for s in read_files.read_sti_file(self._sti_path, use_cache=False)
+                            .get_sti_series()]
+        for _ in range(2):  # the first read writes the cache and the second read loads it
+            series_ids = [s.get_series_id() for s in read_files.read_sti_file(self._sti_path).get_sti_series()]
+            self.assertEqual(series_ids, fresh_series_ids)
+            self.assertEqual([type(series_id) for series_id in series_ids],
+                             [type(series_id) for series_id in fresh_series_ids])
+
+    def test_read_sti_file_corrupt_cache(self):
+        """
+        This function tests that a corrupt or truncated cache file is rebuilt instead of failing the read
+        :return:
+        """
+        expected_values = self._get_series_values(read_files.read_sti_file(self._sti_path, use_cache=False))
+        cache_path = sti_cache.get_sti_cache_path(self._sti_path)
+        read_files.read_sti_file(self._sti_path)
+        with open(cache_path, 'rb') as f:
+            cache_content = f.read()
+
+        for corrupt_content in [cache_content[:len(cache_content) // 2], b'not a cache file',
+                                cache_content[:-200] + bytes(200)]:
+            with open(cache_path, 'wb') as f:
+                f.write(corrupt_content)
+            source_hash = sti_cache.get_file_hash(self._sti_path)
+            self.assertIsNone(sti_cache.read_sti_cache(cache_path=cache_path, source_hash=source_hash))
+            self.assertEqual(self._get_series_values(read_files.read_sti_file(self._sti_path)), expected_values)
+            self.assertIsNotNone(sti_cache.read_sti_cache(cache_path=cache_path, source_hash=source_hash))
+
+    def test_iter_sti_file(self):
+        """
+        This function tests that streaming the STIs chunk by chunk yields the same series as reading the whole file
+        :return:
+        """
+        sorted_sti_path = os.path.join(self._tmp_dir.name, 'sorted_sti.csv')
+        self._write_csv(sorted_sti_path, rows=[
+            '2.0,1.0,3.0,10.0,12.0',
+            '2.0,1.0,3.0,1.0,4.0',
+            '1.0,1.0,3.0,20.0,25.0',
+            '1.0,2.0,4.0,5.0,9.0',
+            '1.0,1.0,3.0,2.0,8.0',
+            '1.0,999.0,999.0,30.0,31.0',
+        ])
+        expected_values = self._get_series_values(read_files.read_sti_file(sorted_sti_path, use_cache=False))
+        for chunk_size in [1, 2, 4, 100]:
+            sti_series_list = list(read_files.iter_sti_file(sorted_sti_path, chunk_size=chunk_size))
+            self.assertEqual([s.get_series_id() for s in sti_series_list], [2.0, 1.0])
+            self.assertEqual(self._get_series_values(STIDB(sti_series_list=sti_series_list)), expected_values)
+
+        # the rows of the series in the unsorted file are not consecutive
+        with self.assertRaises(Exception):
+            list(read_files.iter_sti_file(self._sti_path, chunk_size=2))
+
+        # a file with only the header has no series, as when reading the whole file
+        header_only_sti_path = os.path.join(self._tmp_dir.name, 'header_only_sti.csv')
+        self._write_csv(header_only_sti_path, rows=[])
+        self.assertEqual(read_files.read_sti_file(header_only_sti_path, use_cache=False).get_number_of_entities(), 0)
+        self.assertEqual(list(read_files.iter_sti_file(header_only_sti_path, chunk_size=2)), [])
+
+    def test_read_patterns_file(self):
+        """
+        This function tests that only the patterns that end with the event of interest are parsed into TIRPs
+        :return:
+        """
+        patterns_path = self._write_patterns_file()
+        tirps = read_files.read_patterns_file(patterns_path, use_catalog=False)
+        self.assertEqual([(tirp.get_stis(), tirp.get_rels(), tirp.get_vs(), tirp.get_hs()) for tirp in tirps],
+                         [([1, const.EVENT_INDEX], [const.TEMP_REL_MEETS], 0.3, 1.0),
+                          ([1, 4, const.EVENT_INDEX], [const.TEMP_REL_CONTAINS, const.TEMP_REL_BEFORE,
+                                                       const.TEMP_REL_BEFORE], 0.25, 2.0)])
+        self.assertEqual(tirps[0].get_tieps_str(), f'+1<(-1+{const.EVENT_INDEX})<-{const.EVENT_INDEX}')
+        self.assertEqual(tirps[1].get_tieps_str(), f'+1<+4<-4<-1<+{const.EVENT_INDEX}<-{const.EVENT_INDEX}')
+
+        # the first read compiles the catalog and the second read loads the TIRPs from it
+        catalog_path = tirp_catalog.get_tirp_catalog_path(patterns_path)
+        for _ in range(2):
+            catalog_tirps = read_files.read_patterns_file(patterns_path)
+            self.assertTrue(os.path.isdir(catalog_path))
+            self.assertEqual([self._get_tirp_values(tirp) for tirp in catalog_tirps],
+                             [self._get_tirp_values(tirp) for tirp in tirps])
+
+    def test_read_patterns_file_corrupt_catalog(self):
+        """
+        This function tests that a catalog with a missing or corrupt array is recompiled instead of failing the read
+        :return:
+        """
+        patterns_path = self._write_patterns_file()
+        expected_values = [self._get_tirp_values(tirp) for tirp in read_files.read_patterns_file(patterns_path)]
+        catalog_path = tirp_catalog.get_tirp_catalog_path(patterns_path)
+        source_hash = sti_cache.get_file_hash(patterns_path)
+        stis_path = os.path.join(catalog_path, 'stis.npy')
+        with open(stis_path, 'rb') as f:
+            stis_content = f.read()
+
+        for corrupt_content in [None, stis_content[:len(stis_content) // 2], b'not an array file']:
+            if corrupt_content is None:  # the array is missing
+                os.remove(stis_path)
+            else:
+                with open(stis_path, 'wb') as f:
+                    f.write(corrupt_content)
+            self.assertIsNone(tirp_catalog.read_tirp_catalog(catalog_path=catalog_path, source_hash=source_hash))
+            self.assertEqual([self._get_tirp_values(tirp) for tirp in read_files.read_patterns_file(patterns_path)],
+                             expected_values)
+            self.assertIsNotNone(tirp_catalog.read_tirp_catalog(catalog_path=catalog_path, source_hash=source_hash))
+
+    def _write_patterns_file(self) -> str:
+        # writes a patterns file with patterns that end with the event of interest and patterns that do not
+        patterns_path = os.path.join(self._tmp_dir.name, 'patterns.csv')
+        with open(patterns_path, 'w') as f:
+            f.write('\n'.join([
+                ','.join([const.PAT_STIS_COL_NAME, const.PAT_TEMP_RELS_COL_NAME,
+                          const.PAT_TEMP_VS_COL_NAME, const.PAT_TEMP_HS_COL_NAME]),
+                f'[{const.EVENT_INDEX}],[],0.5,1.0',
+                '"[1, 4]","[\'c\']",0.4,1.5',
+                f'"[1, {const.EVENT_INDEX}]","[\'m\']",0.3,1.0',
+                f'"[{const.EVENT_INDEX}, 4]","[\'b\']",0.3,1.0',
+                f'"[1, 4, {const.EVENT_INDEX}]","[\'c\', \'b\', \'b\']",0.25,2.0',
+            ]) + '\n')
+        return patterns_path
+
+    @staticmethod
+    def _get_tirp_values(tirp: TIRP) -> tuple:
+        # returns the values of the TIRP including its sorted tieps
+        sorted_tieps = [[(tiep.get_tiep_type(), tiep.get_symbol_id(), tiep.get_symbol_instance_id(),
+                          tiep.get_tiep_instance_id()) for tiep in tieps] for tieps in tirp.get_sorted_tieps()]
+        return tirp.get_stis(), tirp.get_rels(), tirp.get_vs(), tirp.get_hs(), sorted_tieps
+
+    @staticmethod
+    def _get_series_values(sti_db: STIDB) -> dict:
+        # returns the values of the STIs of each series in the STI DB
+        return {sti_series.get_series_id(): [(sti.get_start_time(), sti.get_end_time(), sti.get_symbol_id(),
+                                              sti.get_symbol_instance_id(), sti.get_var_id())
+                                             for sti in sti_series._stis]
+                for sti_series in sti_db.get_sti_series()}
+
+    @staticmethod
+    def _write_csv(file_path: str, rows: list[str]):
+        header = ','.join([const.STI_DATA_SERIES_ID_COL_NAME, const.STI_DATA_VAR_ID_COL_NAME,
+                           const.STI_DATA_SYM_ID_COL_NAME, const.STI_DATA_START_TIME_COL_NAME,
+                           const.STI_DATA_END_TIME_COL_NAME])
+        with open(file_path, 'w') as f:
+            f.write('\n'.join([header] + rows) + '\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import hashlib
+import os
+import zipfile
+from typing import Optional
+
+import numpy as np
+
+import const
+
+
+def get_file_hash(file_path) -> str:
+    """
+    this function returns the hash of the content of a file
+    :param file_path: path of the file
+    :return: the hex digest of the file content
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(const.FILE_HASH_BLOCK_SIZE), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def get_sti_cache_path(file_path) -> str:
+    # the cache is kept next to the STI file it was created from
+    return f'{file_path}{const.STI_CACHE_FILE_SUFFIX}'
+
+
+def write_sti_cache(cache_path, source_hash: str, sti_arrays: dict):
+    """
+    this function writes the parsed STIs into a binary cache file.
+    Each STI is stored as two consecutive tieps (start and end) and the tieps of each series are consecutive,
+    thus the cache holds columnar int arrays per series for the times, symbols, variables, instance ids and tiep types.
+    :param cache_path: path of the cache file
+    :param source_hash: the hash of the STI file the STIs were parsed from
+    :param sti_arrays: the columnar arrays of the STIs sorted by the series id (see read_files._parse_sti_file)
+    """
+    # the STIs are sorted by the series id, thus the unique series ids are in the order of the series
+    unique_series_ids, series_sizes = np.unique(sti_arrays['series_ids'], return_counts=True)
+    num_of_stis = len(sti_arrays['series_ids'])
+
+    tiep_types = np.tile(np.array([const.START_TIEP_CODE, const.END_TIEP_CODE], dtype=np.int8), num_of_stis)
+    tmp_path = f'{cache_path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f,
+                 version=np.array(const.STI_CACHE_VERSION),
+                 source_hash=np.array(source_hash),
+                 series_ids=unique_series_ids,  # with their dtype in the STI file
+                 series_offsets=np.r_[0, np.cumsum(series_sizes * 2)].astype(np.int64),
+                 times=_interleave(sti_arrays['start_times'], sti_arrays['end_times']),
+                 symbols=np.repeat(sti_arrays['sym_ids'].astype(np.int32), 2),
+                 variables=np.repeat(sti_arrays['var_ids'].astype(np.int32), 2),
+                 instance_ids=np.repeat(sti_arrays['sym_inst_ids'].astype(np.int32), 2),
+                 tiep_types=tiep_types)
+    os.replace(tmp_path, cache_path)
+
+
+def read_sti_cache(cache_path, source_hash: str) -> Optional[dict]:
+    """
+    this function reads the parsed STIs from a binary cache file
+    :param cache_path: path of the cache file
+    :param source_hash: the hash of the STI file the cache should be created from
+    :return: the columnar arrays of the STIs, or None if there is no valid cache for the given hash
+             (including a corrupt cache file)
+    """
+    if not os.path.isfile(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            return _read_sti_arrays(cache=cache, source_hash=source_hash)
+    except (zipfile.BadZipFile, KeyError, ValueError, EOFError, OSError) as e:
+        # a corrupt or truncated cache file (e.g., of an interrupted copy) is not valid, thus it is rebuilt
+        print(f'Could not read the STI cache file {cache_path}: {e}')
+        return None
+
+
+def _read_sti_arrays(cache, source_hash: str) -> Optional[dict]:
+    # this function reads the columnar arrays of the STIs from a loaded cache file, None if it is not valid
+    if int(cache['version']) != const.STI_CACHE_VERSION or str(cache['source_hash']) != source_hash:
+        return None
+
+    tiep_types = cache['tiep_types']
+    if not (np.all(tiep_types[0::2] == const.START_TIEP_CODE) and
+            np.all(tiep_types[1::2] == const.END_TIEP_CODE)):
+        return None
+
+    series_sizes = np.diff(cache['series_offsets']) // 2
+    times = cache['times']
+    return {'series_ids': np.repeat(cache['series_ids'], series_sizes),
+            'var_ids': cache['variables'][0::2],
+            'sym_ids': cache['symbols'][0::2],
+            'start_times': times[0::2],
+            'end_times': times[1::2],
+            'sym_inst_ids': cache['instance_ids'][0::2]}
+
+
+def _interleave(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    # returns an array of [first[0], second[0], first[1], second[1], ...]
+    interleaved = np.empty(len(first) * 2, dtype=np.int64)
+    interleaved[0::2] = first
+    interleaved[1::2] = second
+    return interleaved
@@ -0,0 +1,119 @@
+import os
+import shutil
+from typing import Optional
+
+import numpy as np
+
+import const
+from core_comp.tiep import Tiep
+from core_comp.tirp import TIRP
+
+_META_FILE_NAME = 'meta.npy'
+
+
+def get_tirp_catalog_path(file_path) -> str:
+    # the catalog is kept next to the patterns file it was compiled from
+    return f'{file_path}{const.TIRP_CATALOG_DIR_SUFFIX}'
+
+
+def write_tirp_catalog(catalog_path, source_hash: str, tirps: list[TIRP]):
+    """
+    this function compiles the TIRPs into a catalog directory of flat arrays (one .npy file per array),
+    which holds for each TIRP its STIs, temporal relations, supports, and its sorted and merged tieps.
+    The tieps are stored as the index of their STI in the TIRP and their type,
+    and the boundaries of their groups (co-occurring tieps) are the boundaries of the TIRP's prefixes.
+    :param catalog_path: path of the catalog directory
+    :param source_hash: the hash of the patterns file the TIRPs were parsed from
+    :param tirps: the TIRPs to compile
+    """
+    stis, temp_rels, tiep_sti_ids, tiep_types, group_sizes = [], [], [], [], []
+    stis_num, temp_rels_num, groups_num = [], [], []
+    for tirp in tirps:
+        stis += tirp.get_stis()
+        temp_rels += [ord(temp_rel) for temp_rel in tirp.get_rels()]
+        stis_num.append(tirp.get_tirp_size())
+        temp_rels_num.append(len(tirp.get_rels()))
+        groups_num.append(tirp.get_tieps_num())
+        for tieps in tirp.get_sorted_tieps():
+            group_sizes.append(len(tieps))
+            for tiep in tieps:
+                tiep_sti_ids.append(tiep.get_symbol_instance_id())  # the symbol instance id is the STI index
+                tiep_types.append(tiep.get_tiep_type_code())
+
+    arrays = {'stis': np.array(stis, dtype=np.int64),
+              'sti_offsets': _get_offsets(stis_num),
+              'temp_rels': np.array(temp_rels, dtype=np.uint8),
+              'temp_rel_offsets': _get_offsets(temp_rels_num),
+              'vs': np.array([tirp.get_vs() for tirp in tirps], dtype=np.float64),
+              'hs': np.array([tirp.get_hs() for tirp in tirps], dtype=np.float64),
+              'tiep_sti_ids': np.array(tiep_sti_ids, dtype=np.int32),
+              'tiep_types': np.array(tiep_types, dtype=np.int8),
+              'tiep_offsets': _get_offsets(group_sizes),
+              'group_offsets': _get_offsets(groups_num)}
+
+    tmp_path = f'{catalog_path}.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_path, f'{name}.npy'), array)
+    np.save(os.path.join(tmp_path, _META_FILE_NAME), np.array([str(const.TIRP_CATALOG_VERSION), source_hash]))
+
+    shutil.rmtree(catalog_path, ignore_errors=True)
+    os.replace(tmp_path, catalog_path)
+
+
+def read_tirp_catalog(catalog_path, source_hash: str) -> Optional[list[TIRP]]:
+    """
+    this function loads the TIRPs from a compiled catalog, the arrays are read at once as lists (all the TIRPs are
+    created from them), and the TIRPs get their sorted tieps from the catalog instead of sorting them again.
+    :param catalog_path: path of the catalog directory
+    :param source_hash: the hash of the patterns file the catalog should be compiled from
+    :return: the TIRPs, or None if there is no valid catalog for the given hash (including a missing or corrupt array)
+    """
+    meta_path = os.path.join(catalog_path, _META_FILE_NAME)
+    if not os.path.isfile(meta_path):
+        return None
+    try:
+        version, catalog_hash = np.load(meta_path).tolist()
+        if version != str(const.TIRP_CATALOG_VERSION) or catalog_hash != source_hash:
+            return None
+
+        arrays = {name: np.load(os.path.join(catalog_path, f'{name}.npy')).tolist()
+                  for name in ['stis', 'sti_offsets', 'temp_rels', 'temp_rel_offsets', 'vs', 'hs',
+                               'tiep_sti_ids', 'tiep_types', 'tiep_offsets', 'group_offsets']}
+    except (ValueError, EOFError, OSError) as e:
+        # a missing or corrupt array (e.g., of an interrupted copy) is not valid, thus the catalog is recompiled
+        print(f'Could not read the TIRP catalog {catalog_path}: {e}')
+        return None
+    sti_offsets = arrays['sti_offsets']
+    temp_rel_offsets = arrays['temp_rel_offsets']
+    tiep_offsets = arrays['tiep_offsets']
+    group_offsets = arrays['group_offsets']
+
+    tirps = []
+    for tirp_i in range(len(arrays['vs'])):
+        stis = arrays['stis'][sti_offsets[tirp_i]:sti_offsets[tirp_i + 1]]
+        temp_rels = [chr(temp_rel) for temp_rel in
+                     arrays['temp_rels'][temp_rel_offsets[tirp_i]:temp_rel_offsets[tirp_i + 1]]]
+        sorted_tieps = []
+        for group_i in range(group_offsets[tirp_i], group_offsets[tirp_i + 1]):
+            tieps = []
+            for tiep_i in range(tiep_offsets[group_i], tiep_offsets[group_i + 1]):
+                tieps.append(_create_pattern_tiep(stis=stis, sti_id=arrays['tiep_sti_ids'][tiep_i],
+                                                  tiep_type=const.TIEP_TYPES[arrays['tiep_types'][tiep_i]]))
+            sorted_tieps.append(tieps)
+        tirps.append(TIRP(stis=stis, temp_rels=temp_rels, vs=arrays['vs'][tirp_i], hs=arrays['hs'][tirp_i],
+                          sorted_tieps=sorted_tieps))
+    return tirps
+
+
+def _create_pattern_tiep(stis: list[int], sti_id: int, tiep_type: str) -> Tiep:
+    # creates the dummy tiep of a pattern as in TIRP._get_tiep_order
+    tiep_inst_id = 2 * sti_id if tiep_type == const.START_TIEP else 2 * sti_id + 1
+    return Tiep(time=-1, tiep_type=tiep_type, sym_id=stis[sti_id], sym_inst_id=sti_id,
+                var_id=-1, tiep_inst_id=tiep_inst_id, dummy=True)
+
+
+def _get_offsets(sizes: list[int]) -> np.ndarray:
+    # returns the offsets of consecutive parts with the given sizes in a flat array
+    return np.r_[0, np.cumsum(sizes, dtype=np.int64)].astype(np.int64)
@@ -4,7 +4,8 @@ from prediction.evaluate import Evaluate
 from input import read_files
 from os import path
 
-from prediction.tirp_comp import TIRPCompletion
+from prediction.tirp_comp_training import train_tirp_comp_models
+from tirp_prefixes.tirp_prefix_trie import TIRPPrefixTrie
 
 
 def run_exp():
@@ -19,38 +20,39 @@ def run_exp():
     raw_test_path = path.join(const.INPUT_FOLDER, const.RAW_DATA_FOLDER, const.RAW_TEST_FILE_NAME)
     raw_y_test_path = path.join(const.INPUT_FOLDER, const.RAW_DATA_FOLDER, const.RAW_Y_TEST_FILE_NAME)
 
-    # Train & Test sets
+    # Train set & patterns
     train_set = read_files.read_sti_file(sti_train_path)
-    test_set = read_files.read_sti_file(sti_test_path)
-    test_set_labels = {s.get_series_id(): s.is_symbol_in_series(const.EVENT_INDEX) for s in test_set.get_sti_series()}
-
-    # This dictionary contains the actual time of the event of interest and set None for entities without the event
-    test_set_times_with_event = {s.get_series_id(): s.get_last_sti_end_time() for s in test_set.get_sti_series() if
-                                 s.is_symbol_in_series(const.EVENT_INDEX)}
-    test_set_times_without_event = {s.get_series_id(): None for s in test_set.get_sti_series() if
-                                    not s.is_symbol_in_series(const.EVENT_INDEX)}
-    test_set_times = {**test_set_times_with_event, **test_set_times_without_event}
     tirps_list = read_files.read_patterns_file(patterns_path)
 
-    # This block iterates over the TIRPs and for each pattern learns a completion model (probability and time to event)
-    tirp_comp_models: list = []
-    for tirp in tirps_list:
-        tirp_comp = TIRPCompletion(tirp=tirp, sti_train_set=train_set)
-        tirp_comp.learn_occ_prob_model(cls_name=const.MOD_CLS_SCPM_NAME)
-        tirp_comp.learn_occ_prob_model(cls_name=const.MOD_CLS_FCPM_NAME, params=const.MOD_CLS_FCPM_PARAMS)
-        tirp_comp.learn_occ_prob_model(cls_name=const.MOD_CLS_XGB_NAME)
-        tirp_comp.learn_occ_time_model(cls_name=const.MOD_REG_GAM_GLM_NAME)
-        tirp_comp_models.append(tirp_comp)
-        tirp_comp.post_training_deletion()
+    # The prefixes of all the TIRPs are kept in a trie, thus prefixes shared by multiple TIRPs are detected once
+    prefix_trie = TIRPPrefixTrie(tirps=tirps_list)
+
+    # This block learns for each pattern a completion model (probability and time to event),
+    # the patterns are independent, thus they could be trained by multiple processes (see const)
+    tirp_comp_models: list = train_tirp_comp_models(tirps_list=tirps_list, train_set=train_set,
+                                                    prefix_trie=prefix_trie)
+
+    # Test set, which could be streamed one entity at a time
+    if const.STI_STREAM_TEST_SET:
+        test_set = read_files.iter_sti_file(sti_test_path)
+    else:
+        test_set = read_files.read_sti_file(sti_test_path).get_sti_series()
 
     # This block iterates over the entities in the test data and predicts the probability and time of the event
+    test_set_labels: dict = {}
+    test_set_times: dict = {}
     pred_over_time: dict = {}
-    for entity in test_set.get_sti_series():
-        cont_sim = ContSimulator(tirp_comp_list=tirp_comp_models, entity=entity)
+    for entity in test_set:
+        entity_id = entity.get_series_id()
+        test_set_labels[entity_id] = entity.is_symbol_in_series(const.EVENT_INDEX)
+        # The actual time of the event of interest, and None for entities without the event
+        test_set_times[entity_id] = entity.get_last_sti_end_time() if test_set_labels[entity_id] else None
+
+        cont_sim = ContSimulator(tirp_comp_list=tirp_comp_models, entity=entity, prefix_trie=prefix_trie)
         cont_sim.predict_proba_plus_time(prob_cls_name=const.MOD_CLS_FCPM_NAME,
                                          time_cls_model=const.MOD_REG_GAM_GLM_NAME)
         cont_sim.agg_prob_plus_time(agg_func=const.AGG_FUN_MEAN)
-        pred_over_time[entity.get_series_id()] = cont_sim.get_agg_pred()
+        pred_over_time[entity_id] = cont_sim.get_agg_pred()
         # cont_sim.plot_prediction()
 
     # Evaluates the learned model
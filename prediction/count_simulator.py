@@ -1,42 +1,158 @@
+from typing import Optional
+
+import numpy as np
+
+import const
+
 from prediction.mul_tirps import MulTIRPs
 from prediction.pred_at_time import PredAtTime
 from core_comp.sti_series import STISeries
-from core_comp.time_point_series import TimePointSeries
+from core_comp.time_point_series_view import TimePointSeriesView
 from core_comp.tirp import TIRP
+from tirp_prefixes.tirp_prefix_array_detection import TIRPrefixArrayDetection
+from tirp_prefixes.tirp_prefix_detection_state import TIRPPrefixDetectionState
 from tirp_prefixes.tirp_prefix_entity_insts_at_time import TIRPrefixEntityInstsAtTime
-from tirp_prefixes.tirp_prefix_insts import TIRPPrefixInstances
+from tirp_prefixes.tirp_prefix_trie import TIRPPrefixTrie
 
 
 class ContSimulator:
-    def __init__(self, tirp_comp_list: list, entity: STISeries):
+    def __init__(self, tirp_comp_list: list, entity: STISeries, prefix_trie: Optional[TIRPPrefixTrie] = None,
+                 event_driven: bool = const.CONT_SIM_EVENT_DRIVEN, detection_engine: str = const.TIRP_DETECTION_ENGINE):
+        """
+        :param tirp_comp_list: the learned TIRP completion models
+        :param entity: the entity to predict for
+        :param prefix_trie: a trie that the TIRPs of the models were added to, if None a trie of the TIRPs is created.
+                            The instances of the prefixes that are shared by multiple TIRPs are detected once
+        :param event_driven: if True, the models are evaluated once per instance for all the timestamps between
+                             two change points (arrivals of time points), otherwise once per instance and timestamp
+        :param detection_engine: the engine that detects the instances of the prefixes (see const), the arrays engine
+                                 detects the instances of each TIRP once in the whole entity and does not use the trie
+        """
+        if detection_engine not in [const.TIRP_DETECTION_ENGINE_OBJECTS, const.TIRP_DETECTION_ENGINE_ARRAYS]:
+            raise Exception(f'Unknown detection engine: {detection_engine}')
         self.tirp_comp_list: list = tirp_comp_list
+        self.event_driven: bool = event_driven
+        self.detection_engine: str = detection_engine
         self.entity: STISeries = entity
+        if prefix_trie is None and detection_engine == const.TIRP_DETECTION_ENGINE_OBJECTS:
+            prefix_trie = TIRPPrefixTrie(tirps=[tirp_comp.get_tirp() for tirp_comp in self.tirp_comp_list])
+        self.prefix_trie: Optional[TIRPPrefixTrie] = prefix_trie
         self.entity_id = self.entity.get_series_id()
         self.entity_timestamps: list = self.entity.get_start_to_end_time_timestamp_list()
         self.det_insts = {}
         self.prob_time = {}
         self.agg_pred = {}
-        self._detect_tirp_prefixes_in_entity()
+        if detection_engine == const.TIRP_DETECTION_ENGINE_ARRAYS:
+            self._detect_tirp_prefixes_in_entity_by_arrays()
+        else:
+            self._detect_tirp_prefixes_in_entity()
 
     def _detect_tirp_prefixes_in_entity(self):
-        # This loop iterates over the entity's relevant symbolic time intervals in their tiep representation
+        # This loop iterates over the entity's relevant symbolic time intervals in their tiep representation.
+        # The detection state is advanced only by the time points that arrived before each timestamp,
+        # and the instances of a timestamp are reused if no new instances were detected (or instances were out of the
+        # lookback window) since the previous timestamp
+        detection_state = TIRPPrefixDetectionState(entity_id=self.entity_id, prefix_trie=self.prefix_trie)
+        time_points = self.entity.get_time_points().get_time_point_series()
+        next_tp_index = 0
+        node_det_insts = {}  # the instances of the prefix trie nodes at the last timestamp they were detected
+        prev_det_insts = None
+        for tc in self.entity_timestamps:
+            updated_nodes = set()
+            while next_tp_index < len(time_points) and time_points[next_tp_index].get_time() < tc:
+                updated_nodes.update(detection_state.add_time_point(time_points[next_tp_index]))
+                next_tp_index += 1
+            updated_nodes.update(detection_state.expire_instances(current_time=tc))
+            if prev_det_insts is not None and not updated_nodes:
+                self.det_insts[tc] = prev_det_insts
+                continue
+
+            time_point_series: TimePointSeriesView = self.entity.get_time_points_at(until_time=tc)
+            self.det_insts[tc] = {}
+            created_nodes = set()
+            for tirp_comp in self.tirp_comp_list:
+                tirp: TIRP = tirp_comp.get_tirp()
+                tirp_prefixes = tirp_comp.get_tirp_prefixes()
+                prefix_nodes = self.prefix_trie.get_prefix_nodes(tirp)
+                self.det_insts[tc][tirp.get_tieps_str()] = {}
+                for i, tirp_prefix in enumerate(tirp_prefixes):
+                    node = prefix_nodes[i]
+                    # the instances of the node are created again only if new instances were detected
+                    if node not in node_det_insts or (node in updated_nodes and node not in created_nodes):
+                        node_det_insts[node] = TIRPrefixEntityInstsAtTime(
+                            entity_id=self.entity_id, prefix_index=i, tirp_prefix=tirp_prefix,
+                            time_point_series=time_point_series,
+                            tirp_pfx_insts=detection_state.get_instances(node, current_time=tc))
+                        created_nodes.add(node)
+                    self.det_insts[tc][tirp.get_tieps_str()][i] = node_det_insts[node]
+            prev_det_insts = self.det_insts[tc]
+
+    def _detect_tirp_prefixes_in_entity_by_arrays(self):
+        # The instances of each TIRP's prefixes are detected once in the whole entity by the arrays engine,
+        # as the instances at a timestamp are the instances that end before it (the instances are sorted by their end
+        # times). The instances of a timestamp are reused if no instances ended (or were out of the lookback window)
+        # since the previous timestamp
+        time_point_series = self.entity.get_time_points()
+        prefixes_detects = {}
+        prefixes_insts = {}
+        prefixes_end_times = {}
+        prefixes_first_times = {}
+        for tirp_comp in self.tirp_comp_list:
+            tirp: TIRP = tirp_comp.get_tirp()
+            tirp_pfx_array_detect = TIRPrefixArrayDetection(tirp_prefix=tirp_comp.get_tirp_prefixes()[-1])
+            prefixes_detects[tirp.get_tieps_str()] = tirp_pfx_array_detect
+            prefixes_insts[tirp.get_tieps_str()] = tirp_pfx_array_detect.detect_prefixes(
+                sti_series_id=self.entity_id, time_point_series=time_point_series)
+            prefixes_end_times[tirp.get_tieps_str()] = [
+                np.array([inst.get_last_time_point_time() for inst in insts], dtype=np.int64)
+                for insts in prefixes_insts[tirp.get_tieps_str()]]
+            prefixes_first_times[tirp.get_tieps_str()] = [
+                np.array([inst.get_first_time_point_time() for inst in insts], dtype=np.int64)
+                for insts in prefixes_insts[tirp.get_tieps_str()]]
+
+        prev_nums_of_insts, prev_det_insts = None, None
         for tc in self.entity_timestamps:
-            time_point_series: TimePointSeries = self.entity.get_time_points_at(until_time=tc)
+            # the instances at a timestamp are determined by the number of instances that ended before it
+            # and the number of them that are out of the lookback window
+            nums_of_insts = {}
+            for tirp_str, prefixes in prefixes_end_times.items():
+                lookback_window = prefixes_detects[tirp_str].get_lookback_window()
+                nums_of_insts[tirp_str] = []
+                for end_times, first_times in zip(prefixes, prefixes_first_times[tirp_str]):
+                    num_of_insts = int(np.searchsorted(end_times, tc, side='left'))
+                    num_of_expired = 0 if lookback_window is None else \
+                        int(np.count_nonzero(first_times[:num_of_insts] < tc - lookback_window))
+                    nums_of_insts[tirp_str].append((num_of_insts, num_of_expired))
+            if nums_of_insts == prev_nums_of_insts:
+                self.det_insts[tc] = prev_det_insts
+                continue
+
+            time_point_series: TimePointSeriesView = self.entity.get_time_points_at(until_time=tc)
             self.det_insts[tc] = {}
             for tirp_comp in self.tirp_comp_list:
                 tirp: TIRP = tirp_comp.get_tirp()
                 tirp_prefixes = tirp_comp.get_tirp_prefixes()
                 self.det_insts[tc][tirp.get_tieps_str()] = {}
                 for i, tirp_prefix in enumerate(tirp_prefixes):
-                    det_insts = TIRPrefixEntityInstsAtTime(entity_id=self.entity_id,
-                                                           prefix_index=i,
-                                                           tirp_prefix=tirp_prefix,
-                                                           time_point_series=time_point_series)
+                    num_of_insts, _ = nums_of_insts[tirp.get_tieps_str()][i]
+                    if prev_nums_of_insts is not None and \
+                            prev_nums_of_insts[tirp.get_tieps_str()][i] == nums_of_insts[tirp.get_tieps_str()][i]:
+                        det_insts = prev_det_insts[tirp.get_tieps_str()][i]
+                    else:
+                        det_insts = TIRPrefixEntityInstsAtTime(
+                            entity_id=self.entity_id, prefix_index=i, tirp_prefix=tirp_prefix,
+                            time_point_series=time_point_series,
+                            tirp_pfx_insts=prefixes_detects[tirp.get_tieps_str()].select_instances(
+                                prefixes_insts[tirp.get_tieps_str()][i][:num_of_insts], current_time=tc))
                     self.det_insts[tc][tirp.get_tieps_str()][i] = det_insts
+            prev_nums_of_insts, prev_det_insts = nums_of_insts, self.det_insts[tc]
 
     def predict_proba_plus_time(self, prob_cls_name, time_cls_model):
         # This loop iterates over the entity's detected TIRP prefixes' instances and
         # compute the probabilities ant time to occurrence for each one of them
+        if self.event_driven:
+            self._predict_proba_plus_time_per_segment(prob_cls_name=prob_cls_name, time_cls_model=time_cls_model)
+            return
         for tc in self.entity_timestamps:
             self.prob_time[tc] = {}
             for tirp_comp in self.tirp_comp_list:
@@ -44,10 +160,10 @@ class ContSimulator:
                 tirp_prefixes = tirp_comp.get_tirp_prefixes()
                 self.prob_time[tc][tirp.get_tieps_str()] = {}
                 for i, tirp_prefix in enumerate(tirp_prefixes):
-                    insts: TIRPPrefixInstances = self.det_insts[tc][tirp.get_tieps_str()][i]
+                    insts: TIRPrefixEntityInstsAtTime = self.det_insts[tc][tirp.get_tieps_str()][i]
                     self.prob_time[tc][tirp.get_tieps_str()][i] = []
                     if insts.get_num_of_instances() > 0:
-                        for _, inst in insts.get_instances().items():
+                        for inst in insts.get_instances():
                             pred_prob = tirp_comp.predict_proba(cls_name=prob_cls_name, prefix_index=i, inst=inst,
                                                                 current_time=tc)
                             est_tte = tirp_comp.predict_time(reg_name=time_cls_model, prefix_index=i, inst=inst,
@@ -55,6 +171,43 @@ class ContSimulator:
                             pred_at_time = PredAtTime(curr_time=tc, pred_prob=pred_prob, est_tte=est_tte)
                             self.prob_time[tc][tirp.get_tieps_str()][i].append(pred_at_time)
 
+    def _predict_proba_plus_time_per_segment(self, prob_cls_name, time_cls_model):
+        # The instances change only at change points (when a time point arrives), and between change points only the
+        # gap between the last time point of an instance and the current time advances. Thus, the models are evaluated
+        # once per instance for all the timestamps of a segment (the timestamps between two change points)
+        for segment in self._get_segments():
+            seg_det_insts = self.det_insts[segment[0]]
+            for tc in segment:
+                self.prob_time[tc] = {}
+            for tirp_comp in self.tirp_comp_list:
+                tirp: TIRP = tirp_comp.get_tirp()
+                tirp_prefixes = tirp_comp.get_tirp_prefixes()
+                for tc in segment:
+                    self.prob_time[tc][tirp.get_tieps_str()] = {}
+                for i, tirp_prefix in enumerate(tirp_prefixes):
+                    insts: TIRPrefixEntityInstsAtTime = seg_det_insts[tirp.get_tieps_str()][i]
+                    for tc in segment:
+                        self.prob_time[tc][tirp.get_tieps_str()][i] = []
+                    if insts.get_num_of_instances() > 0:
+                        for inst in insts.get_instances():
+                            pred_probs = tirp_comp.predict_proba_at_times(cls_name=prob_cls_name, prefix_index=i,
+                                                                          inst=inst, current_times=segment)
+                            est_ttes = tirp_comp.predict_time_at_times(reg_name=time_cls_model, prefix_index=i,
+                                                                       inst=inst, current_times=segment)
+                            for tc, pred_prob, est_tte in zip(segment, pred_probs, est_ttes):
+                                pred_at_time = PredAtTime(curr_time=tc, pred_prob=pred_prob, est_tte=est_tte)
+                                self.prob_time[tc][tirp.get_tieps_str()][i].append(pred_at_time)
+
+    def _get_segments(self) -> list[list]:
+        # This function splits the timestamps into segments of consecutive timestamps with the same instances
+        segments = []
+        for tc in self.entity_timestamps:
+            if segments and self.det_insts[tc] is self.det_insts[segments[-1][0]]:
+                segments[-1].append(tc)
+            else:
+                segments.append([tc])
+        return segments
+
     def agg_prob_plus_time(self, agg_func: str):
         # This function aggregates the probabilities and estimated times for each timestamp
         for tc in self.entity_timestamps:
@@ -0,0 +1,71 @@
+import unittest
+
+import const
+from core_comp.sti import STI
+from core_comp.sti_db import STIDB
+from core_comp.sti_series import STISeries
+from core_comp.tiep import Tiep
+from core_comp.tirp import TIRP
+from prediction.count_simulator import ContSimulator
+from prediction.tirp_comp import TIRPCompletion
+
+
+class TestContSimulator(unittest.TestCase):
+
+    def test_event_driven(self):
+        """
+        TIRP:
+        +1<-1<+2<-2<+999<-999
+
+        STI Series (train, the event is in the even entities):
+        -1-  ---2---  -999-
+
+        This function tests that the aggregated predictions of the event-driven simulation (the models are evaluated
+        once per instance for all the timestamps between two change points) are the same as the predictions of the
+        simulation per timestamp
+        """
+        tirp = TIRP(stis=[1, 2, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_BEFORE] * 3, vs=0.5, hs=1.0)
+        sti_series_list = []
+        for series_id in range(12):
+            stis_list = [self._create_sti_instance(start_time=1 + series_id % 3, end_time=4 + series_id % 3,
+                                                   sym_id=1, sym_inst_id=1),
+                         self._create_sti_instance(start_time=6 + series_id % 4, end_time=9 + series_id % 5,
+                                                   sym_id=2, sym_inst_id=1)]
+            if series_id % 2 == 0:
+                stis_list.append(self._create_sti_instance(start_time=16 + series_id % 3, end_time=18 + series_id % 3,
+                                                           sym_id=const.EVENT_INDEX, sym_inst_id=1))
+            sti_series_list.append(STISeries(series_id=series_id, stis_list=stis_list))
+        tirp_comp = TIRPCompletion(tirp=tirp, sti_train_set=STIDB(sti_series_list=sti_series_list))
+        tirp_comp.learn_occ_prob_model(cls_name=const.MOD_CLS_XGB_NAME)
+        tirp_comp.learn_occ_time_model(cls_name=const.MOD_REG_GAM_GLM_NAME)
+
+        entity = STISeries(series_id=100, stis_list=[
+            self._create_sti_instance(start_time=2, end_time=5, sym_id=1, sym_inst_id=1),
+            self._create_sti_instance(start_time=8, end_time=11, sym_id=1, sym_inst_id=2),
+            self._create_sti_instance(start_time=13, end_time=20, sym_id=2, sym_inst_id=1)])
+        agg_preds = []
+        for event_driven in [True, False]:
+            cont_simulator = ContSimulator(tirp_comp_list=[tirp_comp], entity=entity, event_driven=event_driven)
+            cont_simulator.predict_proba_plus_time(prob_cls_name=const.MOD_CLS_XGB_NAME,
+                                                   time_cls_model=const.MOD_REG_GAM_GLM_NAME)
+            cont_simulator.agg_prob_plus_time(agg_func=const.AGG_FUN_MEAN)
+            agg_preds.append(cont_simulator.get_agg_pred())
+
+        self.assertEqual(list(agg_preds[0].keys()), list(agg_preds[1].keys()))
+        for tc, pred in agg_preds[0].items():
+            self.assertAlmostEqual(pred.get_pred_prob(), agg_preds[1][tc].get_pred_prob())
+            self.assertAlmostEqual(pred.get_est_tte(), agg_preds[1][tc].get_est_tte())
+
+    @staticmethod
+    def _create_sti_instance(start_time, end_time, sym_id, sym_inst_id) -> STI:
+        start_tiep = Tiep(time=start_time, tiep_type=const.START_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                          var_id=sym_id)
+        end_tiep = Tiep(time=end_time, tiep_type=const.END_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                        var_id=sym_id)
+        start_tiep.add_pair_tiep(end_tiep)
+        end_tiep.add_pair_tiep(start_tiep)
+        return STI(start_tiep, end_tiep)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class ConstCls:
     """
     In cases there are one unique value in the labels list
@@ -8,3 +11,6 @@ class ConstCls:
 
     def predict_proba(self):
         return self.const_val
+
+    def predict_proba_batch(self, num_of_insts: int):
+        return np.full(num_of_insts, self.const_val)
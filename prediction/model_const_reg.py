@@ -0,0 +1,16 @@
+import numpy as np
+
+
+class ConstReg:
+    """
+    In cases there are no times to the event to learn from
+    it could be occur for example when the prefix is not detected in the train set
+    """
+    def __init__(self, cons_val: float):
+        self.const_val = cons_val
+
+    def predict_time(self):
+        return self.const_val
+
+    def predict_time_batch(self, num_of_insts: int):
+        return np.full(num_of_insts, self.const_val)
@@ -4,6 +4,7 @@ import pandas as pd
 import scipy.stats as ss
 from scipy.stats._continuous_distns import _distn_names  # ***Note*** can caused problem if removed
 
+import const
 from prediction.model_const_cls import ConstCls
 
 
@@ -17,8 +18,8 @@ class FCPMCls:
 
     def __init__(self, db_entities_num: int, params: dict):
         self._db_entities_num = db_entities_num
-        # Assumption: fit() gets X with index with the format 'entityID_instanceID_Timestamp'
-        self._x_train_index_order = ['entityID', 'instanceID', 'Timestamp']
+        # Assumption: fit() gets X with an index of the levels entityID, instanceID and Timestamp
+        self._x_train_index_order = const.FEATURE_MATRIX_INDEX_NAMES
 
         self._epsilon = params['epsilon']
         self._uncertainty_prob = params['uncertainty_prob']
@@ -40,15 +41,19 @@ class FCPMCls:
         self._di_len = -1
         self._const_val = None
 
-    def fit(self, X, y):
+    def fit(self, X, y, sample_weight=None):
         """
         This function learns a model
         :param X: the dataframe train
         :param y: the labels
+        :param sample_weight: not used, the model learns only from the last row of each instance (which is never
+                              sampled out, see the rows budget of the feature matrices)
         :return:
         """
         unique_values = y.unique()
-        if len(unique_values) == 1:  # for cases of a single class
+        if len(unique_values) == 0:  # for cases of no rows (e.g., the prefix is not detected in the train set)
+            self._const_val = ConstCls(cons_val=const.MOD_EMPTY_TRAIN_PROB)
+        elif len(unique_values) == 1:  # for cases of a single class
             single_class = unique_values[0]
             self._const_val = ConstCls(cons_val=single_class)
         else:
@@ -57,6 +62,12 @@ class FCPMCls:
             self._assign_cdf_pdf(durs=self._dur_wo, pdfs=self._dist_pdf_wo, cdfs=self._dist_cdf_wo)  # without event
             self._di_len = max(self._dur_w.keys())  # number of duration components
 
+    def post_training_deletion(self):
+        # This function removes the training durations and the PDFs, as only the CDFs are used for the prediction
+        self._dur_w, self._dur_wo = None, None
+        self._dist_pdf_w, self._dist_pdf_wo = {}, {}
+        self._distributions = None
+
     def _assign_cdf_pdf(self, durs: dict, pdfs: dict, cdfs: dict):
         # This function assigns the pdf and cdf to the relevant dictionaries
         for i, durations in durs.items():
@@ -82,13 +93,11 @@ class FCPMCls:
     def _get_end_durations(self, X, y):
         # Only the final duration of a prefix is interesting in this model
         # Thus, we want to take only the last timestamp for each instance and to learn the relevant durations
-        rows_details = pd.DataFrame(X.index.str.split('_').tolist(), columns=self._x_train_index_order)
-        rows_details[self._x_train_index_order] = rows_details[self._x_train_index_order].apply(pd.to_numeric)
-        max_time_per_ent_inst = rows_details.groupby(self._x_train_index_order[:2],
-                                                     as_index=False)[self._x_train_index_order[-1]].max()
-        max_time_indices = pd.merge(rows_details, max_time_per_ent_inst, on=self._x_train_index_order,
-                                    how="outer", indicator=True).query('_merge=="both"').index  # only both rows
-        return X.iloc[max_time_indices], y.iloc[max_time_indices]
+        # (the rows of the last timestamp of each instance are masked in their order in X)
+        times = pd.Series(X.index.get_level_values(self._x_train_index_order[-1]))
+        inst_keys = [X.index.get_level_values(level) for level in self._x_train_index_order[:2]]
+        is_max_time = (times == times.groupby(inst_keys).transform('max')).to_numpy()
+        return X[is_max_time], y[is_max_time]
 
     def _get_pdf_cdf(self, durations):
         # This function computes the PDF and CDF given the duration
@@ -211,6 +220,66 @@ class FCPMCls:
 
         return prob
 
+    def predict_proba_batch(self, insts):
+        # This function returns the probability for observing the event of interest for each of the rows,
+        # the probability of each row is the same as the probability that predict_proba returns for it
+        if self._const_val is not None:
+            return self._const_val.predict_proba_batch(num_of_insts=len(insts))
+        durations = insts.to_numpy().astype(int)
+        psi = self._compute_psi_batch(durations=durations, prior_prob=self._pr_ptc_stc, cdf=self._dist_cdf_w)
+        not_psi = self._compute_psi_batch(durations=durations, prior_prob=self._pr_ptc_not_stc, cdf=self._dist_cdf_wo)
+        total = psi + not_psi
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(total != 0, psi / total, self._uncertainty_prob)  # Law of total probability
+
+    def _compute_psi_batch(self, durations: np.ndarray, prior_prob, cdf):
+        # This function computes the psi\not psi probability for each row of durations
+        pi_prob = np.ones(len(durations))
+        for j in range(self._di_len + 1):
+            if j == self._di_len:  # censoring - not a completed duration component
+                pi_prob = pi_prob * self._censoring_prob_batch(cdf=cdf[j], durations=durations[:, j])
+            else:  # a completed duration component
+                pi_prob = pi_prob * self._calc_dist_prob_batch(cdf=cdf[j], durations=durations[:, j])
+        return prior_prob * pi_prob
+
+    def _calc_dist_prob_batch(self, cdf, durations: np.ndarray) -> np.ndarray:
+        # This function returns the probability of each duration in the distribution (see _calc_dist_prob),
+        # the closest values in the cdf are found by a binary search instead of a pass over all the values
+        if not self._is_sorted_cdf(cdf):
+            return np.array([self._calc_dist_prob(cdf=cdf, duration=duration) for duration in durations])
+        cdf_values = cdf.index.values
+        cdf_min, cdf_max = cdf_values[0], cdf_values[-1]
+
+        # in case the duration is outside of the distribution but close to it
+        durations = durations.astype(float)
+        durations = np.where((durations < cdf_min) & (cdf_min - durations < self._epsilon), cdf_min, durations)
+        durations = np.where((durations > cdf_max) & (durations - cdf_max < self._epsilon), cdf_max, durations)
+
+        top = self._get_closest_indices(values=cdf_values, targets=durations + self._epsilon)
+        bottom = self._get_closest_indices(values=cdf_values, targets=durations - self._epsilon)
+        prob = cdf.values[top] - cdf.values[bottom]
+        # in case the duration is outside of the distribution
+        return np.where((durations < cdf_min) | (durations > cdf_max), self._uncertainty_prob, prob)
+
+    def _censoring_prob_batch(self, cdf, durations: np.ndarray) -> np.ndarray:
+        # This function returns the censoring probability of each duration (see _censoring_prob)
+        if not self._is_sorted_cdf(cdf):
+            return np.array([self._censoring_prob(cdf=cdf, duration=duration) for duration in durations])
+        return 1 - cdf.values[self._get_closest_indices(values=cdf.index.values, targets=durations)]
+
+    @staticmethod
+    def _is_sorted_cdf(cdf) -> bool:
+        # the binary search requires distinct sorted values, which are generated by linspace unless it is degenerate
+        return len(cdf.index) > 1 and cdf.index.is_monotonic_increasing and cdf.index.is_unique
+
+    @staticmethod
+    def _get_closest_indices(values: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        # This function returns the index of the closest value for each target in the sorted values,
+        # in case of a tie the first value is returned (as min with the distance as the key)
+        right = np.clip(np.searchsorted(values, targets, side='left'), 1, len(values) - 1)
+        left = right - 1
+        return np.where(np.abs(values[left] - targets) <= np.abs(values[right] - targets), left, right)
+
     @staticmethod
     def _censoring_prob(cdf, duration):
         # For the duration of the last and unfinished element of ptc(i.e., dg),
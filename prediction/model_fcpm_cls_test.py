@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import const
+from prediction.model_fcpm_cls import FCPMCls
+
+
+class TestFCPMCls(unittest.TestCase):
+
+    def test_predict_proba_batch(self):
+        """
+        This function tests that the probabilities of a batch are the same as the probabilities of its rows
+        :return:
+        """
+        rng = np.random.default_rng(0)
+        num_of_rows = 200
+        X = pd.DataFrame({0: rng.integers(1, 20, num_of_rows), 1: rng.integers(1, 30, num_of_rows)},
+                         index=pd.MultiIndex.from_arrays([np.arange(num_of_rows), np.zeros(num_of_rows, dtype=np.int64),
+                                                          np.arange(num_of_rows)],
+                                                         names=const.FEATURE_MATRIX_INDEX_NAMES))
+        y = pd.Series((X[1] < 12).astype(int).to_numpy(), index=X.index)
+        params = dict(const.MOD_CLS_FCPM_PARAMS, sample_to_gen=500)
+        fcpm = FCPMCls(db_entities_num=num_of_rows, params=params)
+        fcpm.fit(X=X, y=y)
+
+        # durations inside, close to and outside the distributions
+        X_test = pd.DataFrame({0: np.arange(0, 60), 1: np.arange(60, 0, -1)})
+        batch_probs = fcpm.predict_proba_batch(X_test)
+        for j in range(len(X_test)):
+            self.assertEqual(batch_probs[j], fcpm.predict_proba(X_test.iloc[[j]]))
+
+    def test_get_end_durations(self):
+        """
+        Rows (entityID, instanceID, Timestamp): the entities with the event are before the entities without it,
+        thus the rows are not sorted by their index
+
+        This function tests that the rows of the last timestamp of each instance are taken (in their order)
+        """
+        index = pd.MultiIndex.from_tuples([(7.0, 0, 1), (7.0, 0, 2), (7.0, 1, 1), (2.0, 0, 1), (2.0, 0, 2),
+                                           (2.0, 0, 3), (5.0, 0, 1)], names=const.FEATURE_MATRIX_INDEX_NAMES)
+        X = pd.DataFrame({0: [4, 4, 6, 1, 1, 1, 9], 1: [1, 2, 1, 1, 2, 3, 1]}, index=index)
+        y = pd.Series([1, 1, 1, 0, 0, 0, 0], index=index)
+        fcpm = FCPMCls(db_entities_num=3, params=const.MOD_CLS_FCPM_PARAMS)
+        X_end, y_end = fcpm._get_end_durations(X=X, y=y)
+        self.assertEqual(X_end.index.tolist(), [(7.0, 0, 2), (7.0, 1, 1), (2.0, 0, 3), (5.0, 0, 1)])
+        self.assertEqual(X_end[1].tolist(), [2, 1, 3, 1])
+        self.assertEqual(y_end.tolist(), [1, 1, 0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
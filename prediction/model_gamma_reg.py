@@ -1,12 +1,28 @@
 from sklearn.linear_model import GammaRegressor
 
+import const
+from prediction.model_const_reg import ConstReg
+
 
 class GammaReg:
     def __init__(self):
         self._reg = GammaRegressor()
+        self.const_val = None
 
-    def fit(self, X, y):
-        self._reg.fit(X, y)
+    def fit(self, X, y, sample_weight=None):
+        if len(y) == 0:
+            # in cases there are no rows, for example when the prefix is not detected in the train set
+            self.const_val = ConstReg(cons_val=const.MOD_EMPTY_TRAIN_TTE)
+        else:
+            self._reg.fit(X, y, sample_weight=sample_weight)
 
     def predict_time(self, inst):
+        if self.const_val is not None:
+            return self.const_val.predict_time()
         return self._reg.predict(inst)[0]
+
+    def predict_time_batch(self, insts):
+        # This function returns the estimated time for each of the rows
+        if self.const_val is not None:
+            return self.const_val.predict_time_batch(num_of_insts=len(insts))
+        return self._reg.predict(insts)
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class SCPMCls:
     """
     The class implements SCPM
@@ -8,3 +11,7 @@ class SCPMCls:
     def predict_proba(self, inst_row):
         # This function returns the probability for observing the event of interest
         return self.prob
+
+    def predict_proba_batch(self, inst_rows):
+        # This function returns the probability for observing the event of interest for each of the rows
+        return np.full(len(inst_rows), self.prob)
@@ -1,6 +1,7 @@
 from sklearn.ensemble import GradientBoostingClassifier
 from xgboost import XGBClassifier
 
+import const
 from prediction.model_const_cls import ConstCls
 
 
@@ -9,21 +10,25 @@ class XGBCls:
         self._cls = GradientBoostingClassifier()
         self.const_val = None
 
-    def fit(self, X, y):
+    def fit(self, X, y, sample_weight=None):
         """
         This function learns a model
         :param X: the dataframe train
         :param y: the labels
+        :param sample_weight: the weights of the rows (e.g., the number of rows each sampled row represents)
         :return:
         """
         unique_values = y.unique()
-        if len(unique_values) == 1:
+        if len(unique_values) == 0:
+            # in cases there are no rows, for example when the prefix is not detected in the train set
+            self.const_val = ConstCls(cons_val=const.MOD_EMPTY_TRAIN_PROB)
+        elif len(unique_values) == 1:
             # in cases there are one unique value in the labels list
             # it could be occur for example when the patterns found only in entities with the event of interest
             single_class = unique_values[0]
             self.const_val = ConstCls(cons_val=single_class)
         else:
-            self._cls.fit(X, y)
+            self._cls.fit(X, y, sample_weight=sample_weight)
 
     def predict_proba(self, inst):
         # This function returns the probability for observing the event of interest
@@ -31,3 +36,10 @@ class XGBCls:
             return self.const_val.predict_proba()
         else:
             return self._cls.predict_proba(inst)[:, 1][0]
+
+    def predict_proba_batch(self, insts):
+        # This function returns the probability for observing the event of interest for each of the rows
+        if self.const_val is not None:
+            return self.const_val.predict_proba_batch(num_of_insts=len(insts))
+        else:
+            return self._cls.predict_proba(insts)[:, 1]
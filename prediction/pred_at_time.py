@@ -1,4 +1,6 @@
 class PredAtTime:
+    __slots__ = ('_curr_time', '_pred_prob', '_est_tte', '_decision')
+
     def __init__(self, curr_time, pred_prob, est_tte, decision=None):
         self._curr_time = curr_time
         self._pred_prob = pred_prob
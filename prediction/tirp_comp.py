@@ -1,5 +1,7 @@
 import gc
+from typing import Iterable, Optional, Union
 
+import numpy as np
 import pandas as pd
 
 import const
@@ -7,6 +9,7 @@ from core_comp.sti_db import STIDB
 from core_comp.sti_series import STISeries
 from core_comp.tiep import Tiep
 from core_comp.time_point_series import TimePointSeries
+from core_comp.time_point_series_node import TimePointSeriesNode
 from core_comp.tirp import TIRP
 from prediction.model_fcpm_cls import FCPMCls
 from prediction.tirp_based_model import TIRPBasedModel
@@ -14,26 +17,67 @@ from prediction.model_scpm_cls import SCPMCls
 from prediction.model_xgb_cls import XGBCls
 from prediction.model_gamma_reg import GammaReg
 from prediction.tirp_comp_insts import TIRPCompletionInstances
+from prediction.tirp_comp_sweep import TIRPCompletionSweep
 from tirp_prefixes.tirp_prefix import TIRPrefix
+from tirp_prefixes.tirp_prefix_array_detection import TIRPrefixArrayDetection
 from tirp_prefixes.tirp_prefix_detection import TIRPrefixDetection
 from tirp_prefixes.tirp_prefix_insts import TIRPPrefixInstances
+from tirp_prefixes.tirp_prefix_trie import TIRPPrefixTrie
 
 
 class TIRPCompletion:
-    def __init__(self, tirp: TIRP, sti_train_set: STIDB):
+    def __init__(self, tirp: TIRP, sti_train_set: Optional[Union[STIDB, Iterable[STISeries]]],
+                 prefix_trie: Optional[TIRPPrefixTrie] = None, count_only: bool = False,
+                 detection_engine: str = const.TIRP_DETECTION_ENGINE,
+                 train_sweep: Optional[TIRPCompletionSweep] = None,
+                 row_budget: Optional[int] = const.FEATURE_MATRIX_ROW_BUDGET,
+                 row_sampling: str = const.FEATURE_MATRIX_SAMPLING):
+        """
+        :param tirp: the TIRP to learn its completion
+        :param sti_train_set: the train set, either an STI DB or an iterable (e.g., a stream) of STI series,
+                              None if the instances are taken from a train sweep
+        :param prefix_trie: a trie that the TIRP was added to, the instances of the prefixes that the TIRP shares
+                            with other TIRPs in the trie are detected once, and the TIRP is released after the detection
+        :param count_only: if True, only the number of entities with instances of each prefix is computed
+                           (without keeping the instances), thus only the SCPM model could be learned
+        :param detection_engine: the engine that detects the instances of the prefixes (see const), the arrays engine
+                                 detects all the prefixes of the TIRP at once, thus it does not use the prefix trie
+        :param train_sweep: an entity-major pass over the train set that the TIRP was swept by, the instances of the
+                            prefixes are taken from it instead of passing over the train set
+        :param row_budget: the maximal number of rows in the feature matrix of each prefix (None for all the rows)
+        :param row_sampling: how the rows are sampled within the rows budget (see const)
+        """
+        if train_sweep is not None and (sti_train_set is not None or count_only):
+            raise Exception('The instances of a train sweep are taken without a train set or counting!')
+        if detection_engine not in [const.TIRP_DETECTION_ENGINE_OBJECTS, const.TIRP_DETECTION_ENGINE_ARRAYS]:
+            raise Exception(f'Unknown detection engine: {detection_engine}')
         self.tirp: TIRP = tirp
+        self._count_only: bool = count_only
+        self._detection_engine: str = detection_engine
         self.event_occr_time = {}
-        self.number_of_entities: int = sti_train_set.get_number_of_entities()
+        self.number_of_entities: int = 0
 
         # get the tiep order and ignore the ending tiep of the event of interest.
         # the assumption is the event ot interest ending tiep is always the last tiep
         self._tiep_order: list[list[Tiep]] = tirp.get_sorted_tieps()[:-1]
         self._tiep_prefixes: list[TIRPrefix] = self._get_tirp_prefixes()
-        self._tirp_prefixes_instances = TIRPCompletionInstances(tirp=self.tirp)
-        self._detect_tirp_prefixes(sti_train_set)
+        self._tirp_prefixes_instances = TIRPCompletionInstances(tirp=self.tirp, row_budget=row_budget,
+                                                                row_sampling=row_sampling)
+        self._prefix_trie: Optional[TIRPPrefixTrie] = prefix_trie
+        self._prefix_nodes = None if prefix_trie is None else prefix_trie.get_prefix_nodes(tirp)
+        if train_sweep is not None:
+            self._take_swept_tirp_prefixes(train_sweep)
+        elif count_only:  # the instances in the trie are not used, as the instances are not kept
+            self._count_tirp_prefixes(sti_train_set)
+        else:
+            self._detect_tirp_prefixes(sti_train_set)
+        if prefix_trie is not None:
+            prefix_trie.release_tirp(tirp)
+            self._prefix_trie, self._prefix_nodes = None, None
 
-        self._tirp_prefixes_instances.compute_prob()
-        self._tirp_prefixes_instances.generate_feature_matrices(event_occur_time=self.event_occr_time)
+        if not count_only:
+            self._tirp_prefixes_instances.compute_prob()
+            self._tirp_prefixes_instances.generate_feature_matrices(event_occur_time=self.event_occr_time)
 
         # Create feature matrix for each TIRP prefix
         self.feature_matrices = self._tirp_prefixes_instances.get_feature_matrices()
@@ -56,61 +100,141 @@ class TIRPCompletion:
     def get_tirp(self) -> TIRP:
         return self.tirp
 
-    def _detect_tirp_prefixes(self, sti_train_set: STIDB):
-        # This function returns all detected instances per TIRP Prefix
-        train_set_with_event: list[STISeries] = [s for s in sti_train_set.get_sti_series() if
-                                                 s.is_symbol_in_series(const.EVENT_INDEX)]
-        for sti_series in train_set_with_event:
-            self.event_occr_time[sti_series.get_series_id()] = sti_series.get_last_sti_end_time()
+    def _detect_tirp_prefixes(self, sti_train_set: Union[STIDB, Iterable[STISeries]]):
+        # This function detects all the instances per TIRP Prefix.
+        # The train set is passed only once, thus it could also be a stream of STI series.
+        # Only the series that include all the tieps of the first prefix are visited: in an STI DB they are found by
+        # its inverted index, and in a stream by the tiep postings of each series
+        insts_w_event = [TIRPPrefixInstances(tirp_prefix) for tirp_prefix in self._tiep_prefixes]
+        insts_wo_event = [TIRPPrefixInstances(tirp_prefix) for tirp_prefix in self._tiep_prefixes]
+        prefixes_tiep_keys = [tirp_prefix.get_tiep_keys() for tirp_prefix in self._tiep_prefixes]
+        labeled_series = self._label_train_set(sti_train_set, first_tiep_keys=prefixes_tiep_keys[0],
+                                               w_event=insts_w_event, wo_event=insts_wo_event)
+        for sti_series, prefixes_insts in labeled_series:
+            self._detect_tirp_prefixes_in_series(sti_series=sti_series, prefixes_tiep_keys=prefixes_tiep_keys,
+                                                 prefixes_insts=prefixes_insts)
+        self._add_tirp_prefixes_instances(insts_w_event=insts_w_event, insts_wo_event=insts_wo_event)
 
-        train_set_without_event: list[STISeries] = [s for s in sti_train_set._sti_series_list if
-                                                    not s.is_symbol_in_series(const.EVENT_INDEX)]
+    def _take_swept_tirp_prefixes(self, train_sweep: TIRPCompletionSweep):
+        # This function takes the instances per TIRP Prefix that were detected by an entity-major train sweep
+        self.number_of_entities = train_sweep.get_number_of_entities()
+        self.event_occr_time = train_sweep.get_event_occur_time()
+        insts_w_event, insts_wo_event = train_sweep.pop_prefixes_instances(self.tirp)
+        self._add_tirp_prefixes_instances(insts_w_event=insts_w_event, insts_wo_event=insts_wo_event)
 
-        for i, tirp_prefix in enumerate(self._tiep_prefixes):
-            inst_w_event = self._detect_tirp_prefix_for_db(tirp_prefix=tirp_prefix, db=train_set_with_event)
+    def _add_tirp_prefixes_instances(self, insts_w_event: list[TIRPPrefixInstances],
+                                     insts_wo_event: list[TIRPPrefixInstances]):
+        # This function keeps the instances per TIRP Prefix in the series with and without the event
+        for i in range(len(self._tiep_prefixes)):
             self._tirp_prefixes_instances.add_tirp_prefix_w_event(tirp_prefix_id=i,
-                                                                  tirp_prefix_insts=inst_w_event)
-
-            inst_wo_event = self._detect_tirp_prefix_for_db(tirp_prefix=tirp_prefix, db=train_set_without_event)
+                                                                  tirp_prefix_insts=insts_w_event[i])
             self._tirp_prefixes_instances.add_tirp_prefix_wo_event(tirp_prefix_id=i,
-                                                                   tirp_prefix_insts=inst_wo_event)
-
-    def _detect_tirp_prefix_for_db(self, tirp_prefix: TIRPrefix, db: list[STISeries]):
-        tirp_prefix_instances: TIRPPrefixInstances = TIRPPrefixInstances(tirp_prefix)
-        for sti_series in db:
-            sti_series_id = sti_series.get_series_id()
-            time_point_series: TimePointSeries = sti_series.get_time_points()
-            tirp_pfx_detect = TIRPrefixDetection(tirp_prefix=tirp_prefix)
-            tirp_pfx_insts: list[TimePointSeries] = tirp_pfx_detect.detect(sti_series_id=sti_series_id,
-                                                                           time_point_series=time_point_series)
-            for inst_j, inst in enumerate(tirp_pfx_insts):
+                                                                   tirp_prefix_insts=insts_wo_event[i])
+
+    def _count_tirp_prefixes(self, sti_train_set: Union[STIDB, Iterable[STISeries]]):
+        # This function counts the entities that have instances of each TIRP Prefix, without keeping the instances.
+        # The support is anti-monotone, thus an entity has instances of the prefixes up to its longest detected prefix
+        counts_w_event = [0] * len(self._tiep_prefixes)
+        counts_wo_event = [0] * len(self._tiep_prefixes)
+        tirp_pfx_detect = TIRPrefixDetection(tirp_prefix=self._tiep_prefixes[-1])
+        labeled_series = self._label_train_set(sti_train_set, first_tiep_keys=self._tiep_prefixes[0].get_tiep_keys(),
+                                               w_event=counts_w_event, wo_event=counts_wo_event)
+        for sti_series, prefixes_counts in labeled_series:
+            longest_prefix_len = tirp_pfx_detect.detect_longest_prefix_len(
+                sti_series_id=sti_series.get_series_id(), time_point_series=sti_series.get_time_points())
+            for i in range(longest_prefix_len):
+                prefixes_counts[i] += 1
+        self._tirp_prefixes_instances.compute_prob_from_counts(counts_w_event=counts_w_event,
+                                                               counts_wo_event=counts_wo_event)
+
+    def _label_train_set(self, sti_train_set: Union[STIDB, Iterable[STISeries]], first_tiep_keys: set[tuple],
+                         w_event, wo_event):
+        # This function returns the series of the train set with the instances (or counts) of their label.
+        # In an STI DB only the series that include the tieps of the first prefix are returned (by its inverted index)
+        if isinstance(sti_train_set, STIDB):
+            self.number_of_entities = sti_train_set.get_number_of_entities()
+            self.event_occr_time = sti_train_set.get_event_occur_time()
+            return ((sti_series, w_event if sti_series.get_series_id() in self.event_occr_time else wo_event)
+                    for sti_series in sti_train_set.get_sti_series_with_tieps(first_tiep_keys))
+        else:
+            return self._label_sti_series(sti_train_set, w_event=w_event, wo_event=wo_event)
+
+    def _label_sti_series(self, sti_series_iter: Iterable[STISeries], w_event, wo_event):
+        # This function yields each series of a stream with the instances (or counts) of its label
+        # (with or without the event)
+        for sti_series in sti_series_iter:
+            self.number_of_entities += 1
+            if sti_series.is_symbol_in_series(const.EVENT_INDEX):
+                self.event_occr_time[sti_series.get_series_id()] = sti_series.get_last_sti_end_time()
+                yield sti_series, w_event
+            else:
+                yield sti_series, wo_event
+
+    def _detect_tirp_prefixes_in_series(self, sti_series: STISeries, prefixes_tiep_keys: list[set[tuple]],
+                                        prefixes_insts: list[TIRPPrefixInstances]):
+        # This function detects the instances of each TIRP prefix in the series by extending the instances of
+        # its previous prefix. The support is anti-monotone, thus once a prefix has no instances in the series
+        # (or the series does not include its tieps) the longer prefixes have no instances too
+        sti_series_id = sti_series.get_series_id()
+        time_point_series: TimePointSeries = sti_series.get_time_points()
+        series_tiep_keys = time_point_series.get_tiep_postings().keys()
+        tirp_pfx_detect = TIRPrefixDetection(tirp_prefix=self._tiep_prefixes[-1])
+        tirp_pfx_insts = None
+        array_prefixes_insts = None
+        for i, (tieps, tiep_keys, tirp_prefix_instances) in enumerate(zip(self._tiep_order, prefixes_tiep_keys,
+                                                                          prefixes_insts)):
+            if not tiep_keys <= series_tiep_keys:
+                break
+            if self._detection_engine == const.TIRP_DETECTION_ENGINE_ARRAYS:  # all the prefixes are detected at once
+                if array_prefixes_insts is None:
+                    tirp_pfx_array_detect = TIRPrefixArrayDetection(tirp_prefix=self._tiep_prefixes[-1])
+                    array_prefixes_insts = tirp_pfx_array_detect.detect_prefixes(sti_series_id=sti_series_id,
+                                                                                 time_point_series=time_point_series)
+                tirp_pfx_insts = array_prefixes_insts[i]
+            elif self._prefix_nodes is None:
+                tirp_pfx_insts: list[TimePointSeriesNode] = tirp_pfx_detect.extend(
+                    sti_series_id=sti_series_id, time_point_series=time_point_series,
+                    tieps=tieps, prev_insts=tirp_pfx_insts)
+            else:  # the instances are detected once for all the TIRPs that share this prefix
+                tirp_pfx_insts = self._prefix_trie.get_instances(node=self._prefix_nodes[i],
+                                                                 sti_series_id=sti_series_id,
+                                                                 time_point_series=time_point_series)
+            if not tirp_pfx_insts:
+                break
+            # the instances of the prefix are selected by the instance semantics from the generated instances
+            for inst_j, inst in enumerate(tirp_pfx_detect.select_instances(tirp_pfx_insts)):
                 tirp_prefix_instances.add_instance(entity_id=sti_series_id, inst_id=inst_j, inst=inst)
-        return tirp_prefix_instances
 
     def learn_occ_prob_model(self, cls_name: str, params: dict = None):
+        if self._count_only and cls_name != const.MOD_CLS_SCPM_NAME:
+            raise Exception(f'Only the {const.MOD_CLS_SCPM_NAME} model could be learned without the instances!')
         self.prob_model[cls_name] = {}
-        for i in range(0, len(self.feature_matrices) + 1):
+        for i in range(0, len(self._tiep_prefixes)):
             cls = None
             if cls_name == const.MOD_CLS_SCPM_NAME:
                 prob = self.tirp_based_model.get_pref_sup(prefix_index=i)
                 cls = SCPMCls(prob=prob)
             elif i > 0:
                 X, y = self.tirp_based_model.get_df_for_classification(prefix_index=i)
+                sample_weight = self.tirp_based_model.get_weights_for_classification(prefix_index=i)
                 if cls_name == const.MOD_CLS_XGB_NAME:
                     cls = XGBCls()
                 elif cls_name == const.MOD_CLS_FCPM_NAME:
                     cls = FCPMCls(db_entities_num=self.number_of_entities, params=params)
-                cls.fit(X=X, y=y)
+                cls.fit(X=X, y=y, sample_weight=sample_weight)
             self.prob_model[cls_name][i] = cls
 
     def learn_occ_time_model(self, cls_name: str):
+        if self._count_only:
+            raise Exception('The time models could not be learned without the instances!')
         self.time_model[cls_name] = {}
         for i in range(1, len(self.feature_matrices) + 1):
             cls = None
             X_tte, y_tte = self.tirp_based_model.get_df_for_regression(prefix_index=i)
             if cls_name == const.MOD_REG_GAM_GLM_NAME:
                 cls = GammaReg()
-                cls.fit(X=X_tte, y=y_tte)
+                cls.fit(X=X_tte, y=y_tte,
+                        sample_weight=self.tirp_based_model.get_weights_for_regression(prefix_index=i))
             self.time_model[cls_name][i] = cls
 
     def _create_df_row_for_inst(self, prefix_index, inst, current_time):
@@ -137,6 +261,30 @@ class TIRPCompletion:
         reg = self.time_model[reg_name][prefix_index + 1]
         return reg.predict_time(inst_row)
 
+    def _create_df_rows_for_inst(self, prefix_index, inst, current_times) -> pd.DataFrame:
+        # This function creates the rows of an instance at multiple current times,
+        # which differ only by the gap between the last time point and the current time (the first feature)
+        dur_list = inst.get_durations_between_all_tieps()
+        gaps = np.asarray(current_times) - inst.get_last_time_point_time()
+        feature_dict = {0: gaps}
+        feature_dict.update({i: np.full(len(gaps), dur_list[i - 1]) for i in range(1, prefix_index + 1)})
+        return pd.DataFrame.from_dict(feature_dict)
+
+    def predict_proba_at_times(self, cls_name, prefix_index, inst, current_times) -> np.ndarray:
+        # This function returns the probabilities of an instance at multiple current times by a single model call
+        inst_rows = self._create_df_rows_for_inst(prefix_index, inst, current_times)
+        if cls_name == const.MOD_CLS_SCPM_NAME:
+            cls = self.prob_model[cls_name][prefix_index]
+        else:
+            cls = self.prob_model[cls_name][prefix_index + 1]
+        return cls.predict_proba_batch(inst_rows)
+
+    def predict_time_at_times(self, reg_name, prefix_index, inst, current_times) -> np.ndarray:
+        # This function returns the estimated times of an instance at multiple current times by a single model call
+        inst_rows = self._create_df_rows_for_inst(prefix_index, inst, current_times)
+        reg = self.time_model[reg_name][prefix_index + 1]
+        return reg.predict_time_batch(inst_rows)
+
     def post_training_deletion(self):
         """
         Remove unnecessary training structures to save memory, unless they are needed for lazy models such as KNN.
@@ -145,5 +293,11 @@ class TIRPCompletion:
         """
         self.feature_matrices = None
         self._tirp_prefixes_instances = None
+        self.tirp_based_model = None  # keeps the training data frames of the feature matrices
+        self.event_occr_time = None
+        for models in self.prob_model.values():
+            for model in models.values():
+                if isinstance(model, FCPMCls):
+                    model.post_training_deletion()
 
         gc.collect()
@@ -1,13 +1,30 @@
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 
+import const
 from core_comp.tirp import TIRP
 from tirp_prefixes.tirp_prefix_insts import TIRPPrefixInstances
 
 
 class TIRPCompletionInstances:
-    def __init__(self, tirp):
+    def __init__(self, tirp, row_budget: Optional[int] = const.FEATURE_MATRIX_ROW_BUDGET,
+                 row_sampling: str = const.FEATURE_MATRIX_SAMPLING):
+        """
+        :param tirp: the TIRP of the instances
+        :param row_budget: the maximal number of rows in the feature matrix of each prefix (None for all the rows),
+                           the rows are sampled and weighted by the number of rows they represent
+        :param row_sampling: how the rows are sampled (see const), either a stride or random ticks
+        """
+        if row_sampling not in [const.FEATURE_MATRIX_SAMPLING_STRIDE, const.FEATURE_MATRIX_SAMPLING_RANDOM]:
+            raise Exception(f'Unknown rows sampling: {row_sampling}')
+        if row_budget is not None and row_budget < 1:
+            raise Exception('The rows budget should be at least one!')
         self.tirp: TIRP = tirp
+        self._row_budget: Optional[int] = row_budget
+        self._row_sampling: str = row_sampling
+        self._rng: np.random.Generator = np.random.default_rng(const.FEATURE_MATRIX_SAMPLING_SEED)
         self._tirp_prefixes_instances_w_event = {}
         self._tirp_prefixes_instances_wo_event = {}
         self.event_occur_time = None
@@ -29,54 +46,96 @@ class TIRPCompletionInstances:
         dict_ref[tirp_prefix_id] = tirp_prefix_insts
 
     def _generate_feature_matrix(self, tirp_prefix_id):
-        # This function generates the feature matrix for a specific TIRP-prefix by its index
-        feature_dict = {i: [] for i in range(tirp_prefix_id)}
-        feature_dict['index'] = []
-        feature_dict['class'] = []
-        feature_dict['tte'] = []
-
-        inst_w_dict: dict = self._tirp_prefixes_instances_w_event[tirp_prefix_id].get_instances()
-        for s_id, s_val in inst_w_dict.items():
-            occr_time = self.event_occur_time[s_val.get_entity_id()]
-            self._add_inst_to_dict(inst_index=s_id, inst=s_val, feature_dict=feature_dict,
-                                   class_val=1, occur_time=occr_time)
-
-        inst_wo_dict: dict = self._tirp_prefixes_instances_wo_event[tirp_prefix_id].get_instances()
-        for s_id, s_val in inst_wo_dict.items():
-            occr_time = -1
-            self._add_inst_to_dict(inst_index=s_id, inst=s_val, feature_dict=feature_dict,
-                                   class_val=0, occur_time=occr_time)
-
-        df_feature_matrix = pd.DataFrame.from_dict(feature_dict)
-        df_feature_matrix = df_feature_matrix.set_index('index')
-        self.feature_matrices[tirp_prefix_id] = df_feature_matrix
-
-    def _add_inst_to_dict(self, inst_index, inst, feature_dict, class_val, occur_time):
-        # This function adds the instance into the provided dictionary
-        dur_list = inst.get_durations_between_all_tieps()
-        prev_dur = dur_list[:-1]
-
-        i = len(dur_list) - 1
-        d = dur_list[-1]
-        inst_end_time = inst.get_last_time_point_time()
-        tte_first = occur_time - inst_end_time + d
-        for j in range(1, d + 1):
-            feature_dict['index'].append(f'{inst_index}_{j}')
-
-            if len(prev_dur) > 0:  # previous durations also should be added
-                for k, k_dur in enumerate(prev_dur):
-                    feature_dict[k].append(k_dur)
-
-            feature_dict[i].append(j)  # add the current duration
-
-            for q in range(i + 1, len(dur_list)):  # next duration should be zero
-                feature_dict[q].append(0)
-
-            feature_dict['class'].append(class_val)
-            if occur_time == -1:  # for entities without event
-                feature_dict['tte'].append(np.nan)
-            else:  # for entities with the event
-                feature_dict['tte'].append(tte_first - j + 1)
+        # This function generates the feature matrix for a specific TIRP-prefix by its index.
+        # The rows are indexed by the entity, the instance and the tick (the current duration of the last duration),
+        # and are weighted by the number of rows they represent (if they were sampled by the rows budget)
+        blocks = [self._create_feature_block(insts=self._tirp_prefixes_instances_w_event[tirp_prefix_id], class_val=1),
+                  self._create_feature_block(insts=self._tirp_prefixes_instances_wo_event[tirp_prefix_id], class_val=0)]
+        columns = {key: np.concatenate([block[key] for block in blocks]) for key in blocks[0] if key != 'tte'}
+        # the time to the event is not a number for the entities without the event (only if they have rows)
+        columns['tte'] = np.concatenate([block['tte'] for block in blocks if len(block['tte']) > 0] or
+                                        [blocks[0]['tte']])
+        rows, weights = self._sample_rows(ticks=columns[tirp_prefix_id - 1], durations=columns.pop('duration'))
+        feature_dict = {i: columns[i][rows] for i in range(tirp_prefix_id)}
+        feature_dict['class'] = columns['class'][rows]
+        feature_dict['tte'] = columns['tte'][rows]
+        feature_dict['weight'] = weights
+        index = pd.MultiIndex.from_arrays([columns[name][rows] for name in const.FEATURE_MATRIX_INDEX_NAMES],
+                                          names=const.FEATURE_MATRIX_INDEX_NAMES)
+        self.feature_matrices[tirp_prefix_id] = pd.DataFrame(feature_dict, index=index)
+
+    def _sample_rows(self, ticks: np.ndarray, durations: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        This function samples the rows of a feature matrix by the rows budget. The rows of an instance differ only by
+        their tick, thus a sampled row is weighted by the number of rows it represents, so the models that are learned
+        with the weights are not biased towards the instances with long durations or against them.
+        The row of the last tick of each instance (its full duration) is always kept, as FCPM learns from it
+        :param ticks: the tick of each row
+        :param durations: the last duration of the instance of each row
+        :return: the indices of the sampled rows (in their order), and their weights
+        """
+        num_of_rows = len(ticks)
+        if self._row_budget is None or num_of_rows <= self._row_budget:
+            return np.arange(num_of_rows), np.ones(num_of_rows)
+        is_last = ticks == durations
+        if self._row_sampling == const.FEATURE_MATRIX_SAMPLING_STRIDE:
+            # the ticks d, d - k, d - 2k, ... of each instance, and each represents the k ticks until it
+            stride = self._get_stride(durations=durations[is_last])
+            rows = np.flatnonzero((durations - ticks) % stride == 0)
+            return rows, np.minimum(stride, ticks[rows]).astype(np.float64)
+        # the other ticks are sampled uniformly, and each represents the other ticks by the inverse of its probability
+        other_rows = np.flatnonzero(~is_last)
+        num_of_samples = min(len(other_rows), max(0, self._row_budget - int(np.count_nonzero(is_last))))
+        sampled_rows = self._rng.choice(other_rows, size=num_of_samples, replace=False)
+        rows = np.sort(np.concatenate([np.flatnonzero(is_last), sampled_rows]))
+        if num_of_samples == 0:  # the last rows are over the budget, thus each one represents all its instance's ticks
+            return rows, durations[rows].astype(np.float64)
+        return rows, np.where(is_last[rows], 1.0, len(other_rows) / num_of_samples)
+
+    def _get_stride(self, durations: np.ndarray) -> int:
+        # This function returns the smallest stride that the sampled ticks of the instances (with the given durations)
+        # are within the rows budget, if even a single row per instance is not, the stride of a single row is returned
+        low, high = 1, int(durations.max())
+        while low < high:
+            stride = (low + high) // 2
+            if int(np.sum(-(-durations // stride))) <= self._row_budget:
+                high = stride
+            else:
+                low = stride + 1
+        return low
+
+    def _create_feature_block(self, insts: TIRPPrefixInstances, class_val: int) -> dict:
+        """
+        This function creates the rows of the instances (by their durations and end times) as arrays:
+        a row per tick j of the last duration of each instance (1 to the last duration), in which the previous durations
+        are repeated, the last duration is j, and the time to the event is computed for the entities with the event
+        :param insts: the instances of the TIRP-prefix
+        :param class_val: 1 for the instances in entities with the event, otherwise 0
+        :return: the columns of the rows, and the columns of their index
+        """
+        durations = insts.get_durations_between_all_tieps()
+        last_durations = durations[:, -1]
+        num_of_rows = int(last_durations.sum())
+        inst_rows = np.repeat(np.arange(len(durations)), last_durations)  # the instance of each row
+        first_rows = np.cumsum(last_durations) - last_durations
+        ticks = np.arange(num_of_rows, dtype=np.int64) - first_rows[inst_rows] + 1
+
+        block = {i: durations[inst_rows, i] for i in range(durations.shape[1] - 1)}  # the previous durations
+        block[durations.shape[1] - 1] = ticks  # the current duration
+        block['class'] = np.full(num_of_rows, class_val, dtype=np.int64)
+        entity_ids = insts.get_entity_ids()
+        if class_val == 1:  # for entities with the event
+            occur_times = np.array([self.event_occur_time[entity_id] for entity_id in entity_ids.tolist()])
+            tte_first = occur_times - insts.get_last_time_point_times() + last_durations
+            block['tte'] = tte_first[inst_rows] - ticks + 1
+        else:  # for entities without event
+            block['tte'] = np.full(num_of_rows, np.nan)
+        index_name_entity, index_name_inst, index_name_tick = const.FEATURE_MATRIX_INDEX_NAMES
+        block[index_name_entity] = entity_ids[inst_rows]
+        block[index_name_inst] = insts.get_inst_ids()[inst_rows]
+        block[index_name_tick] = ticks
+        block['duration'] = last_durations[inst_rows]  # only for sampling the rows
+        return block
 
     def compute_prob(self):
         """
@@ -127,13 +186,27 @@ class TIRPCompletionInstances:
         ***Thanks to @TaliMalenboim for debugging this function
         """
         num_of_prefixes = len(self._tirp_prefixes_instances_w_event)
-        # Pattern Q: Consider instances that occurred more than once in an entity only once
-        sup_q = self._tirp_prefixes_instances_w_event[num_of_prefixes - 1].get_unique_num_of_instances()
-        for i in range(num_of_prefixes):
-            # i-th Q-Prefix: Consider instances that occurred more than once in an entity only once
-            sup_i = self._tirp_prefixes_instances_w_event[i].get_unique_num_of_instances() \
-                    + self._tirp_prefixes_instances_wo_event[i].get_unique_num_of_instances()
-            self.support[i] = sup_q / sup_i
+        # Consider instances that occurred more than once in an entity only once
+        self.compute_prob_from_counts(
+            counts_w_event=[self._tirp_prefixes_instances_w_event[i].get_unique_num_of_instances()
+                            for i in range(num_of_prefixes)],
+            counts_wo_event=[self._tirp_prefixes_instances_wo_event[i].get_unique_num_of_instances()
+                             for i in range(num_of_prefixes)])
+
+    def compute_prob_from_counts(self, counts_w_event: list[int], counts_wo_event: list[int]):
+        """
+        The function computes the probabilities for each prefix of the pattern (see compute_prob)
+        from the number of entities with instances of each prefix, thus the instances are not required.
+        :param counts_w_event: the number of entities with the event of interest that have instances of each prefix
+        :param counts_wo_event: the number of entities without the event of interest that have instances of each prefix
+        """
+        # Pattern Q
+        sup_q = counts_w_event[-1]
+        for i in range(len(counts_w_event)):
+            # i-th Q-Prefix
+            sup_i = counts_w_event[i] + counts_wo_event[i]
+            # a prefix might not be detected at all (e.g., under the max gap and lookback window constraints)
+            self.support[i] = sup_q / sup_i if sup_i > 0 else 0.0
 
     def generate_feature_matrices(self, event_occur_time):
         # This function returns feature matrix for each pattern prefix
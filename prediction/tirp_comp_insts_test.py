@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+import const
+from prediction.tirp_comp_insts import TIRPCompletionInstances
+
+
+class TestTIRPCompletionInstances(unittest.TestCase):
+
+    def test_sample_rows(self):
+        """
+        Instances (by their last durations): 10, 4, 1
+        Rows: a row per tick of each instance (1, 2, ..., duration), 15 rows
+
+        This function tests that the rows are sampled within the rows budget, the row of the last tick of each
+        instance is kept, and the weights of the sampled rows of each class sum to the number of rows
+        """
+        durations = np.repeat([10, 4, 1], [10, 4, 1])
+        ticks = np.concatenate([np.arange(1, 11), np.arange(1, 5), np.arange(1, 2)])
+        for row_sampling in [const.FEATURE_MATRIX_SAMPLING_STRIDE, const.FEATURE_MATRIX_SAMPLING_RANDOM]:
+            for row_budget in [None, 1, 6, 15]:
+                tirp_comp_insts = TIRPCompletionInstances(tirp=None, row_budget=row_budget, row_sampling=row_sampling)
+                rows, weights = tirp_comp_insts._sample_rows(ticks=ticks, durations=durations)
+                self.assertEqual(rows.tolist(), sorted(rows.tolist()))
+                self.assertAlmostEqual(weights.sum(), len(ticks))
+                self.assertTrue(set(np.flatnonzero(ticks == durations)) <= set(rows.tolist()))
+                if row_budget is not None and row_budget >= 3:  # a row per instance is within the budget
+                    self.assertLessEqual(len(rows), row_budget)
+
+        tirp_comp_insts = TIRPCompletionInstances(tirp=None, row_budget=6,
+                                                  row_sampling=const.FEATURE_MATRIX_SAMPLING_STRIDE)
+        rows, weights = tirp_comp_insts._sample_rows(ticks=ticks, durations=durations)
+        self.assertEqual(ticks[rows].tolist(), [2, 6, 10, 4, 1])
+        self.assertEqual(weights.tolist(), [2, 4, 4, 4, 1])
+
+    def test_unknown_row_sampling(self):
+        with self.assertRaises(Exception):
+            TIRPCompletionInstances(tirp=None, row_sampling='all')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+from typing import Iterable, Optional, Union
+
+import const
+from core_comp.sti_db import STIDB
+from core_comp.sti_series import STISeries
+from core_comp.tirp import TIRP
+from tirp_prefixes.tirp_prefix_detection_state import TIRPPrefixDetectionState
+from tirp_prefixes.tirp_prefix_insts import TIRPPrefixInstances
+from tirp_prefixes.tirp_prefix_trie import TIRPPrefixTrie
+
+
+class TIRPCompletionSweep:
+    """
+    An entity-major pass over the train set, which detects the instances of the prefixes of multiple TIRPs
+    (instead of passing over the train set once per TIRP). Each series is visited once, and its time points are
+    added one after the other to a detection state of the prefix trie of the TIRPs, thus each time point extends only
+    the prefixes that their tieps are in it. The instances of each TIRP's prefixes are then taken by its completion
+    model (see TIRPCompletion), and are the same as the instances it detects in the train set by itself
+    """
+    def __init__(self, tirps: list[TIRP], prefix_trie: Optional[TIRPPrefixTrie] = None):
+        """
+        :param tirps: the TIRPs to detect the instances of their prefixes
+        :param prefix_trie: a trie that the TIRPs were added to, if None a trie of the TIRPs is created
+        """
+        self._prefix_trie: TIRPPrefixTrie = TIRPPrefixTrie(tirps=tirps) if prefix_trie is None else prefix_trie
+        self._tirps_nodes: dict = {tirp.get_tieps_str(): self._prefix_trie.get_prefix_nodes(tirp) for tirp in tirps}
+        self._insts_w_event: dict[str, list[TIRPPrefixInstances]] = {}
+        self._insts_wo_event: dict[str, list[TIRPPrefixInstances]] = {}
+        for tirp_str, nodes in self._tirps_nodes.items():
+            self._insts_w_event[tirp_str] = [TIRPPrefixInstances(node.get_tirp_prefix()) for node in nodes]
+            self._insts_wo_event[tirp_str] = [TIRPPrefixInstances(node.get_tirp_prefix()) for node in nodes]
+        self._number_of_entities: int = 0
+        self._event_occr_time: dict = {}
+
+    def sweep(self, sti_train_set: Union[STIDB, Iterable[STISeries]]):
+        """
+        This function detects the instances of the prefixes in the train set, which is passed only once
+        :param sti_train_set: the train set, either an STI DB or an iterable (e.g., a stream) of STI series
+        """
+        if isinstance(sti_train_set, STIDB):
+            self._number_of_entities = sti_train_set.get_number_of_entities()
+            self._event_occr_time = sti_train_set.get_event_occur_time()
+            sti_series_iter = sti_train_set.get_sti_series()
+        else:
+            sti_series_iter = self._count_sti_series(sti_train_set)
+        for sti_series in sti_series_iter:
+            if sti_series.get_series_id() in self._event_occr_time:
+                self._sweep_sti_series(sti_series=sti_series, tirps_insts=self._insts_w_event)
+            else:
+                self._sweep_sti_series(sti_series=sti_series, tirps_insts=self._insts_wo_event)
+
+    def _count_sti_series(self, sti_series_iter: Iterable[STISeries]):
+        # This function yields each series of a stream, and keeps the number of entities and the event times
+        for sti_series in sti_series_iter:
+            self._number_of_entities += 1
+            if sti_series.is_symbol_in_series(const.EVENT_INDEX):
+                self._event_occr_time[sti_series.get_series_id()] = sti_series.get_last_sti_end_time()
+            yield sti_series
+
+    def _sweep_sti_series(self, sti_series: STISeries, tirps_insts: dict[str, list[TIRPPrefixInstances]]):
+        # This function detects the instances of all the prefixes in a single pass over the series' time points.
+        # The support is anti-monotone, thus once a prefix has no instances the longer prefixes have no instances too
+        sti_series_id = sti_series.get_series_id()
+        detection_state = TIRPPrefixDetectionState(entity_id=sti_series_id, prefix_trie=self._prefix_trie)
+        updated_nodes = set()
+        for time_point in sti_series.get_time_points().get_time_point_series():
+            updated_nodes.update(detection_state.add_time_point(time_point))
+        if not updated_nodes:
+            return
+        for tirp_str, nodes in self._tirps_nodes.items():
+            for node, tirp_prefix_instances in zip(nodes, tirps_insts[tirp_str]):
+                if node not in updated_nodes:
+                    break
+                # the instances of the prefix are selected by the instance semantics from the generated instances
+                for inst_j, inst in enumerate(detection_state.get_instances(node)):
+                    tirp_prefix_instances.add_instance(entity_id=sti_series_id, inst_id=inst_j, inst=inst)
+
+    def get_number_of_entities(self) -> int:
+        return self._number_of_entities
+
+    def get_event_occur_time(self) -> dict:
+        return self._event_occr_time
+
+    def pop_prefixes_instances(self, tirp: TIRP) -> tuple[list[TIRPPrefixInstances], list[TIRPPrefixInstances]]:
+        # returns the instances of the TIRP's prefixes in the series with and without the event,
+        # which are removed from the sweep as they are kept by the TIRP's completion model
+        tirp_str = tirp.get_tieps_str()
+        return self._insts_w_event.pop(tirp_str), self._insts_wo_event.pop(tirp_str)
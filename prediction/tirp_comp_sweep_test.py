@@ -0,0 +1,75 @@
+import unittest
+
+import const
+from core_comp.sti import STI
+from core_comp.sti_db import STIDB
+from core_comp.sti_series import STISeries
+from core_comp.tiep import Tiep
+from core_comp.tirp import TIRP
+from prediction.tirp_comp_sweep import TIRPCompletionSweep
+from tirp_prefixes.tirp_prefix import TIRPrefix
+from tirp_prefixes.tirp_prefix_detection import TIRPrefixDetection
+
+
+class TestTIRPCompletionSweep(unittest.TestCase):
+
+    def test_sweep(self):
+        """
+        TIRPs:
+        +1<-1<+2<-2<+999<-999
+        +1<+2<-1<-2<+999<-999
+
+        STI Series:
+        (0)  -1-  -2-  -1-            -999-
+                         ---2---
+        (1)  -1-  -1-
+                    ---2---
+
+        This function tests that the instances of the TIRPs' prefixes that are detected in a single pass over the
+        series are the instances that are detected in each series per prefix
+        """
+        tirps = [TIRP(stis=[1, 2, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_BEFORE] * 3, vs=0.5, hs=1.0),
+                 TIRP(stis=[1, 2, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_OVERLAPS, const.TEMP_REL_BEFORE,
+                                                               const.TEMP_REL_BEFORE], vs=0.5, hs=1.0)]
+        sti_series_list = [
+            STISeries(series_id=0, stis_list=[
+                self._create_sti_instance(start_time=1, end_time=3, sym_id=1, sym_inst_id=1),
+                self._create_sti_instance(start_time=5, end_time=7, sym_id=2, sym_inst_id=1),
+                self._create_sti_instance(start_time=9, end_time=11, sym_id=1, sym_inst_id=2),
+                self._create_sti_instance(start_time=10, end_time=14, sym_id=2, sym_inst_id=2),
+                self._create_sti_instance(start_time=20, end_time=22, sym_id=const.EVENT_INDEX, sym_inst_id=1)]),
+            STISeries(series_id=1, stis_list=[
+                self._create_sti_instance(start_time=1, end_time=3, sym_id=1, sym_inst_id=1),
+                self._create_sti_instance(start_time=5, end_time=7, sym_id=1, sym_inst_id=2),
+                self._create_sti_instance(start_time=6, end_time=10, sym_id=2, sym_inst_id=1)]),
+        ]
+        sti_db = STIDB(sti_series_list=sti_series_list)
+        train_sweep = TIRPCompletionSweep(tirps=tirps)
+        train_sweep.sweep(sti_db)
+        self.assertEqual(train_sweep.get_number_of_entities(), 2)
+        self.assertEqual(list(train_sweep.get_event_occur_time().keys()), [0])
+
+        for tirp in tirps:
+            insts_w_event, insts_wo_event = train_sweep.pop_prefixes_instances(tirp)
+            for i in range(len(tirp.get_sorted_tieps()) - 1):
+                tirp_prefix = TIRPrefix(tieps=tirp.get_sorted_tieps()[:i + 1])
+                for sti_series, tirp_prefix_instances in zip(sti_series_list, [insts_w_event[i], insts_wo_event[i]]):
+                    expected_insts = TIRPrefixDetection(tirp_prefix=tirp_prefix).detect(
+                        sti_series_id=sti_series.get_series_id(), time_point_series=sti_series.get_time_points())
+                    self.assertEqual(tirp_prefix_instances.get_num_of_instances(), len(expected_insts))
+                    self.assertEqual(tirp_prefix_instances.get_durations_between_all_tieps().tolist(),
+                                     [inst.get_durations_between_all_tieps() for inst in expected_insts])
+
+    @staticmethod
+    def _create_sti_instance(start_time, end_time, sym_id, sym_inst_id) -> STI:
+        start_tiep = Tiep(time=start_time, tiep_type=const.START_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                          var_id=sym_id)
+        end_tiep = Tiep(time=end_time, tiep_type=const.END_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                        var_id=sym_id)
+        start_tiep.add_pair_tiep(end_tiep)
+        end_tiep.add_pair_tiep(start_tiep)
+        return STI(start_tiep, end_tiep)
+
+
+if __name__ == '__main__':
+    unittest.main()
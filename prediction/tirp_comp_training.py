@@ -0,0 +1,87 @@
+import multiprocessing
+from typing import Optional
+
+import const
+from core_comp.sti_db import STIDB
+from core_comp.tirp import TIRP
+from prediction.tirp_comp import TIRPCompletion
+from prediction.tirp_comp_sweep import TIRPCompletionSweep
+from tirp_prefixes.tirp_prefix_trie import TIRPPrefixTrie
+
+# the train set of a training process, which is shipped once to each process (and not with each shard)
+_process_train_set: Optional[STIDB] = None
+_process_entity_major: bool = const.TRAIN_ENTITY_MAJOR
+
+
+def train_tirp_comp_models(tirps_list: list[TIRP], train_set: STIDB, prefix_trie: Optional[TIRPPrefixTrie] = None,
+                           num_of_jobs: Optional[int] = const.TRAIN_NUM_OF_JOBS,
+                           shard_size: int = const.TRAIN_SHARD_SIZE,
+                           entity_major: bool = const.TRAIN_ENTITY_MAJOR) -> list[TIRPCompletion]:
+    """
+    This function learns a completion model (probability and time to event) for each TIRP.
+    The TIRPs are independent, thus with multiple jobs the list of TIRPs is split into shards of consecutive TIRPs
+    that are trained by a pool of processes, and the trained models are returned after their training structures
+    were removed (see TIRPCompletion.post_training_deletion), so they are compact to send back.
+    With a single job and an entity-major pass, the shards are swept one after the other in this process
+    :param tirps_list: the TIRPs to learn their completion
+    :param train_set: the train set
+    :param prefix_trie: a trie that the TIRPs were added to, which is used only when training in this process
+                        (each shard of multiple shards is trained with a trie of its TIRPs)
+    :param num_of_jobs: the number of processes, one for training in this process and None for all the CPUs
+    :param shard_size: the number of TIRPs in each shard
+    :param entity_major: if True, the instances of all the TIRPs (of a shard) are detected in a single pass over the
+                         train set (see TIRPCompletionSweep), otherwise each TIRP passes over the train set
+    :return: the learned models, in the order of the TIRPs
+    """
+    shards = [tirps_list[i:i + shard_size] for i in range(0, len(tirps_list), shard_size)]
+    if num_of_jobs == 1:
+        if not entity_major:
+            return _train_tirp_comp_models(tirps_list=tirps_list, train_set=train_set, prefix_trie=prefix_trie,
+                                           entity_major=False)
+        # the instances of a sweep are kept until all of its TIRPs are trained, thus the TIRPs are swept shard by
+        # shard to bound the memory, as with multiple jobs (the given trie is used only when there is a single shard)
+        return [tirp_comp for shard in shards
+                for tirp_comp in _train_tirp_comp_models(
+                    tirps_list=shard, train_set=train_set, entity_major=True,
+                    prefix_trie=prefix_trie if len(shards) == 1 else TIRPPrefixTrie(tirps=shard))]
+
+    with multiprocessing.Pool(processes=num_of_jobs, initializer=_init_training_process,
+                              initargs=(train_set, entity_major)) as pool:
+        return [tirp_comp for shard_models in pool.imap(_train_shard, shards) for tirp_comp in shard_models]
+
+
+def _init_training_process(train_set: STIDB, entity_major: bool):
+    # This function keeps the train set (and how to pass over it) in the training process
+    global _process_train_set, _process_entity_major
+    _process_train_set, _process_entity_major = train_set, entity_major
+
+
+def _train_shard(tirps_list: list[TIRP]) -> list[TIRPCompletion]:
+    # This function trains the models of a shard in a training process, the prefixes that the TIRPs of the shard share
+    # are detected once by a trie of the shard
+    return _train_tirp_comp_models(tirps_list=tirps_list, train_set=_process_train_set,
+                                   prefix_trie=TIRPPrefixTrie(tirps=tirps_list), entity_major=_process_entity_major)
+
+
+def _train_tirp_comp_models(tirps_list: list[TIRP], train_set: STIDB, prefix_trie: Optional[TIRPPrefixTrie],
+                            entity_major: bool) -> list[TIRPCompletion]:
+    # This function learns the completion models of the TIRPs in this process
+    if not entity_major:
+        return [_train_tirp_comp_model(tirp=tirp, train_set=train_set, prefix_trie=prefix_trie)
+                for tirp in tirps_list]
+    train_sweep = TIRPCompletionSweep(tirps=tirps_list, prefix_trie=prefix_trie)
+    train_sweep.sweep(train_set)
+    return [_train_tirp_comp_model(tirp=tirp, train_set=None, prefix_trie=None, train_sweep=train_sweep)
+            for tirp in tirps_list]
+
+
+def _train_tirp_comp_model(tirp: TIRP, train_set: Optional[STIDB], prefix_trie: Optional[TIRPPrefixTrie],
+                           train_sweep: Optional[TIRPCompletionSweep] = None) -> TIRPCompletion:
+    # This function learns the completion model of a TIRP and removes its training structures
+    tirp_comp = TIRPCompletion(tirp=tirp, sti_train_set=train_set, prefix_trie=prefix_trie, train_sweep=train_sweep)
+    tirp_comp.learn_occ_prob_model(cls_name=const.MOD_CLS_SCPM_NAME)
+    tirp_comp.learn_occ_prob_model(cls_name=const.MOD_CLS_FCPM_NAME, params=const.MOD_CLS_FCPM_PARAMS)
+    tirp_comp.learn_occ_prob_model(cls_name=const.MOD_CLS_XGB_NAME)
+    tirp_comp.learn_occ_time_model(cls_name=const.MOD_REG_GAM_GLM_NAME)
+    tirp_comp.post_training_deletion()
+    return tirp_comp
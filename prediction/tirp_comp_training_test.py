@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import const
+from core_comp.sti import STI
+from core_comp.sti_db import STIDB
+from core_comp.sti_series import STISeries
+from core_comp.tiep import Tiep
+from core_comp.tirp import TIRP
+from prediction.tirp_comp_training import train_tirp_comp_models
+from tirp_prefixes.tirp_prefix_array_detection import TIRPrefixArrayDetection
+from tirp_prefixes.tirp_prefix_detection import TIRPrefixDetection
+
+
+class TestTIRPCompletionTraining(unittest.TestCase):
+
+    def test_train_with_empty_prefix(self):
+        """
+        TIRP:
+        +1<-1<+2<-2<+999<-999
+
+        STI Series (train, the event is in the even entities):
+        -1-                 ---2---  -999-
+
+        This function tests that the models are learned when a max gap constraint empties the prefixes that end
+        after the long gap (the models of these prefixes predict constant values)
+        """
+        tirp = TIRP(stis=[1, 2, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_BEFORE] * 3, vs=0.5, hs=1.0)
+        sti_series_list = []
+        for series_id in range(6):
+            stis_list = [self._create_sti_instance(start_time=1 + series_id % 3, end_time=3 + series_id,
+                                                   sym_id=1, sym_inst_id=1),
+                         self._create_sti_instance(start_time=20, end_time=24, sym_id=2, sym_inst_id=1)]
+            if series_id % 2 == 0:
+                stis_list.append(self._create_sti_instance(start_time=26, end_time=28, sym_id=const.EVENT_INDEX,
+                                                           sym_inst_id=1))
+            sti_series_list.append(STISeries(series_id=series_id, stis_list=stis_list))
+        train_set = STIDB(sti_series_list=sti_series_list)
+
+        max_gap = 5
+        for detection in [TIRPrefixDetection, TIRPrefixArrayDetection]:
+            defaults = detection.__init__.__defaults__
+            self.assertEqual(len(defaults), 4)  # inst_semantics, top_n, max_gap and lookback_window
+            self.enterContext(mock.patch.object(detection.__init__, '__defaults__',
+                                                defaults[:2] + (max_gap, defaults[3])))
+
+        for entity_major in [False, True]:
+            tirp_comp = train_tirp_comp_models(tirps_list=[tirp], train_set=train_set, prefix_trie=None,
+                                               num_of_jobs=1, shard_size=1, entity_major=entity_major)[0]
+            # the model of the detected prefix +1<-1 is learned, and the prefixes from +2 (the third tiep) are not
+            # detected, thus the models of their feature matrices (feature matrix i is of prefix i) predict constants
+            self.assertIsNone(tirp_comp.prob_model[const.MOD_CLS_XGB_NAME][1].const_val)
+            self.assertIsNone(tirp_comp.time_model[const.MOD_REG_GAM_GLM_NAME][1].const_val)
+            for prefix_index in [2, 3, 4]:
+                inst_rows = np.ones((3, prefix_index + 1))
+                for cls_name in [const.MOD_CLS_XGB_NAME, const.MOD_CLS_FCPM_NAME]:
+                    self.assertEqual(tirp_comp.prob_model[cls_name][prefix_index].predict_proba_batch(inst_rows)
+                                     .tolist(), [const.MOD_EMPTY_TRAIN_PROB] * 3)
+                self.assertEqual(tirp_comp.time_model[const.MOD_REG_GAM_GLM_NAME][prefix_index]
+                                 .predict_time_batch(inst_rows).tolist(), [const.MOD_EMPTY_TRAIN_TTE] * 3)
+
+    @staticmethod
+    def _create_sti_instance(start_time, end_time, sym_id, sym_inst_id) -> STI:
+        start_tiep = Tiep(time=start_time, tiep_type=const.START_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                          var_id=sym_id)
+        end_tiep = Tiep(time=end_time, tiep_type=const.END_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                        var_id=sym_id)
+        start_tiep.add_pair_tiep(end_tiep)
+        end_tiep.add_pair_tiep(start_tiep)
+        return STI(start_tiep, end_tiep)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,6 +17,10 @@ class TIRPrefix:
     def get_tieps(self) -> list[list[Tiep]]:
         return self._tieps
 
+    def get_tiep_keys(self) -> set[tuple]:
+        # returns the keys (type and symbol id) of all the tieps in the prefix
+        return {tiep.get_tiep_key() for tieps in self._tieps for tiep in tieps}
+
     def get_tieps_str(self) -> str:
         # returns str representation of the TIRP prefix
         tiep_str = ''
@@ -24,7 +28,7 @@ class TIRPrefix:
             if len(tps) > 1:
                 tiep_str += '('
             for tp in tps:
-                tiep_str += f'{tp._tiep_type}{tp._sym_id}'
+                tiep_str += f'{tp.get_tiep_type()}{tp.get_symbol_id()}'
             if len(tps) > 1:
                 tiep_str += ')'
             if i != len(self._tieps) - 1:
@@ -0,0 +1,226 @@
+from functools import reduce
+from typing import Optional, Union
+
+import numpy as np
+
+import const
+from core_comp.time_point import TimePoint
+from core_comp.time_point_series import TimePointSeries
+from core_comp.time_point_series_arrays import TimePointSeriesArrays
+from core_comp.time_point_series_node import TimePointSeriesNode
+from core_comp.time_point_series_view import TimePointSeriesView
+from tirp_prefixes.tirp_prefix import TIRPrefix
+from tirp_prefixes.tirp_prefix_inst_semantics import TIRPPrefixInstSemantics
+
+
+class TIRPrefixArrayDetection:
+    """
+    this class detect TIRP prefixes instances over the arrays encoding of the time point series
+    (see TIRPrefixDetection for the detection over the tieps objects, both detect the same instances in the same order).
+    The instances of each prefix are kept as rows of the indices of their tieps, the candidate time points of the
+    next tieps are joined with the previous instances that end before them by a binary search on their end times,
+    and the unfinished STIs and closed end tieps constraints are checked by array masks over all the joined pairs.
+    The NumPy calls have a fixed cost per prefix, thus it is slower than TIRPrefixDetection on short series
+    (see const.TIRP_DETECTION_ENGINE)
+    """
+    _NO_OPEN_END_TIME = np.iinfo(np.int64).max
+
+    def __init__(self, tirp_prefix: TIRPrefix, inst_semantics: str = const.TIRP_INST_SEMANTICS,
+                 top_n: int = const.TIRP_INST_TOP_N, max_gap: Optional[int] = const.TIRP_MAX_GAP,
+                 lookback_window: Optional[int] = const.TIRP_LOOKBACK_WINDOW):
+        """
+        :param tirp_prefix: the TIRP prefix to detect
+        :param inst_semantics: the semantics of the instances that are kept (see TIRPPrefixInstSemantics)
+        :param top_n: the number of the most recent instances that are kept with the top_n semantics
+        :param max_gap: the maximal duration between consecutive time points of an instance, None for no constraint
+        :param lookback_window: the maximal duration from the first time point of an instance to the current time,
+                                None for no constraint (see TIRPrefixDetection)
+        """
+        self._max_gap: Optional[int] = max_gap
+        self._lookback_window: Optional[int] = lookback_window
+        self._tirp_prefix: TIRPrefix = tirp_prefix
+        self._inst_semantics: TIRPPrefixInstSemantics = TIRPPrefixInstSemantics(inst_semantics=inst_semantics,
+                                                                                top_n=top_n)
+        self._tiep_keys: list[list[tuple]] = [[tiep.get_tiep_key() for tiep in tieps]
+                                              for tieps in tirp_prefix.get_tieps()]
+
+    def detect(self, sti_series_id: int,
+               time_point_series: Union[TimePointSeries, TimePointSeriesView]) -> list[TimePointSeriesNode]:
+        """
+        This function detects instances of the TIRP-prefix in the given sorted time point series.
+        :param sti_series_id: the id of the series
+        :param time_point_series: the time point series or a view of its time points before a given time
+        :return: the instances of the TIRP-prefix
+        """
+        tiep_arrays = time_point_series.get_tiep_arrays()
+        levels = self._detect_levels(tiep_arrays=tiep_arrays,
+                                     num_of_time_points=time_point_series.get_num_of_time_points(),
+                                     whole_prefix_only=True)
+        if len(levels) < len(self._tiep_keys):
+            return []
+        prefixes_insts = self._create_instances(sti_series_id=sti_series_id, tiep_arrays=tiep_arrays, levels=levels)
+        return self.select_instances(prefixes_insts[-1])
+
+    def get_lookback_window(self) -> Optional[int]:
+        return self._lookback_window
+
+    def select_instances(self, insts: list[TimePointSeriesNode],
+                         current_time: Optional[int] = None) -> list[TimePointSeriesNode]:
+        # returns the instances of the prefix by the instance semantics from the instances that detect_prefixes returns,
+        # only the instances that started within the lookback window from the current time (if given) are selected
+        if self._lookback_window is not None and current_time is not None:
+            min_first_time = current_time - self._lookback_window
+            insts = [inst for inst in insts if inst.get_first_time_point_time() >= min_first_time]
+        return self._inst_semantics.select_instances(insts)
+
+    def detect_prefixes(self, sti_series_id: int, time_point_series: Union[TimePointSeries, TimePointSeriesView]
+                        ) -> list[list[TimePointSeriesNode]]:
+        """
+        This function detects the instances of each prefix of the TIRP-prefix in the given sorted time point series.
+        :param sti_series_id: the id of the series
+        :param time_point_series: the time point series or a view of its time points before a given time
+        :return: the generated instances of each prefix (from the shortest to the longest), the instances of each
+                 prefix are sorted by their end times, and should be selected by the instance semantics
+        """
+        tiep_arrays = time_point_series.get_tiep_arrays()
+        levels = self._detect_levels(tiep_arrays=tiep_arrays,
+                                     num_of_time_points=time_point_series.get_num_of_time_points())
+        prefixes_insts = self._create_instances(sti_series_id=sti_series_id, tiep_arrays=tiep_arrays, levels=levels)
+        return prefixes_insts + [[] for _ in range(len(self._tiep_keys) - len(prefixes_insts))]
+
+    def _detect_levels(self, tiep_arrays: TimePointSeriesArrays, num_of_time_points: int,
+                       whole_prefix_only: bool = False) -> list[tuple]:
+        # This function detects the instances of the prefixes one after the other (each one is a level) as arrays:
+        # the index of the extended instance of the previous level, the extending time point, and its matched tieps.
+        # The candidates of all the levels are found first, thus if only the instances of the whole TIRP-prefix are
+        # needed, nothing is joined when the tieps of a level are not in the series
+        levels = []
+        tp_times = tiep_arrays.get_time_point_times()
+        levels_cands = [self._get_candidates(tiep_arrays=tiep_arrays, tiep_keys=tiep_keys,
+                                             num_of_time_points=num_of_time_points) for tiep_keys in self._tiep_keys]
+        if whole_prefix_only and any(len(cand_tps) == 0 for cand_tps, _ in levels_cands):
+            return levels
+        # open_times[r, j] is the end time of the tiep j of the instance r if it is a start tiep that is not closed
+        # by a later end tiep of the instance, the earliest one is the latest time the instance could be extended to
+        rows, first_times, end_times, open_times = None, None, None, None
+        for cand_tps, cand_tieps in levels_cands:
+            if rows is None:  # the first pattern's tieps
+                cands = np.arange(len(cand_tps), dtype=np.int64)
+                parents = np.full(len(cands), -1, dtype=np.int64)
+                rows = cand_tieps
+                first_times = tp_times[cand_tps]
+                open_times = self._get_open_pair_times(tiep_arrays=tiep_arrays, tieps=cand_tieps)
+            else:
+                parents, cands, closed = self._join_candidates(
+                    tiep_arrays=tiep_arrays, rows=rows, first_times=first_times, end_times=end_times,
+                    open_end_times=open_times.min(axis=1), cand_times=tp_times[cand_tps], cand_tieps=cand_tieps)
+                rows = np.hstack([rows[parents], cand_tieps[cands]])
+                first_times = first_times[parents]
+                open_times = np.hstack([np.where(closed, self._NO_OPEN_END_TIME, open_times[parents]),
+                                        self._get_open_pair_times(tiep_arrays=tiep_arrays, tieps=cand_tieps[cands])])
+                # only the equivalent instances up to the bound of the instance semantics are generated
+                mask = self._inst_semantics.get_equivalent_instances_mask(
+                    num_of_insts=len(cands), get_group_ids=lambda: self._get_equivalence_group_ids(
+                        rows=rows, first_times=first_times, open_times=open_times, cands=cands))
+                if mask is not None:
+                    parents, cands, rows, first_times, open_times = \
+                        parents[mask], cands[mask], rows[mask], first_times[mask], open_times[mask]
+            if len(cands) == 0:
+                break
+            levels.append((parents, cand_tps[cands], cand_tieps[cands]))
+            end_times = tp_times[cand_tps[cands]]
+        return levels
+
+    @staticmethod
+    def _get_candidates(tiep_arrays: TimePointSeriesArrays, tiep_keys: list[tuple], num_of_time_points: int):
+        # This function returns the time points that include all the given tieps, with the first tiep
+        # that is the same as each given tiep in each of them (as in the tieps objects detection)
+        tieps_with_keys = [tiep_arrays.get_first_tieps_with_key(tiep_key) for tiep_key in tiep_keys]
+        if len(tieps_with_keys) == 1:  # the first tieps are the candidates as is
+            cand_tps, first_tieps = tieps_with_keys[0]
+            num_of_cands = np.searchsorted(cand_tps, num_of_time_points)  # only the time points in the view
+            return cand_tps[:num_of_cands], first_tieps[:num_of_cands, None]
+        cand_tps = reduce(np.intersect1d, (tp_offsets for tp_offsets, _ in tieps_with_keys))
+        cand_tps = cand_tps[:np.searchsorted(cand_tps, num_of_time_points)]  # only the time points in the view
+        cand_tieps = np.empty((len(cand_tps), len(tiep_keys)), dtype=np.int64)
+        for j, (tp_offsets, first_tieps) in enumerate(tieps_with_keys):
+            cand_tieps[:, j] = first_tieps[np.searchsorted(tp_offsets, cand_tps)]
+        return cand_tps, cand_tieps
+
+    def _join_candidates(self, tiep_arrays: TimePointSeriesArrays, rows: np.ndarray, first_times: np.ndarray,
+                         end_times: np.ndarray, open_end_times: np.ndarray, cand_times: np.ndarray,
+                         cand_tieps: np.ndarray):
+        # This function joins the candidate time points with the previous instances that could be extended by them.
+        # The previous instances are sorted by their end times, thus the instances that end before each candidate
+        # (and within the max gap before it) are a range of rows that is found by a binary search. The ranges of all
+        # the candidates are expanded into (candidate, row) pairs, and the constraints are checked over all the pairs.
+        # Returns the rows and the candidates of the valid pairs, and the tieps of the rows that their candidates close
+        num_of_before_rows = np.searchsorted(end_times, cand_times, side='left')
+        if self._max_gap is None:
+            first_rows = np.zeros(len(cand_times), dtype=np.int64)
+        else:
+            first_rows = np.searchsorted(end_times, cand_times - self._max_gap, side='left')
+        nums_of_rows = np.maximum(num_of_before_rows - first_rows, 0)
+        cands = np.repeat(np.arange(len(cand_times), dtype=np.int64), nums_of_rows)
+        range_starts = np.repeat(np.cumsum(nums_of_rows) - nums_of_rows, nums_of_rows)
+        parents = first_rows[cands] + np.arange(len(cands), dtype=np.int64) - range_starts
+        pair_times = cand_times[cands]
+        # the STIs that should be unfinished are not finished before the candidate time point
+        mask = open_end_times[parents] >= pair_times
+        if self._lookback_window is not None:
+            mask &= pair_times - first_times[parents] <= self._lookback_window
+        parents, cands = parents[mask], cands[mask]
+        # the end tieps of the candidate time point close start tieps of the instance
+        row_key_ids = tiep_arrays.get_tiep_key_ids()[rows[parents]]
+        pair_key_ids = tiep_arrays.get_tiep_pair_key_ids()
+        closed = np.zeros(row_key_ids.shape, dtype=bool)
+        mask = np.ones(len(parents), dtype=bool)
+        for cand_tiep_col in cand_tieps.T:
+            is_end = tiep_arrays.is_end_type(cand_tiep_col)[cands]
+            if is_end.any():
+                closes = (row_key_ids == pair_key_ids[cand_tiep_col[cands]][:, None]) & is_end[:, None]
+                mask &= ~is_end | closes.any(axis=1)
+                closed |= closes
+        return parents[mask], cands[mask], closed[mask]
+
+    def _get_equivalence_group_ids(self, rows: np.ndarray, first_times: np.ndarray, open_times: np.ndarray,
+                                   cands: np.ndarray) -> np.ndarray:
+        # This function returns the group of the equivalent instances of each instance (as in the tieps objects
+        # detection): the instances that end in the same candidate time point with the same set of open start tieps,
+        # and the same first time point when there is a lookback window
+        open_tieps = np.sort(np.where(open_times != self._NO_OPEN_END_TIME, rows, -1), axis=1)
+        keys = [cands[:, None], open_tieps]
+        if self._lookback_window is not None:
+            keys.append(first_times[:, None])
+        return np.unique(np.hstack(keys), axis=0, return_inverse=True)[1].reshape(-1)
+
+    def _get_open_pair_times(self, tiep_arrays: TimePointSeriesArrays, tieps: np.ndarray) -> np.ndarray:
+        # This function returns the end times of the given tieps that are start tieps (of the STIs that are not
+        # finished in the tieps), which keep the instance open until a later end tiep closes them
+        is_open_start = tiep_arrays.is_start_type(tieps) & (tiep_arrays.get_tiep_pair_key_ids()[tieps] >= 0)
+        return np.where(is_open_start, tiep_arrays.get_tiep_pair_times()[tieps], self._NO_OPEN_END_TIME)
+
+    @staticmethod
+    def _create_instances(sti_series_id: int, tiep_arrays: TimePointSeriesArrays,
+                          levels: list[tuple]) -> list[list[TimePointSeriesNode]]:
+        # This function creates the instances of each level, the instances share the nodes of their previous instances
+        # and the instances that are extended by the same time point share its time point (as in the tieps objects
+        # detection)
+        tieps = tiep_arrays.get_tieps()
+        tp_times = tiep_arrays.get_time_point_times()
+        prefixes_insts = []
+        prev_insts = None
+        for parents, tp_offsets, matched_tieps in levels:
+            insts = []
+            time_points = {}
+            for parent, tp_offset, tiep_indices in zip(parents.tolist(), tp_offsets.tolist(), matched_tieps.tolist()):
+                if tp_offset not in time_points:
+                    time_points[tp_offset] = TimePoint(time=int(tp_times[tp_offset]),
+                                                       tieps=[tieps[tiep_index] for tiep_index in tiep_indices])
+                if prev_insts is None:
+                    insts.append(TimePointSeriesNode(entity_id=sti_series_id, time_point=time_points[tp_offset]))
+                else:
+                    insts.append(prev_insts[parent].extend(time_points[tp_offset]))
+            prefixes_insts.append(insts)
+            prev_insts = insts
+        return prefixes_insts
@@ -1,18 +1,53 @@
-import copy
-from typing import Optional
+from typing import Optional, Union
+
+import const
 
 from core_comp.tiep import Tiep
 from core_comp.time_point import TimePoint
 from core_comp.time_point_series import TimePointSeries
+from core_comp.time_point_series_node import TimePointSeriesNode
+from core_comp.time_point_series_view import TimePointSeriesView
 from tirp_prefixes.tirp_prefix import TIRPrefix
+from tirp_prefixes.tirp_prefix_inst_semantics import TIRPPrefixInstSemantics
 
 
 class TIRPrefixDetection:
     """
     this class detect TIRP prefixes instances
     """
-    def __init__(self, tirp_prefix: TIRPrefix):
+    def __init__(self, tirp_prefix: TIRPrefix, inst_semantics: str = const.TIRP_INST_SEMANTICS,
+                 top_n: int = const.TIRP_INST_TOP_N, max_gap: Optional[int] = const.TIRP_MAX_GAP,
+                 lookback_window: Optional[int] = const.TIRP_LOOKBACK_WINDOW):
+        """
+        :param tirp_prefix: the TIRP prefix to detect
+        :param inst_semantics: the semantics of the instances that are kept (see TIRPPrefixInstSemantics)
+        :param top_n: the number of the most recent instances that are kept with the top_n semantics
+        :param max_gap: the maximal duration between consecutive time points of an instance, None for no constraint
+        :param lookback_window: the maximal duration from the first time point of an instance to the current time,
+                                None for no constraint. An instance is not extended beyond the window, and the instances
+                                at a current time are selected only if they started within the window
+        """
         self._tirp_prefix: TIRPrefix = tirp_prefix
+        self._inst_semantics: TIRPPrefixInstSemantics = TIRPPrefixInstSemantics(inst_semantics=inst_semantics,
+                                                                                top_n=top_n)
+        self._max_gap: Optional[int] = max_gap
+        self._lookback_window: Optional[int] = lookback_window
+
+    def get_lookback_window(self) -> Optional[int]:
+        return self._lookback_window
+
+    def select_instances(self, insts: list[TimePointSeriesNode],
+                         current_time: Optional[int] = None) -> list[TimePointSeriesNode]:
+        # returns the instances of the prefix by the instance semantics from the instances that extend returns,
+        # only the instances that started within the lookback window from the current time (if given) are selected
+        if self._lookback_window is not None and current_time is not None:
+            insts = self.get_instances_in_window(insts, current_time=current_time)
+        return self._inst_semantics.select_instances(insts)
+
+    def get_instances_in_window(self, insts: list[TimePointSeriesNode], current_time: int) -> list[TimePointSeriesNode]:
+        # returns the instances that started within the lookback window from the current time
+        min_first_time = current_time - self._lookback_window
+        return [inst for inst in insts if inst.get_first_time_point_time() >= min_first_time]
 
     def _tieps_contain_in_tieps(self, tieps_x: list[Tiep], tieps_y: list[Tiep]) -> Optional[TimePoint]:
         # This function returns whether tieps_x are the contains in tieps_y
@@ -32,49 +67,146 @@ class TIRPrefixDetection:
                 return tp
         return None
 
-    def _find_tieps_in_time_point(self, tieps: list[Tiep], time_point_series: TimePointSeries) -> list[TimePoint]:
-        # This function finds instances of the tieps in the time point series
-        tieps_inst = []
-        for time_point in time_point_series.get_time_point_series():
-            # we find all the tieps in the time point series that equals to the first pattern tiep
-            con_tieps = self._tieps_contain_in_tieps(tieps_x=tieps, tieps_y=time_point.get_tieps())
-            if con_tieps is not None:
-                tieps_inst.append(con_tieps)  # add tieps
-        return tieps_inst
-
-    def detect(self, sti_series_id: int, time_point_series: TimePointSeries) -> list[TimePointSeries]:
+    def detect(self, sti_series_id: int,
+               time_point_series: Union[TimePointSeries, TimePointSeriesView]) -> list[TimePointSeriesNode]:
         """
         This function detects instances of the TIRP-prefix in the given sorted time point series.
         The function is making sure the unfinished STIs were not finished before the series was appeared.
-        :param time_point_series:
+        :param time_point_series: the time point series or a view of its time points before a given time
         :return:
         """
+        tirp_prefix_insts = None
+        for tieps in self._tirp_prefix.get_tieps():  # iterates over the pattern tieps
+            tirp_prefix_insts = self.extend(sti_series_id=sti_series_id, time_point_series=time_point_series,
+                                            tieps=tieps, prev_insts=tirp_prefix_insts)
+            if not tirp_prefix_insts:
+                break
+        return self.select_instances(tirp_prefix_insts)
+
+    def extend(self, sti_series_id: int, time_point_series: Union[TimePointSeries, TimePointSeriesView],
+               tieps: list[Tiep], prev_insts: Optional[list[TimePointSeriesNode]]) -> list[TimePointSeriesNode]:
+        """
+        This function extends the instances of a TIRP-prefix with the next tieps of the pattern,
+        thus the instances of a longer TIRP-prefix are detected from the instances of its previous prefix.
+        The extensions are generated up to the bound of the equivalent instances (see TIRPPrefixInstSemantics),
+        thus the instances of the TIRP-prefix should be selected from the returned (generated) instances
+        (see select_instances).
+        :param sti_series_id: the id of the series
+        :param time_point_series: the time point series or a view of its time points before a given time
+        :param tieps: the next (co-occurring) tieps of the pattern
+        :param prev_insts: the generated instances of the previous TIRP-prefix, or None if the tieps are the first tieps
+        :return: the extended (generated) instances
+        """
+        if prev_insts is not None and not prev_insts:  # there is nothing to extend
+            return []
+        # Only the time points that include the rarest tiep are checked (using the tiep postings of the series),
+        # until the time points that no previous instance could be extended to (by the max gap and lookback window)
+        max_time = self._get_max_extension_time(prev_insts)
         tirp_prefix_insts = []
-        for tieps_i, tieps in enumerate(self._tirp_prefix.get_tieps()):  # iterates over the pattern tieps
-            pot_tieps_to_extend = self._find_tieps_in_time_point(tieps=tieps, time_point_series=time_point_series)
-            if tieps_i == 0:  # iterates over the first pattern's tieps
-                for tp in pot_tieps_to_extend:
-                    tps = TimePointSeries(entity_id=sti_series_id)
-                    tps.add_time_point(tp)
-                    tirp_prefix_insts.append(tps)
-            else:  # check if the previous tieps can be extended
-                extended_tirp_prefix_insts = []
-                for pot_tp in pot_tieps_to_extend:
-                    for prev_inst in tirp_prefix_insts:  # for the previous instances
-                        if self._is_previous_tieps_can_be_extended(prev_inst=prev_inst, pot_tp=pot_tp):
-                            new_inst: TimePointSeries = copy.deepcopy(prev_inst)
-                            new_inst.add_time_point(pot_tp)
-                            extended_tirp_prefix_insts.append(new_inst)
-                tirp_prefix_insts = extended_tirp_prefix_insts
+        for time_point in time_point_series.iter_time_points_with_tieps(tieps):
+            if max_time is not None and time_point.get_time() > max_time:
+                break
+            tirp_prefix_insts += self.extend_at_time_point(sti_series_id=sti_series_id, time_point=time_point,
+                                                           tieps=tieps, prev_insts=prev_insts)
         return tirp_prefix_insts
 
-    def _is_previous_tieps_can_be_extended(self, prev_inst: TimePointSeries, pot_tp: TimePoint) -> bool:
+    def extend_at_time_point(self, sti_series_id: int, time_point: TimePoint, tieps: list[Tiep],
+                             prev_insts: Optional[list[TimePointSeriesNode]]) -> list[TimePointSeriesNode]:
+        """
+        This function extends the instances of a TIRP-prefix with the next tieps of the pattern in a single time point,
+        thus the instances that end in a new time point are detected when the time point arrives.
+        :param sti_series_id: the id of the series
+        :param time_point: the time point of the series
+        :param tieps: the next (co-occurring) tieps of the pattern
+        :param prev_insts: the generated instances of the previous TIRP-prefix, or None if the tieps are the first tieps
+        :return: the extended (generated) instances that end in the time point, up to the bound of the equivalent
+                 instances
+        """
+        # we find the tieps in the time point that equals to the pattern tieps
+        pot_tp = self._tieps_contain_in_tieps(tieps_x=tieps, tieps_y=time_point.get_tieps())
+        if pot_tp is None:
+            return []
+        if prev_insts is None:  # the first pattern's tieps
+            return [TimePointSeriesNode(entity_id=sti_series_id, time_point=pot_tp)]
+
+        # check if the previous tieps can be extended
+        extended_tirp_prefix_insts = []
+        for prev_inst in prev_insts:  # for the previous instances
+            if self._is_previous_tieps_can_be_extended(prev_inst=prev_inst, pot_tp=pot_tp):
+                # the extended instance shares the time points of the previous instance
+                extended_tirp_prefix_insts.append(prev_inst.extend(pot_tp))
+        return self._inst_semantics.select_equivalent_instances(insts=extended_tirp_prefix_insts,
+                                                                get_key=self._get_equivalence_key)
+
+    def detect_longest_prefix_len(self, sti_series_id: int,
+                                  time_point_series: Union[TimePointSeries, TimePointSeriesView]) -> int:
+        """
+        This function returns the number of tieps (groups) in the longest prefix of the TIRP-prefix that has an
+        instance in the series, without keeping the instances (e.g., for counting the entities of each prefix).
+        The instances are extended in a depth-first order, thus the detection stops at the first instance of the
+        whole TIRP-prefix, and only the instances in the current path are created.
+        :param sti_series_id: the id of the series
+        :param time_point_series: the time point series or a view of its time points before a given time
+        :return: the number of tieps (groups) in the longest prefix that has an instance, 0 if there is none
+        """
+        candidates = [None] * len(self._tirp_prefix.get_tieps())  # the time points of each tieps (lazily found)
+        return self._extend_depth_first(sti_series_id=sti_series_id, time_point_series=time_point_series,
+                                        candidates=candidates, inst=None, depth=0)
+
+    def _extend_depth_first(self, sti_series_id: int, time_point_series: Union[TimePointSeries, TimePointSeriesView],
+                            candidates: list, inst: Optional[TimePointSeriesNode], depth: int) -> int:
+        # This function returns the longest prefix that is reached by extending the instance of the prefix
+        # with the given depth, the extension stops once the whole TIRP-prefix is reached
+        num_of_tieps = len(candidates)
+        if depth == num_of_tieps:
+            return depth
+        tieps = self._tirp_prefix.get_tieps()[depth]
+        if candidates[depth] is None:
+            candidates[depth] = list(time_point_series.iter_time_points_with_tieps(tieps))
+        longest = depth
+        for time_point in candidates[depth]:
+            if inst is not None and time_point.get_time() <= inst.get_last_time_point_time():
+                continue
+            for ext_inst in self.extend_at_time_point(sti_series_id=sti_series_id, time_point=time_point,
+                                                      tieps=tieps, prev_insts=None if inst is None else [inst]):
+                longest = max(longest, self._extend_depth_first(sti_series_id=sti_series_id,
+                                                                time_point_series=time_point_series,
+                                                                candidates=candidates, inst=ext_inst,
+                                                                depth=depth + 1))
+                if longest == num_of_tieps:
+                    return longest
+        return longest
+
+    def _get_max_extension_time(self, prev_insts: Optional[list[TimePointSeriesNode]]) -> Optional[int]:
+        # This function returns the latest time that the previous instances could be extended to, None if unbounded
+        max_times = []
+        if prev_insts is not None and self._max_gap is not None:
+            max_times.append(max(inst.get_last_time_point_time() for inst in prev_insts) + self._max_gap)
+        if prev_insts is not None and self._lookback_window is not None:
+            max_times.append(max(inst.get_first_time_point_time() for inst in prev_insts) + self._lookback_window)
+        return min(max_times) if max_times else None
+
+    def _get_equivalence_key(self, inst: TimePointSeriesNode) -> tuple:
+        # This function returns what the extensions of an instance (that ends in a given time point) depend on:
+        # its open start tieps, and its first time point when there is a lookback window
+        open_tiep_keys = frozenset(tiep.get_instance_key() for tiep in inst.get_open_start_tieps())
+        if self._lookback_window is None:
+            return open_tiep_keys,
+        return open_tiep_keys, inst.get_first_time_point_time()
+
+    def _is_previous_tieps_can_be_extended(self, prev_inst: TimePointSeriesNode, pot_tp: TimePoint) -> bool:
         # This function checks whether the previous instance (list of time points)
         # could be extended with the current time point
         new_tp_time = pot_tp.get_time()
         lst_prev_tp_time = prev_inst.get_last_time_point_time()
         if lst_prev_tp_time >= new_tp_time:  # if the new time point is before the last time point of the instance
             return False
+        elif self._max_gap is not None and new_tp_time - lst_prev_tp_time > self._max_gap:
+            return False
+        elif self._lookback_window is not None and \
+                new_tp_time - prev_inst.get_first_time_point_time() > self._lookback_window:
+            # the instance could not be within the window at any time after the new time point
+            return False
         elif prev_inst.are_end_tieps_closed_their_start_tieps(time_point=pot_tp) and \
                 prev_inst.are_kept_unfinished_stis(time_point=pot_tp):
             return True
@@ -0,0 +1,90 @@
+from typing import Optional
+
+from core_comp.time_point import TimePoint
+from core_comp.time_point_series_node import TimePointSeriesNode
+from tirp_prefixes.tirp_prefix_detection import TIRPrefixDetection
+from tirp_prefixes.tirp_prefix_trie import TIRPPrefixTrie, TIRPPrefixTrieNode
+
+
+class TIRPPrefixDetectionState:
+    """
+    The detection state of the TIRP prefixes of a prefix trie in a single entity, which is advanced by the time points
+    of the entity in their order. The instances of a prefix only grow by the extension of the instances of its previous
+    prefix with an arriving time point, thus the instances of the time points that arrived so far are kept, and each
+    arriving time point only extends the instances of the prefixes that their (last) tieps are in the time point.
+    The generated instances are kept (see the instance semantics in TIRPrefixDetection), until they are out of the
+    lookback window (if there is one), thus the kept instances are bounded by the window instead of the entity length
+    """
+    def __init__(self, entity_id, prefix_trie: TIRPPrefixTrie):
+        self._entity_id = entity_id
+        self._prefix_trie: TIRPPrefixTrie = prefix_trie
+        self._node_insts: dict[TIRPPrefixTrieNode, list[TimePointSeriesNode]] = {}  # the generated instances per node
+        self._node_detections: dict[TIRPPrefixTrieNode, TIRPrefixDetection] = {}
+        self._next_expiry_time: Optional[int] = None  # the earliest time that a kept instance is out of the window
+
+    def add_time_point(self, time_point: TimePoint) -> list[TIRPPrefixTrieNode]:
+        """
+        This function advances the detection state with the next time point of the entity
+        :param time_point: the next time point, should be after the time points that were added
+        :return: the nodes that new instances (that end in the time point) were detected for
+        """
+        tiep_keys = {tiep.get_tiep_key() for tiep in time_point.get_tieps()}
+        updated_nodes = []
+        # the deeper nodes are extended first, so a node is extended only by the instances of its parent
+        # that end before the time point (as the instances that end in the time point cannot be extended by it)
+        for node in self._prefix_trie.get_nodes_with_tieps(tiep_keys):
+            if node.get_depth() == 1:  # the first tieps of the TIRP prefixes
+                prev_insts = None
+            else:
+                prev_insts = self._node_insts.get(node.get_parent())
+                if not prev_insts:  # there is nothing to extend
+                    continue
+            detection = self._get_detection(node)
+            new_insts = detection.extend_at_time_point(sti_series_id=self._entity_id, time_point=time_point,
+                                                       tieps=node.get_tieps(), prev_insts=prev_insts)
+            if new_insts:
+                self._node_insts.setdefault(node, []).extend(new_insts)
+                self._update_next_expiry_time(detection=detection, new_insts=new_insts)
+                updated_nodes.append(node)
+        return updated_nodes
+
+    def expire_instances(self, current_time: int) -> list[TIRPPrefixTrieNode]:
+        """
+        This function removes the kept instances that started before the lookback window from the current time,
+        the instances are scanned only when the earliest kept instance is out of the window
+        :param current_time: the current time, should not be before the previous current time
+        :return: the nodes that instances were removed from
+        """
+        if self._next_expiry_time is None or current_time < self._next_expiry_time:
+            return []
+        expired_nodes = []
+        self._next_expiry_time = None
+        for node, node_insts in self._node_insts.items():
+            detection = self._get_detection(node)
+            if detection.get_lookback_window() is None:
+                continue
+            kept_insts = detection.get_instances_in_window(insts=node_insts, current_time=current_time)
+            if len(kept_insts) < len(node_insts):
+                node_insts[:] = kept_insts
+                expired_nodes.append(node)
+            self._update_next_expiry_time(detection=detection, new_insts=node_insts)
+        return expired_nodes
+
+    def get_instances(self, node: TIRPPrefixTrieNode, current_time: Optional[int] = None) -> list[TimePointSeriesNode]:
+        # returns the instances of the node's TIRP prefix that were detected in the time points that were added,
+        # which are selected by the lookback window from the current time (if given) and the instance semantics
+        # from the generated instances
+        return self._get_detection(node).select_instances(self._node_insts.get(node, []), current_time=current_time)
+
+    def _update_next_expiry_time(self, detection: TIRPrefixDetection, new_insts: list[TimePointSeriesNode]):
+        # the instances are out of the window at the first time that is after their first time plus the window
+        if detection.get_lookback_window() is None or not new_insts:
+            return
+        expiry_time = min(inst.get_first_time_point_time() for inst in new_insts) + detection.get_lookback_window() + 1
+        if self._next_expiry_time is None or expiry_time < self._next_expiry_time:
+            self._next_expiry_time = expiry_time
+
+    def _get_detection(self, node: TIRPPrefixTrieNode) -> TIRPrefixDetection:
+        if node not in self._node_detections:
+            self._node_detections[node] = TIRPrefixDetection(tirp_prefix=node.get_tirp_prefix())
+        return self._node_detections[node]
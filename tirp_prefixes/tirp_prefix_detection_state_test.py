@@ -0,0 +1,69 @@
+import unittest
+
+import const
+from core_comp.sti import STI
+from core_comp.sti_series import STISeries
+from core_comp.tiep import Tiep
+from core_comp.tirp import TIRP
+from tirp_prefixes.tirp_prefix_detection import TIRPrefixDetection
+from tirp_prefixes.tirp_prefix_detection_state import TIRPPrefixDetectionState
+from tirp_prefixes.tirp_prefix_trie import TIRPPrefixTrie
+
+
+class TestTIRPPrefixDetectionState(unittest.TestCase):
+
+    def test_add_time_point(self):
+        """
+        TIRPs:
+        +1<-1<+2<-2<+999<-999
+        +1<+2<-1<-2<+999<-999
+
+        STI Series:
+         -1-  -2-  -1-
+                     ---2---
+
+        This function tests that the instances of the detection state after each arriving time point
+        are the same as the detected instances in the time points until the time point
+        """
+        tirps = [TIRP(stis=[1, 2, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_BEFORE] * 3, vs=0.5, hs=1.0),
+                 TIRP(stis=[1, 2, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_OVERLAPS, const.TEMP_REL_BEFORE,
+                                                               const.TEMP_REL_BEFORE], vs=0.5, hs=1.0)]
+        prefix_trie = TIRPPrefixTrie(tirps=tirps)
+        stis_list: list[STI] = [
+            self._create_sti_instance(start_time=1, end_time=3, sym_id=1, sym_inst_id=1),
+            self._create_sti_instance(start_time=5, end_time=7, sym_id=2, sym_inst_id=1),
+            self._create_sti_instance(start_time=9, end_time=11, sym_id=1, sym_inst_id=2),
+            self._create_sti_instance(start_time=10, end_time=14, sym_id=2, sym_inst_id=2),
+        ]
+        sti_series = STISeries(series_id=0, stis_list=stis_list)
+        detection_state = TIRPPrefixDetectionState(entity_id=0, prefix_trie=prefix_trie)
+        nodes = [node for tirp in tirps for node in prefix_trie.get_prefix_nodes(tirp)]
+        for time_point in sti_series.get_time_points().get_time_point_series():
+            updated_nodes = detection_state.add_time_point(time_point)
+            time_point_series = sti_series.get_time_points_at(until_time=time_point.get_time() + 1)
+            for node in nodes:
+                expected_insts = TIRPrefixDetection(tirp_prefix=node.get_tirp_prefix()).detect(
+                    sti_series_id=0, time_point_series=time_point_series)
+                self.assertEqual([inst.get_tiep_str() for inst in detection_state.get_instances(node)],
+                                 [inst.get_tiep_str() for inst in expected_insts])
+                if node in updated_nodes:
+                    self.assertEqual(detection_state.get_instances(node)[-1].get_last_time_point_time(),
+                                     time_point.get_time())
+
+        overlap_nodes = prefix_trie.get_prefix_nodes(tirps[1])
+        self.assertEqual([inst.get_tiep_str() for inst in detection_state.get_instances(overlap_nodes[3])],
+                         ['+1[9]<+2[10]<-1[11]<-2[14]'])
+
+    @staticmethod
+    def _create_sti_instance(start_time, end_time, sym_id, sym_inst_id) -> STI:
+        start_tiep = Tiep(time=start_time, tiep_type=const.START_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                          var_id=sym_id)
+        end_tiep = Tiep(time=end_time, tiep_type=const.END_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                        var_id=sym_id)
+        start_tiep.add_pair_tiep(end_tiep)
+        end_tiep.add_pair_tiep(start_tiep)
+        return STI(start_tiep, end_tiep)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,9 @@ from core_comp.sti import STI
 from core_comp.sti_series import STISeries
 from core_comp.tiep import Tiep
 from core_comp.time_point_series import TimePointSeries
+from core_comp.time_point_series_node import TimePointSeriesNode
 from tirp_prefix import TIRPrefix
+from tirp_prefix_array_detection import TIRPrefixArrayDetection
 from tirp_prefix_detection import TIRPrefixDetection
 
 
@@ -325,6 +327,43 @@ class TestTIRPPrefixDetection(unittest.TestCase):
                                                sti_series=sti_series,
                                                expected_instances=set(expected_instances))
 
+    def test_max_gap_and_lookback_window(self):
+        """
+        TIRP-Prefix:
+        +1<-1
+
+        STI Series:
+             ----1-----
+                          -1--
+
+        Time Point Series:
+        +1[5]<-1[15]<+1[18]<-1[22]
+
+        This function tests that the instances are not extended beyond the max gap and the lookback window,
+        and that only the instances that started within the lookback window from the current time are selected
+        """
+        tieps: list[list[Tiep]] = [
+            [self._create_dummy_tiep(tiep_type=const.START_TIEP, sym_id=1, sym_inst_id=1, var_id=1, tiep_inst_id=1)],
+            [self._create_dummy_tiep(tiep_type=const.END_TIEP, sym_id=1, sym_inst_id=1, var_id=1, tiep_inst_id=1)],
+        ]
+        stis_list: list[STI] = [
+            self._create_sti_instance(start_time=5, end_time=15, sym_id=1, sym_inst_id=1, var_id=1),
+            self._create_sti_instance(start_time=18, end_time=22, sym_id=1, sym_inst_id=2, var_id=1),
+        ]
+        tirp_prefix = TIRPrefix(tieps=tieps)
+        time_point_series = STISeries(series_id=0, stis_list=stis_list).get_time_points()
+        for detection_cls in [TIRPrefixDetection, TIRPrefixArrayDetection]:
+            for max_gap, lookback_window in [(5, None), (None, 8)]:
+                tirp_prefix_detection = detection_cls(tirp_prefix=tirp_prefix, max_gap=max_gap,
+                                                      lookback_window=lookback_window)
+                tirp_pfx_insts = tirp_prefix_detection.detect(sti_series_id=0, time_point_series=time_point_series)
+                self.assertEqual([inst.get_tiep_str() for inst in tirp_pfx_insts], ['+1[18]<-1[22]'])
+
+            tirp_prefix_detection = detection_cls(tirp_prefix=tirp_prefix, lookback_window=8)
+            tirp_pfx_insts = tirp_prefix_detection.detect(sti_series_id=0, time_point_series=time_point_series)
+            self.assertEqual(len(tirp_prefix_detection.select_instances(tirp_pfx_insts, current_time=26)), 1)
+            self.assertEqual(len(tirp_prefix_detection.select_instances(tirp_pfx_insts, current_time=27)), 0)
+
     def _create_dummy_tiep(self, tiep_type, sym_id, sym_inst_id, var_id, tiep_inst_id) -> Tiep:
         tiep = Tiep(time=-1, tiep_type=tiep_type, sym_id=sym_id, sym_inst_id=sym_inst_id, var_id=var_id,
                     tiep_inst_id=tiep_inst_id, dummy=True)
@@ -355,8 +394,8 @@ class TestTIRPPrefixDetection(unittest.TestCase):
         time_point_series: TimePointSeries = sti_series.get_time_points()
         print('Time Point Series: \n' + time_point_series.get_tiep_str())
 
-        tirp_pfx_insts: list[TimePointSeries] = tirp_prefix_detection.detect(sti_series_id=sti_series.get_series_id(),
-                                                                             time_point_series=time_point_series)
+        tirp_pfx_insts: list[TimePointSeriesNode] = tirp_prefix_detection.detect(
+            sti_series_id=sti_series.get_series_id(), time_point_series=time_point_series)
 
         print(f'Instances {len(tirp_pfx_insts)}:')
         tirp_pfx_srt_insts = []
@@ -370,6 +409,32 @@ class TestTIRPPrefixDetection(unittest.TestCase):
         print(expected_instances)
         self.assertSetEqual(tirp_pfx_srt_insts, expected_instances)
 
+        # the array detection engine detects the same instances in the same order
+        tirp_pfx_array_insts = TIRPrefixArrayDetection(tirp_prefix=tirp_prefix).detect(
+            sti_series_id=sti_series.get_series_id(), time_point_series=time_point_series)
+        self.assertEqual([inst.get_tiep_str() for inst in tirp_pfx_array_insts],
+                         [inst.get_tiep_str() for inst in tirp_pfx_insts])
+
+        # the longest prefix with an instance is found without keeping the instances
+        expected_longest = 0
+        for i in range(1, len(tirp_prefix.get_tieps()) + 1):
+            if TIRPrefixDetection(tirp_prefix=TIRPrefix(tieps=tirp_prefix.get_tieps()[:i])).detect(
+                    sti_series_id=sti_series.get_series_id(), time_point_series=time_point_series):
+                expected_longest = i
+        self.assertEqual(tirp_prefix_detection.detect_longest_prefix_len(
+            sti_series_id=sti_series.get_series_id(), time_point_series=time_point_series), expected_longest)
+
+        # extending the instances of the previous TIRP-prefix should detect the same instances
+        if len(tirp_prefix.get_tieps()) > 1:
+            prev_tirp_prefix = TIRPrefix(tieps=tirp_prefix.get_tieps()[:-1])
+            prev_insts = TIRPrefixDetection(tirp_prefix=prev_tirp_prefix).detect(
+                sti_series_id=sti_series.get_series_id(), time_point_series=time_point_series)
+            ext_insts = tirp_prefix_detection.extend(sti_series_id=sti_series.get_series_id(),
+                                                     time_point_series=time_point_series,
+                                                     tieps=tirp_prefix.get_tieps()[-1], prev_insts=prev_insts)
+            self.assertEqual([inst.get_tiep_str() for inst in ext_insts],
+                             [inst.get_tiep_str() for inst in tirp_pfx_insts])
+
 
 if __name__ == '__main__':
     unittest.main()
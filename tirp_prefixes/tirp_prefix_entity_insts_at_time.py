@@ -1,31 +1,37 @@
-from core_comp.time_point_series import TimePointSeries
+from typing import Optional
+
+from core_comp.time_point_series_node import TimePointSeriesNode
 from tirp_prefixes.tirp_prefix_detection import TIRPrefixDetection
-from tirp_prefixes.tirp_prefix_insts import TIRPPrefixInstances
 
 
 class TIRPrefixEntityInstsAtTime:
     """
     this class represents the instances at a specific time of a TIRP prefix
     """
-    def __init__(self, entity_id, prefix_index, tirp_prefix, time_point_series):
+    def __init__(self, entity_id, prefix_index, tirp_prefix, time_point_series,
+                 tirp_pfx_insts: Optional[list[TimePointSeriesNode]] = None):
+        """
+        :param tirp_pfx_insts: the instances of the TIRP prefix if they were already detected (e.g., by a prefix trie)
+        """
         self._entity_id = entity_id
         self._prefix_index = prefix_index
         self._tirp_prefix = tirp_prefix
         self._time_point_series = time_point_series
-        self._tirp_prefix_instances: TIRPPrefixInstances = TIRPPrefixInstances(self._tirp_prefix)
-        self._detect_instances()
+        # the instances are kept as time point series (nodes), as the models are applied on each one of them
+        self._tirp_prefix_instances: list[TimePointSeriesNode] = self._detect_instances(tirp_pfx_insts)
 
-    def _detect_instances(self):
-        # this function applies the detection of instances
-        tirp_pfx_detect = TIRPrefixDetection(tirp_prefix=self._tirp_prefix)
-        tirp_pfx_insts: list[TimePointSeries] = tirp_pfx_detect.detect(sti_series_id=self._entity_id,
-                                                                       time_point_series=self._time_point_series)
-        for inst_j, inst in enumerate(tirp_pfx_insts):
-            self._tirp_prefix_instances.add_instance(entity_id=self._entity_id, inst_id=inst_j, inst=inst)
+    def _detect_instances(self, tirp_pfx_insts: Optional[list[TimePointSeriesNode]]) -> list[TimePointSeriesNode]:
+        # this function applies the detection of instances, unless they were already detected
+        if tirp_pfx_insts is None:
+            tirp_pfx_detect = TIRPrefixDetection(tirp_prefix=self._tirp_prefix)
+            tirp_pfx_insts = tirp_pfx_detect.detect(sti_series_id=self._entity_id,
+                                                    time_point_series=self._time_point_series)
+        # the given instances are copied, as they might be extended later (e.g., by a detection state)
+        return list(tirp_pfx_insts)
 
     def get_num_of_instances(self) -> int:
-        return self._tirp_prefix_instances.get_num_of_instances()
+        return len(self._tirp_prefix_instances)
 
-    def get_instances(self) -> TIRPPrefixInstances:
-        return self._tirp_prefix_instances.get_instances()
+    def get_instances(self) -> list[TimePointSeriesNode]:
+        return self._tirp_prefix_instances
 
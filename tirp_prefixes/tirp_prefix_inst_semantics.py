@@ -0,0 +1,77 @@
+from typing import Callable, Optional
+
+import numpy as np
+
+import const
+
+
+class TIRPPrefixInstSemantics:
+    """
+    The semantics of the instances of a TIRP prefix that are kept in an entity, which bounds the number of instances
+    that are selected (with repeated symbols the number of instances grows multiplicatively with the prefix length):
+    * all - all the instances.
+    * earliest - only the first N (1) instances, by their end times.
+    * recent / top_n - only the N (1 or top_n) most recent instances, by their end times.
+    The instances are selected from the generated instances of the prefix, which are bounded while the instances of
+    the shorter prefixes are extended: the instances that end in the same time point with the same open start tieps
+    (and the same first time point when there is a lookback window) are equivalent, as they are extended by the same
+    time points and are selected (or not) by the same current times. Thus, only the first N (earliest) or the last N
+    (recent / top_n) of each equivalent instances are generated, as the instances of any longer prefix that are
+    extended from the other equivalent instances are never selected before them.
+    The generated instances are sorted by their end times, thus the instances at a given time are the same when the
+    series is detected at once or one time point at a time
+    """
+    def __init__(self, inst_semantics: str = const.TIRP_INST_SEMANTICS, top_n: int = const.TIRP_INST_TOP_N):
+        if inst_semantics not in [const.TIRP_INST_SEMANTICS_ALL, const.TIRP_INST_SEMANTICS_EARLIEST,
+                                  const.TIRP_INST_SEMANTICS_RECENT, const.TIRP_INST_SEMANTICS_TOP_N]:
+            raise Exception(f'Unknown instance semantics: {inst_semantics}')
+        if inst_semantics == const.TIRP_INST_SEMANTICS_TOP_N and top_n < 1:
+            raise Exception('The number of the top instances should be at least one!')
+        self._inst_semantics: str = inst_semantics
+        if inst_semantics == const.TIRP_INST_SEMANTICS_ALL:
+            self._max_num_of_insts: Optional[int] = None
+        elif inst_semantics == const.TIRP_INST_SEMANTICS_TOP_N:
+            self._max_num_of_insts: Optional[int] = top_n
+        else:
+            self._max_num_of_insts: Optional[int] = 1
+
+    def get_inst_semantics(self) -> str:
+        return self._inst_semantics
+
+    def select_instances(self, insts: list) -> list:
+        # returns the instances of the prefix from its generated instances (that are sorted by their end times)
+        if self._max_num_of_insts is None:
+            return insts
+        elif self._inst_semantics == const.TIRP_INST_SEMANTICS_EARLIEST:
+            return insts[:self._max_num_of_insts]
+        return insts[len(insts) - min(len(insts), self._max_num_of_insts):]
+
+    def select_equivalent_instances(self, insts: list, get_key: Callable[[object], tuple]) -> list:
+        # returns the instances that are generated from the given instances (that end in the same time point) by the
+        # key of their equivalence (see above), in their order
+        if self._max_num_of_insts is None or len(insts) <= self._max_num_of_insts:
+            return insts
+        equivalent_insts = {}
+        for inst_i, inst in enumerate(insts):
+            equivalent_insts.setdefault(get_key(inst), []).append(inst_i)
+        if self._inst_semantics == const.TIRP_INST_SEMANTICS_EARLIEST:
+            kept = [inst_i for inst_ids in equivalent_insts.values() for inst_i in inst_ids[:self._max_num_of_insts]]
+        else:
+            kept = [inst_i for inst_ids in equivalent_insts.values() for inst_i in inst_ids[-self._max_num_of_insts:]]
+        return [insts[inst_i] for inst_i in sorted(kept)]
+
+    def get_equivalent_instances_mask(self, num_of_insts: int,
+                                      get_group_ids: Callable[[], np.ndarray]) -> Optional[np.ndarray]:
+        # returns the mask of the instances that are generated from the given instances by the ids of their groups of
+        # equivalent instances (as select_equivalent_instances), None if all of them are generated
+        if self._max_num_of_insts is None or num_of_insts <= self._max_num_of_insts:
+            return None
+        group_ids = get_group_ids()
+        order = np.argsort(group_ids, kind='stable')
+        group_sizes = np.bincount(group_ids)
+        group_starts = np.cumsum(group_sizes) - group_sizes
+        ranks = np.empty(num_of_insts, dtype=np.int64)  # the index of each instance among its equivalent instances
+        ranks[order] = np.arange(num_of_insts, dtype=np.int64) - group_starts[group_ids[order]]
+        if self._inst_semantics == const.TIRP_INST_SEMANTICS_EARLIEST:
+            return ranks < self._max_num_of_insts
+        return ranks >= group_sizes[group_ids] - self._max_num_of_insts
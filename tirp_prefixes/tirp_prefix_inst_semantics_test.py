@@ -0,0 +1,165 @@
+import unittest
+from unittest import mock
+
+import const
+from core_comp.sti import STI
+from core_comp.sti_series import STISeries
+from core_comp.tiep import Tiep
+from core_comp.tirp import TIRP
+from tirp_prefixes.tirp_prefix import TIRPrefix
+from tirp_prefixes.tirp_prefix_array_detection import TIRPrefixArrayDetection
+from tirp_prefixes.tirp_prefix_detection import TIRPrefixDetection
+from tirp_prefixes.tirp_prefix_detection_state import TIRPPrefixDetectionState
+from tirp_prefixes.tirp_prefix_trie import TIRPPrefixTrie
+
+
+class TestTIRPPrefixInstSemantics(unittest.TestCase):
+
+    def test_bounded_instances(self):
+        """
+        TIRP-Prefix:
+        +1<-1<+2<-2
+
+        STI Series:
+         1 1 1 2 2 2
+
+        This function tests that the instances are bounded by the instance semantics during the detection
+        """
+        tirp = TIRP(stis=[1, 2, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_BEFORE] * 3, vs=0.5, hs=1.0)
+        tirp_prefix = TIRPrefix(tieps=tirp.get_sorted_tieps()[:4])
+        stis_list: list[STI] = [self._create_sti_instance(start_time=2 * i + 1, end_time=2 * i + 2,
+                                                          sym_id=1 if i < 3 else 2, sym_inst_id=i) for i in range(6)]
+        time_point_series = STISeries(series_id=0, stis_list=stis_list).get_time_points()
+
+        expected_instances = {
+            const.TIRP_INST_SEMANTICS_ALL: 9,
+            const.TIRP_INST_SEMANTICS_EARLIEST: ['+1[1]<-1[2]<+2[7]<-2[8]'],
+            const.TIRP_INST_SEMANTICS_RECENT: ['+1[5]<-1[6]<+2[11]<-2[12]'],
+            const.TIRP_INST_SEMANTICS_TOP_N: ['+1[3]<-1[4]<+2[11]<-2[12]', '+1[5]<-1[6]<+2[11]<-2[12]'],
+        }
+        for inst_semantics, expected in expected_instances.items():
+            for detection in [TIRPrefixDetection, TIRPrefixArrayDetection]:
+                insts = detection(tirp_prefix=tirp_prefix, inst_semantics=inst_semantics, top_n=2).detect(
+                    sti_series_id=0, time_point_series=time_point_series)
+                insts = [inst.get_tiep_str() for inst in insts]
+                if inst_semantics == const.TIRP_INST_SEMANTICS_ALL:
+                    self.assertEqual(len(insts), expected)
+                else:
+                    self.assertEqual(insts, expected)
+
+    def test_bounded_instances_of_longer_prefix(self):
+        """
+        TIRP-Prefixes:
+        (0) +1<+2 (1 overlaps 2)
+        (1) +1<+2<-2<+3 (1 contains 2 and 3, 2 before 3)
+
+        STI Series:
+        (0)  -1-  ---1---
+                   ----2----
+        (1)  ----------------1----------------
+              ---2---
+               -2-
+                       -3-
+
+        This function tests that the instances of a prefix are bounded only among their equivalent instances while
+        they are extended, as the instance that is not selected for a shorter prefix could be the only instance of a
+        longer prefix
+        """
+        tirps = [TIRP(stis=[1, 2, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_OVERLAPS] + [const.TEMP_REL_BEFORE] * 2,
+                      vs=0.5, hs=1.0),
+                 TIRP(stis=[1, 2, 3, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_CONTAINS] * 2 +
+                      [const.TEMP_REL_BEFORE] * 4, vs=0.5, hs=1.0)]
+        stis_lists = [[self._create_sti_instance(start_time=1, end_time=2, sym_id=1, sym_inst_id=1),
+                       self._create_sti_instance(start_time=5, end_time=10, sym_id=1, sym_inst_id=2),
+                       self._create_sti_instance(start_time=6, end_time=12, sym_id=2, sym_inst_id=1)],
+                      [self._create_sti_instance(start_time=1, end_time=100, sym_id=1, sym_inst_id=1),
+                       self._create_sti_instance(start_time=2, end_time=9, sym_id=1, sym_inst_id=2),
+                       self._create_sti_instance(start_time=3, end_time=4, sym_id=2, sym_inst_id=1),
+                       self._create_sti_instance(start_time=10, end_time=11, sym_id=3, sym_inst_id=1)]]
+        expected_instances = ['+1[5]<+2[6]', '+1[1]<+2[3]<-2[4]<+3[10]']
+        for tirp, prefix_len, stis_list, expected in zip(tirps, [2, 4], stis_lists, expected_instances):
+            tirp_prefix = TIRPrefix(tieps=tirp.get_sorted_tieps()[:prefix_len])
+            time_point_series = STISeries(series_id=0, stis_list=stis_list).get_time_points()
+            for inst_semantics in [const.TIRP_INST_SEMANTICS_ALL, const.TIRP_INST_SEMANTICS_EARLIEST,
+                                   const.TIRP_INST_SEMANTICS_RECENT, const.TIRP_INST_SEMANTICS_TOP_N]:
+                for detection in [TIRPrefixDetection, TIRPrefixArrayDetection]:
+                    insts = detection(tirp_prefix=tirp_prefix, inst_semantics=inst_semantics, top_n=1).detect(
+                        sti_series_id=0, time_point_series=time_point_series)
+                    self.assertEqual([inst.get_tiep_str() for inst in insts], [expected])
+
+    def test_bounded_generated_instances(self):
+        """
+        TIRP-Prefix:
+        +1<-1<+2<-2<+3<-3
+
+        STI Series:
+         1 1 1 1 1 2 2 2 2 2 3 3 3 3 3
+
+        This function tests that the number of the generated instances of each prefix is bounded by the instance
+        semantics while they are extended (instead of growing multiplicatively with the prefix length), in both
+        detection engines and in the detection state, and that the selected instances are the instances that are
+        selected from all the instances
+        """
+        tirp = TIRP(stis=[1, 2, 3, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_BEFORE] * 6, vs=0.5, hs=1.0)
+        tirp_prefix = TIRPrefix(tieps=tirp.get_sorted_tieps()[:6])
+        stis_list: list[STI] = [self._create_sti_instance(start_time=2 * i + 1, end_time=2 * i + 2,
+                                                          sym_id=i // 5 + 1, sym_inst_id=i % 5 + 1) for i in range(15)]
+        sti_series = STISeries(series_id=0, stis_list=stis_list)
+        time_point_series = sti_series.get_time_points()
+
+        expected_nums_of_insts = {
+            const.TIRP_INST_SEMANTICS_ALL: [5, 5, 25, 25, 125, 125],
+            const.TIRP_INST_SEMANTICS_EARLIEST: [5] * 6,
+            const.TIRP_INST_SEMANTICS_RECENT: [5] * 6,
+            const.TIRP_INST_SEMANTICS_TOP_N: [5, 5, 10, 10, 10, 10],
+        }
+        all_insts = TIRPrefixDetection(tirp_prefix=tirp_prefix, inst_semantics=const.TIRP_INST_SEMANTICS_ALL).detect(
+            sti_series_id=0, time_point_series=time_point_series)
+        for inst_semantics, expected in expected_nums_of_insts.items():
+            detection = TIRPrefixDetection(tirp_prefix=tirp_prefix, inst_semantics=inst_semantics, top_n=2)
+            expected_insts = [inst.get_tiep_str() for inst in detection.select_instances(all_insts)]
+
+            insts = None
+            nums_of_insts = []
+            for tieps in tirp_prefix.get_tieps():
+                insts = detection.extend(sti_series_id=0, time_point_series=time_point_series, tieps=tieps,
+                                         prev_insts=insts)
+                nums_of_insts.append(len(insts))
+            self.assertEqual(nums_of_insts, expected)
+            self.assertEqual([inst.get_tiep_str() for inst in detection.select_instances(insts)], expected_insts)
+
+            array_detection = TIRPrefixArrayDetection(tirp_prefix=tirp_prefix, inst_semantics=inst_semantics, top_n=2)
+            prefixes_insts = array_detection.detect_prefixes(sti_series_id=0, time_point_series=time_point_series)
+            self.assertEqual([len(insts) for insts in prefixes_insts], expected)
+            self.assertEqual([inst.get_tiep_str() for inst in array_detection.select_instances(prefixes_insts[-1])],
+                             expected_insts)
+
+            # the detection state detects the instances by the default semantics
+            defaults = TIRPrefixDetection.__init__.__defaults__
+            with mock.patch.object(TIRPrefixDetection.__init__, '__defaults__', (inst_semantics, 2) + defaults[2:]):
+                prefix_trie = TIRPPrefixTrie(tirps=[tirp])
+                detection_state = TIRPPrefixDetectionState(entity_id=0, prefix_trie=prefix_trie)
+                for time_point in time_point_series.get_time_point_series():
+                    detection_state.add_time_point(time_point)
+                nodes = prefix_trie.get_prefix_nodes(tirp)[:6]
+                self.assertEqual([len(detection_state._node_insts[node]) for node in nodes], expected)
+                self.assertEqual([inst.get_tiep_str() for inst in detection_state.get_instances(nodes[-1])],
+                                 expected_insts)
+
+    def test_unknown_semantics(self):
+        with self.assertRaises(Exception):
+            TIRPrefixDetection(tirp_prefix=TIRPrefix(tieps=[]), inst_semantics='latest')
+
+    @staticmethod
+    def _create_sti_instance(start_time, end_time, sym_id, sym_inst_id) -> STI:
+        start_tiep = Tiep(time=start_time, tiep_type=const.START_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                          var_id=sym_id)
+        end_tiep = Tiep(time=end_time, tiep_type=const.END_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                        var_id=sym_id)
+        start_tiep.add_pair_tiep(end_tiep)
+        end_tiep.add_pair_tiep(start_tiep)
+        return STI(start_tiep, end_tiep)
+
+
+if __name__ == '__main__':
+    unittest.main()
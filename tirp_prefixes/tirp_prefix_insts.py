@@ -1,10 +1,18 @@
-from core_comp.time_point_series import TimePointSeries
+from array import array
+
+import numpy as np
+
+from core_comp.time_point_series_node import TimePointSeriesNode
 from tirp_prefixes.tirp_prefix import TIRPrefix
 
 
 class TIRPPrefixInstances:
     """
     Instances of TIRP prefixes.
+    The instances are kept as compact integer columns instead of their time point series objects: the entity (as an
+    index of the distinct entity ids) and the instance id of each instance, and the times of its time points (one per
+    group of co-occurring tieps of the prefix, in a single column with a fixed stride).
+    The durations and the number of entities are computed from them
     """
 
     def __init__(self, tirp_prefix: TIRPrefix):
@@ -13,23 +21,46 @@ class TIRPPrefixInstances:
 
         """
         self._tirp_prefix = tirp_prefix
-        self._instances: dict[str:TimePointSeries] = {}
+        self._num_of_time_points: int = len(tirp_prefix.get_tieps())
+        self._entity_indices: dict = {}  # the index of each distinct entity id
+        self._entity_codes: array = array('q')
+        self._inst_ids: array = array('q')
+        self._time_point_times: array = array('q')
 
-    def add_instance(self, entity_id: int, inst_id: int, inst: TimePointSeries):
+    def add_instance(self, entity_id: int, inst_id: int, inst: TimePointSeriesNode):
         """
-        This function gets instance that represented by time point series
-        and adds this instances to the list of instances
+        This function gets instance that represented by time point series (node)
+        and adds the times of its time points to the columns of the instances
         """
-        assert isinstance(inst, TimePointSeries), "Oh no! Wrong type input for this function!"
-        self._instances[f'{entity_id}_{inst_id}'] = inst
-
-    def get_instances(self) -> dict[str:TimePointSeries]:
-        return self._instances
+        assert isinstance(inst, TimePointSeriesNode), "Oh no! Wrong type input for this function!"
+        assert inst.get_num_of_time_points() == self._num_of_time_points, "Oh no! Wrong instance for this prefix!"
+        self._entity_codes.append(self._entity_indices.setdefault(entity_id, len(self._entity_indices)))
+        self._inst_ids.append(inst_id)
+        self._time_point_times.extend(time_point.get_time() for time_point in inst.get_time_point_series())
 
     def get_num_of_instances(self) -> int:
-        return len(self._instances)
+        return len(self._entity_codes)
 
     def get_unique_num_of_instances(self) -> int:
         # Consider instances that occurred more than once in an entity only once
-        unique_entities = {tps.get_entity_id() for tps in self._instances.values()}
-        return len(unique_entities)
+        return len(self._entity_indices)
+
+    def get_entity_ids(self) -> np.ndarray:
+        # the columns are copied, as an array that is viewed by NumPy could not be extended
+        if not self._entity_indices:
+            return np.empty(0, dtype=np.int64)
+        return np.array(list(self._entity_indices))[np.array(self._entity_codes, dtype=np.int64)]
+
+    def get_inst_ids(self) -> np.ndarray:
+        return np.array(self._inst_ids, dtype=np.int64)
+
+    def get_time_point_times(self) -> np.ndarray:
+        # returns the times of the time points of each instance (a row per instance)
+        return np.array(self._time_point_times, dtype=np.int64).reshape(-1, self._num_of_time_points)
+
+    def get_durations_between_all_tieps(self) -> np.ndarray:
+        # returns the durations between the tieps of each instance (a row per instance)
+        return np.diff(self.get_time_point_times(), axis=1)
+
+    def get_last_time_point_times(self) -> np.ndarray:
+        return self.get_time_point_times()[:, -1]
@@ -0,0 +1,66 @@
+import unittest
+
+import const
+from core_comp.sti import STI
+from core_comp.sti_series import STISeries
+from core_comp.tiep import Tiep
+from core_comp.time_point_series_node import TimePointSeriesNode
+from tirp_prefixes.tirp_prefix import TIRPrefix
+from tirp_prefixes.tirp_prefix_insts import TIRPPrefixInstances
+
+
+class TestTIRPPrefixInstances(unittest.TestCase):
+
+    def test_add_instance(self):
+        """
+        STI Series:
+         --1---
+            ---2------
+                  -1-
+
+        Time Point Series:
+        +1[2]<+2[4]<-1[6]<+1[8]<-1[10]<-2[12]
+
+        This function tests that the durations and the number of entities are computed from the columns of the
+        instances as from the time point series of the instances
+        """
+        stis_list: list[STI] = [
+            self._create_sti_instance(start_time=2, end_time=6, sym_id=1, sym_inst_id=1, var_id=1),
+            self._create_sti_instance(start_time=4, end_time=12, sym_id=2, sym_inst_id=1, var_id=2),
+            self._create_sti_instance(start_time=8, end_time=10, sym_id=1, sym_inst_id=2, var_id=1),
+        ]
+        time_points = STISeries(series_id=0, stis_list=stis_list).get_time_points().get_time_point_series()
+        tirp_prefix = TIRPrefix(tieps=[time_point.get_tieps() for time_point in time_points[:3]])
+        insts = []
+        for entity_id, tp_indices in [(0, [0, 1, 2]), (0, [1, 3, 5]), (7, [0, 4, 5])]:
+            inst = TimePointSeriesNode(entity_id=entity_id, time_point=time_points[tp_indices[0]])
+            for tp_index in tp_indices[1:]:
+                inst = inst.extend(time_points[tp_index])
+            insts.append(inst)
+
+        tirp_prefix_instances = TIRPPrefixInstances(tirp_prefix=tirp_prefix)
+        self.assertEqual(tirp_prefix_instances.get_num_of_instances(), 0)
+        self.assertEqual(tirp_prefix_instances.get_durations_between_all_tieps().shape, (0, 2))
+        for inst_j, inst in enumerate(insts):
+            tirp_prefix_instances.add_instance(entity_id=inst.get_entity_id(), inst_id=inst_j, inst=inst)
+
+        self.assertEqual(tirp_prefix_instances.get_num_of_instances(), 3)
+        self.assertEqual(tirp_prefix_instances.get_unique_num_of_instances(), 2)
+        self.assertEqual(tirp_prefix_instances.get_entity_ids().tolist(), [0, 0, 7])
+        self.assertEqual(tirp_prefix_instances.get_inst_ids().tolist(), [0, 1, 2])
+        self.assertEqual(tirp_prefix_instances.get_durations_between_all_tieps().tolist(),
+                         [inst.get_durations_between_all_tieps() for inst in insts])
+        self.assertEqual(tirp_prefix_instances.get_last_time_point_times().tolist(), [6, 12, 12])
+
+    @staticmethod
+    def _create_sti_instance(start_time, end_time, sym_id, sym_inst_id, var_id) -> STI:
+        start_tiep = Tiep(time=start_time, tiep_type=const.START_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                          var_id=var_id)
+        end_tiep = Tiep(time=end_time, tiep_type=const.END_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id, var_id=var_id)
+        start_tiep.add_pair_tiep(end_tiep)
+        end_tiep.add_pair_tiep(start_tiep)
+        return STI(start_tiep, end_tiep)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+from typing import Optional, Union
+
+from core_comp.tiep import Tiep
+from core_comp.time_point_series import TimePointSeries
+from core_comp.time_point_series_node import TimePointSeriesNode
+from core_comp.time_point_series_view import TimePointSeriesView
+from core_comp.tirp import TIRP
+from tirp_prefixes.tirp_prefix import TIRPrefix
+from tirp_prefixes.tirp_prefix_detection import TIRPrefixDetection
+
+
+class TIRPPrefixTrieNode:
+    """
+    A node in the TIRP prefix trie that represents a TIRP prefix by its last (co-occurring) tieps.
+    The instances of the prefix are kept per series, thus they are detected once for all the TIRPs that share it
+    """
+    __slots__ = ('_tieps', '_parent', '_children', '_depth', '_ref_count', '_series_insts', '_tirp_prefix')
+
+    def __init__(self, tieps: Optional[list[Tiep]], parent=None):
+        self._tieps: Optional[list[Tiep]] = tieps
+        self._parent: Optional[TIRPPrefixTrieNode] = parent
+        self._children: dict[tuple, TIRPPrefixTrieNode] = {}
+        self._depth: int = 0 if parent is None else parent._depth + 1
+        self._ref_count: int = 0  # the number of TIRPs that were added and not released with this prefix
+        self._series_insts: dict = {}
+        self._tirp_prefix: Optional[TIRPrefix] = None
+
+    def get_tieps(self) -> Optional[list[Tiep]]:
+        return self._tieps
+
+    def get_parent(self):
+        return self._parent
+
+    def get_depth(self) -> int:
+        return self._depth
+
+    def get_ref_count(self) -> int:
+        return self._ref_count
+
+    def get_tirp_prefix(self) -> TIRPrefix:
+        # returns the TIRP prefix that is represented by the node
+        if self._tirp_prefix is None:
+            tieps = []
+            node = self
+            while node._parent is not None:
+                tieps.append(node._tieps)
+                node = node._parent
+            tieps.reverse()
+            self._tirp_prefix = TIRPrefix(tieps=tieps)
+        return self._tirp_prefix
+
+
+class TIRPPrefixTrie:
+    """
+    A trie of the TIRP prefixes of multiple TIRPs, which is keyed by the (co-occurring) tieps of the prefixes.
+    TIRPs that share their first tieps share the nodes of these prefixes, thus the instances of each distinct prefix
+    are detected once per series by extending the instances of its parent node.
+    """
+    def __init__(self, tirps: list[TIRP] = None):
+        self._root: TIRPPrefixTrieNode = TIRPPrefixTrieNode(tieps=None)
+        self._num_of_nodes: int = 0
+        self._nodes_by_tiep_key: dict[tuple, list[TIRPPrefixTrieNode]] = {}  # the nodes per their first tiep key
+        for tirp in tirps or []:
+            self.add_tirp(tirp)
+
+    def add_tirp(self, tirp: TIRP) -> list[TIRPPrefixTrieNode]:
+        """
+        This function adds the prefixes of the TIRP (without the ending tiep of the event of interest) to the trie
+        :param tirp: the TIRP to add
+        :return: the nodes of the TIRP prefixes (from the shortest to the longest)
+        """
+        nodes = []
+        node = self._root
+        for tieps in tirp.get_sorted_tieps()[:-1]:
+            tieps_key = self._get_tieps_key(tieps)
+            if tieps_key not in node._children:
+                node._children[tieps_key] = TIRPPrefixTrieNode(tieps=tieps, parent=node)
+                self._nodes_by_tiep_key.setdefault(tieps_key[0], []).append(node._children[tieps_key])
+                self._num_of_nodes += 1
+            node = node._children[tieps_key]
+            node._ref_count += 1
+            nodes.append(node)
+        return nodes
+
+    def get_prefix_nodes(self, tirp: TIRP) -> list[TIRPPrefixTrieNode]:
+        # returns the nodes of the TIRP prefixes (from the shortest to the longest), the TIRP should be added
+        nodes = []
+        node = self._root
+        for tieps in tirp.get_sorted_tieps()[:-1]:
+            node = node._children[self._get_tieps_key(tieps)]
+            nodes.append(node)
+        return nodes
+
+    def release_tirp(self, tirp: TIRP):
+        # this function releases the prefixes of a TIRP that its detection is done,
+        # the instances of prefixes that are not shared with other (not released) TIRPs are removed
+        for node in self.get_prefix_nodes(tirp):
+            node._ref_count -= 1
+            if node._ref_count <= 0:
+                node._series_insts.clear()
+
+    def get_num_of_nodes(self) -> int:
+        return self._num_of_nodes
+
+    def get_nodes_with_tieps(self, tiep_keys: set[tuple]) -> list[TIRPPrefixTrieNode]:
+        # returns the nodes that all their (last) tieps are in the given tiep keys, from the deepest to the shallowest
+        nodes = [node for tiep_key in tiep_keys for node in self._nodes_by_tiep_key.get(tiep_key, [])
+                 if set(self._get_tieps_key(node._tieps)) <= tiep_keys]
+        nodes.sort(key=TIRPPrefixTrieNode.get_depth, reverse=True)
+        return nodes
+
+    def get_instances(self, node: TIRPPrefixTrieNode, sti_series_id,
+                      time_point_series: Union[TimePointSeries, TimePointSeriesView],
+                      memo: dict = None) -> list[TimePointSeriesNode]:
+        """
+        This function returns the instances of the node's TIRP prefix in a series by extending the instances
+        of its parent node, the instances of each node are detected once and memoized.
+        :param node: the node of the TIRP prefix
+        :param sti_series_id: the id of the series
+        :param time_point_series: the time point series or a view of its time points before a given time
+        :param memo: the instances per node (e.g., of a view at a specific time), if None the instances are memoized
+                     in the nodes per series id (until the TIRPs of the nodes are released)
+        :return: the instances of the TIRP prefix
+        """
+        if memo is None:
+            node_memo, memo_key = node._series_insts, sti_series_id
+        else:
+            node_memo, memo_key = memo, node
+        if memo_key in node_memo:
+            return node_memo[memo_key]
+
+        if node._parent is self._root:
+            prev_insts = None
+        else:
+            prev_insts = self.get_instances(node=node._parent, sti_series_id=sti_series_id,
+                                            time_point_series=time_point_series, memo=memo)
+        if prev_insts is not None and not prev_insts:
+            tirp_pfx_insts = []
+        else:
+            tirp_pfx_detect = TIRPrefixDetection(tirp_prefix=node.get_tirp_prefix())
+            tirp_pfx_insts = tirp_pfx_detect.extend(sti_series_id=sti_series_id, time_point_series=time_point_series,
+                                                    tieps=node._tieps, prev_insts=prev_insts)
+        node_memo[memo_key] = tirp_pfx_insts
+        return tirp_pfx_insts
+
+    @staticmethod
+    def _get_tieps_key(tieps: list[Tiep]) -> tuple:
+        # the co-occurring tieps are detected by their types and symbols regardless of their order,
+        # thus the same prefix is keyed the same in TIRPs that list its co-occurring tieps in different orders
+        return tuple(sorted(tiep.get_tiep_key() for tiep in tieps))
@@ -0,0 +1,123 @@
+import unittest
+
+import const
+from core_comp.sti import STI
+from core_comp.sti_series import STISeries
+from core_comp.tiep import Tiep
+from core_comp.tirp import TIRP
+from tirp_prefixes.tirp_prefix import TIRPrefix
+from tirp_prefixes.tirp_prefix_detection import TIRPrefixDetection
+from tirp_prefixes.tirp_prefix_trie import TIRPPrefixTrie
+
+
+class TestTIRPPrefixTrie(unittest.TestCase):
+
+    def test_shared_prefixes(self):
+        """
+        TIRPs:
+        +1<-1<+2<-2<+999<-999
+        +1<-1<+3<-3<+999<-999
+
+        STI Series:
+         -1-  -2-  3  -1-  -2-
+
+        This function tests that the TIRPs share the nodes of their common prefixes,
+        and that the instances of each node are the same as the detected instances of its TIRP prefix
+        """
+        tirps = [TIRP(stis=[1, 2, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_BEFORE] * 3, vs=0.5, hs=1.0),
+                 TIRP(stis=[1, 3, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_BEFORE] * 3, vs=0.5, hs=1.0)]
+        prefix_trie = TIRPPrefixTrie(tirps=tirps)
+        self.assertEqual(prefix_trie.get_num_of_nodes(), 8)
+
+        nodes_1, nodes_2 = prefix_trie.get_prefix_nodes(tirps[0]), prefix_trie.get_prefix_nodes(tirps[1])
+        self.assertEqual([node.get_depth() for node in nodes_1], [1, 2, 3, 4, 5])
+        self.assertIs(nodes_1[1], nodes_2[1])
+        self.assertIsNot(nodes_1[2], nodes_2[2])
+        self.assertEqual(nodes_1[1].get_ref_count(), 2)
+        self.assertEqual(nodes_1[-1].get_tirp_prefix().get_tieps_str(), '+1<-1<+2<-2<+999')
+
+        stis_list: list[STI] = [
+            self._create_sti_instance(start_time=1, end_time=3, sym_id=1, sym_inst_id=1),
+            self._create_sti_instance(start_time=5, end_time=7, sym_id=2, sym_inst_id=1),
+            self._create_sti_instance(start_time=8, end_time=9, sym_id=3, sym_inst_id=1),
+            self._create_sti_instance(start_time=10, end_time=12, sym_id=1, sym_inst_id=2),
+            self._create_sti_instance(start_time=14, end_time=15, sym_id=2, sym_inst_id=2),
+        ]
+        sti_series = STISeries(series_id=0, stis_list=stis_list)
+        time_point_series = sti_series.get_time_points()
+        for tirp, nodes in [(tirps[0], nodes_1), (tirps[1], nodes_2)]:
+            for node in nodes:
+                tirp_prefix = node.get_tirp_prefix()
+                expected_insts = TIRPrefixDetection(tirp_prefix=tirp_prefix).detect(
+                    sti_series_id=0, time_point_series=time_point_series)
+                insts = prefix_trie.get_instances(node=node, sti_series_id=0, time_point_series=time_point_series)
+                self.assertEqual([inst.get_tiep_str() for inst in insts],
+                                 [inst.get_tiep_str() for inst in expected_insts])
+        self.assertEqual([inst.get_tiep_str() for inst in prefix_trie.get_instances(
+            node=nodes_1[3], sti_series_id=0, time_point_series=time_point_series)],
+            ['+1[1]<-1[3]<+2[5]<-2[7]', '+1[1]<-1[3]<+2[14]<-2[15]', '+1[10]<-1[12]<+2[14]<-2[15]'])
+
+        # the instances are memoized until all the TIRPs of the node are released
+        insts = prefix_trie.get_instances(node=nodes_1[1], sti_series_id=0, time_point_series=time_point_series)
+        prefix_trie.release_tirp(tirps[0])
+        self.assertIs(prefix_trie.get_instances(node=nodes_1[1], sti_series_id=0,
+                                                time_point_series=time_point_series), insts)
+        prefix_trie.release_tirp(tirps[1])
+        self.assertIsNot(prefix_trie.get_instances(node=nodes_1[1], sti_series_id=0,
+                                                   time_point_series=time_point_series), insts)
+
+    def test_co_occurring_tieps_order(self):
+        """
+        TIRPs:
+        (+1+2)<(-1-2)<+3<-3<+999<-999
+        (+2+1)<(-2-1)<+4<-4<+999<-999
+
+        STI Series:
+         -1-  -3-  -4-  -999-
+         -2-
+
+        This function tests that the TIRPs share the nodes of the prefixes with the same co-occurring tieps,
+        even if the tieps are listed in different orders
+        """
+        tirps = [TIRP(stis=[1, 2, 3, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_EQUALS] + [const.TEMP_REL_BEFORE] * 5,
+                      vs=0.5, hs=1.0),
+                 TIRP(stis=[2, 1, 4, const.EVENT_INDEX], temp_rels=[const.TEMP_REL_EQUALS] + [const.TEMP_REL_BEFORE] * 5,
+                      vs=0.5, hs=1.0)]
+        self.assertNotEqual(tirps[0].get_sorted_tieps()[0][0].get_tiep_key(),
+                            tirps[1].get_sorted_tieps()[0][0].get_tiep_key())
+        prefix_trie = TIRPPrefixTrie(tirps=tirps)
+        self.assertEqual(prefix_trie.get_num_of_nodes(), 8)
+        nodes_1, nodes_2 = prefix_trie.get_prefix_nodes(tirps[0]), prefix_trie.get_prefix_nodes(tirps[1])
+        self.assertIs(nodes_1[1], nodes_2[1])
+        self.assertIsNot(nodes_1[2], nodes_2[2])
+
+        stis_list: list[STI] = [
+            self._create_sti_instance(start_time=1, end_time=3, sym_id=1, sym_inst_id=1),
+            self._create_sti_instance(start_time=1, end_time=3, sym_id=2, sym_inst_id=1),
+            self._create_sti_instance(start_time=5, end_time=7, sym_id=3, sym_inst_id=1),
+            self._create_sti_instance(start_time=9, end_time=11, sym_id=4, sym_inst_id=1),
+            self._create_sti_instance(start_time=13, end_time=14, sym_id=const.EVENT_INDEX, sym_inst_id=1),
+        ]
+        time_point_series = STISeries(series_id=0, stis_list=stis_list).get_time_points()
+        for tirp, nodes in [(tirps[0], nodes_1), (tirps[1], nodes_2)]:
+            tirp_prefix = TIRPrefix(tieps=tirp.get_sorted_tieps()[:-1])
+            expected_insts = TIRPrefixDetection(tirp_prefix=tirp_prefix).detect(
+                sti_series_id=0, time_point_series=time_point_series)
+            insts = prefix_trie.get_instances(node=nodes[-1], sti_series_id=0, time_point_series=time_point_series)
+            self.assertEqual(len(expected_insts), 1)
+            self.assertEqual([inst.get_durations_between_all_tieps() for inst in insts],
+                             [inst.get_durations_between_all_tieps() for inst in expected_insts])
+
+    @staticmethod
+    def _create_sti_instance(start_time, end_time, sym_id, sym_inst_id) -> STI:
+        start_tiep = Tiep(time=start_time, tiep_type=const.START_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                          var_id=sym_id)
+        end_tiep = Tiep(time=end_time, tiep_type=const.END_TIEP, sym_id=sym_id, sym_inst_id=sym_inst_id,
+                        var_id=sym_id)
+        start_tiep.add_pair_tiep(end_tiep)
+        end_tiep.add_pair_tiep(start_tiep)
+        return STI(start_tiep, end_tiep)
+
+
+if __name__ == '__main__':
+    unittest.main()